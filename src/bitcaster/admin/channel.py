@@ -20,6 +20,7 @@ from reversion.admin import VersionAdmin
 
 from bitcaster.models import Assignment, Channel, Organization, Project, User
 
+from ..cache.breaker import CircuitState
 from ..dispatchers.base import Payload, dispatcherManager
 from ..forms.channel import ChannelChangeForm
 from .base import BaseAdmin, ButtonColor
@@ -349,7 +350,7 @@ wizard = ChannelWizard.as_view()
 
 class ChannelAdmin(BaseAdmin, TwoStepCreateMixin[Channel], LockMixinAdmin[Channel], VersionAdmin[Channel]):
     search_fields = ("name",)
-    list_display = ("name", "organization", "project", "dispatcher_", "active", "locked", "protocol")
+    list_display = ("name", "organization", "project", "dispatcher_", "active", "locked", "protocol", "circuit")
     list_filter = (
         ChannelTypeFilter,
         ("organization", LinkedAutoCompleteFilter.factory(parent=None)),
@@ -372,6 +373,10 @@ class ChannelAdmin(BaseAdmin, TwoStepCreateMixin[Channel], LockMixinAdmin[Channe
             None,
             {"fields": (("dispatcher", "protocol"),)},
         ),
+        (
+            "Delivery",
+            {"fields": (("rate_limit", "rate_burst"), "circuit")},
+        ),
         (
             "Advanced options",
             {
@@ -391,6 +396,13 @@ class ChannelAdmin(BaseAdmin, TwoStepCreateMixin[Channel], LockMixinAdmin[Channe
     def dispatcher_(self, obj: Channel) -> str:
         return str(obj.dispatcher)
 
+    def circuit(self, obj: Channel) -> str:
+        if not obj.breaker:
+            return _("disabled")
+        if (state := obj.breaker.get_state()) == CircuitState.OPEN:
+            return _("{} (retry in {:.0f}s)").format(state, obj.breaker.retry_after())
+        return str(state)
+
     def get_queryset(self, request: "HttpRequest") -> QuerySet[Channel]:
         return super().get_queryset(request).select_related("project", "organization")
 
@@ -402,8 +414,8 @@ class ChannelAdmin(BaseAdmin, TwoStepCreateMixin[Channel], LockMixinAdmin[Channe
 
     def get_readonly_fields(self, request: "HttpRequest", obj: "Optional[AnyModel]" = None) -> "_ListOrTuple[str]":
         if obj and obj.pk == config.SYSTEM_EMAIL_CHANNEL:
-            return ["name", "organization", "project", "parent", "protocol", "locked"]
-        return ["parent", "organization", "protocol", "locked", "project"]
+            return ["name", "organization", "project", "parent", "protocol", "locked", "circuit"]
+        return ["parent", "organization", "protocol", "locked", "project", "circuit"]
 
     @link(change_form=True, change_list=False)
     def events(self, button: Button) -> None:
@@ -429,6 +441,18 @@ class ChannelAdmin(BaseAdmin, TwoStepCreateMixin[Channel], LockMixinAdmin[Channe
         context["admin_form"] = AdminForm(config_form, fs, {})  # type: ignore[arg-type]
         return TemplateResponse(request, "admin/channel/configure.html", context)
 
+    @button(
+        label=_("Close circuit"),
+        enabled=lambda s: (b := s.context["original"].breaker) is not None and b.get_state() != CircuitState.CLOSED,
+        html_attrs={"class": ButtonColor.ACTION.value},
+    )
+    def close_circuit(self, request: "HttpRequest", pk: str) -> "HttpResponse":
+        obj: Channel = self.get_object_or_404(request, pk)
+        if obj.breaker:
+            obj.breaker.close()
+            self.message_user(request, _("Circuit closed"))
+        return HttpResponseRedirect("..")
+
     @button(html_attrs={"class": ButtonColor.ACTION.value})
     def test(self, request: "AuthHttpRequest", pk: str) -> "HttpResponse":
         from bitcaster.models import Event
@@ -155,7 +155,7 @@ class EventAdmin(BaseAdmin, TwoStepCreateMixin[Event], LockMixinAdmin[Event], ad
                         },
                     )
                     o.process()
-                    self.message_user(request, f"Sent {o.data}", messages.SUCCESS)
+                    self.message_user(request, f"Sent to {o.recipients} recipients", messages.SUCCESS)
                     return HttpResponseRedirect(".")
                 except Exception as e:
                     logger.exception(e)
@@ -12,8 +12,7 @@ from django.utils.text import capfirst
 from django.utils.translation import gettext_lazy
 from flags.state import flag_enabled
 
-from bitcaster.cache.storage import qs_get_or_store
-from bitcaster.constants import CacheKey
+LAST_EVENTS = 20  # number of Occurrences listed by the dashboard
 
 
 class BitcasterAdminConfig(apps.AdminConfig):
@@ -130,16 +129,28 @@ class BitcasterAdminSite(AdminSite):
         else:
             return list(self._build_sections_dict(request).values())
 
-    def get_last_events(self) -> list[dict[str, Any]]:
+    def get_last_events(self, limit: int = LAST_EVENTS) -> list[dict[str, Any]]:
         from bitcaster.models import Occurrence
 
         offset = timezone.now() - timedelta(hours=24)
         qs = (
             Occurrence.objects.filter(timestamp__gte=offset)
-            .values("timestamp", "id", application=F("event__application__name"), event__name=F("event__name"))
+            .values(
+                "timestamp", "id", "status", application=F("event__application__name"), event__name=F("event__name")
+            )
             .order_by("-timestamp")
         )
-        return qs_get_or_store(qs, key=CacheKey.DASHBOARDS_EVENTS)  # type: ignore[arg-type]
+        return list(qs[:limit])
+
+    def get_event_stats(self) -> dict[str, list[dict[str, Any]]]:
+        """Return the number of Occurrences per Event of the last hour and of the last 24h, read from the rollups."""
+        from bitcaster.models import OccurrenceRollup
+
+        now = timezone.now()
+        return {
+            "hour": list(OccurrenceRollup.objects.summary(OccurrenceRollup.Period.MINUTE, now - timedelta(hours=1))),
+            "day": list(OccurrenceRollup.objects.summary(OccurrenceRollup.Period.HOUR, now - timedelta(hours=24))),
+        }
 
     def each_context(self, request: HttpRequest) -> dict[str, Any]:
         ret = super().each_context(request)
@@ -154,6 +165,7 @@ class BitcasterAdminSite(AdminSite):
                 {
                     "sections": list(self._build_sections_dict(request).values()),
                     "last_events": self.get_last_events(),
+                    "event_stats": self.get_event_stats(),
                 }
             )
 
@@ -1,10 +1,13 @@
 import abc
-from typing import TYPE_CHECKING, Any, cast
+import hashlib
+import json
+from typing import TYPE_CHECKING, Any, Mapping, cast
 
 from django import forms
-from django.core.exceptions import ValidationError
 from strategy_field.registry import Registry
 
+from bitcaster.cache.configs import configs
+
 if TYPE_CHECKING:
     from bitcaster.models import Monitor
 
@@ -40,11 +43,11 @@ class Agent(metaclass=AgentMeta):
         return self.verbose_name or self.__class__.__name__
 
     @property
-    def config(self) -> dict[str, Any]:
-        cfg: "AgentConfig" = self.config_class(data=self.monitor.config)
-        if not cfg.is_valid():
-            raise ValidationError(cfg.errors)
-        return cfg.cleaned_data
+    def config(self) -> Mapping[str, Any]:
+        """The validated (read-only) configuration, cached until the Monitor config changes."""
+        # Monitors have no version: their `data` and `result` are updated at every check
+        digest = hashlib.sha256(json.dumps(self.monitor.config, sort_keys=True, default=str).encode()).hexdigest()
+        return configs.get(self.config_class, self.monitor.config, self.monitor.pk, digest)
 
     @abc.abstractmethod
     def check(self, notify: bool = True, update: bool = True) -> None: ...
@@ -1,5 +1,7 @@
-from typing import Any
+from typing import Any, Optional
 
+from constance import config
+from django.db import IntegrityError
 from django.db.models import QuerySet
 from rest_framework import serializers
 from rest_framework.generics import GenericAPIView, ListAPIView
@@ -8,10 +10,12 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 
 from ..auth.constants import Grant
-from ..exceptions import LockError
-from ..models import Event, Occurrence
-from ..models.occurrence import OccurrenceOptions
+from ..cache.routes import routes
+from ..exceptions import InactiveError, LockError
+from ..models import Event, IdempotencyKey, Occurrence
+from ..models.occurrence import OccurrenceOptions, TriggerOptions
 from .base import SecurityMixin
+from .parsers import NDJSONParser
 
 app_name = "api"
 
@@ -33,6 +37,10 @@ class ActionSerializer(serializers.Serializer):
     options = OptionSerializer(required=False)
 
 
+class BatchActionSerializer(ActionSerializer):
+    cid = serializers.CharField(required=False, allow_null=True, allow_blank=True)
+
+
 class EventSerializer(serializers.ModelSerializer):
     class Meta:
         model = Event
@@ -57,7 +65,11 @@ class EventList(SecurityMixin, ListAPIView):
 
 class EventTrigger(SecurityMixin, GenericAPIView):
     """
-    Trigger application's event
+    Trigger application's event.
+
+    Requests with an `Idempotency-Key` header trigger the event only once per key
+    (within `IDEMPOTENCY_KEY_TTL` seconds): replays return the original occurrence.
+    Events that are not active, or have no channels, are accepted but no occurrence is created.
     """
 
     serializer_class = EventSerializer
@@ -72,35 +84,111 @@ class EventTrigger(SecurityMixin, GenericAPIView):
             application__slug=self.kwargs["app"],
         )
 
+    def get_event(self) -> "Event":
+        """Return the Event to trigger, resolved through the routing cache.
+
+        Raises `InactiveError` if the Event would never notify anybody, before any database access.
+        """
+        if not (route := routes.get(self.kwargs["org"], self.kwargs["prj"], self.kwargs["app"], self.kwargs["evt"])):
+            raise Event.DoesNotExist
+        if route.locked:
+            raise LockError(route.locked)
+        evt = route.as_event()
+        self.check_object_permissions(self.request, evt)
+        if not (route.active and route.channels):
+            raise InactiveError
+        return evt
+
+    def get_options(self, opts: OccurrenceOptions) -> OccurrenceOptions:
+        if environments := self.request.auth.environments:
+            if "environs" in opts:
+                opts["environs"] = list(set(opts["environs"]).intersection(environments))
+            else:
+                opts["environs"] = list(environments)
+        return opts
+
     def post(self, request: "Request", *args: Any, **kwargs: Any) -> Response:
         ser = ActionSerializer(data=request.data)
         correlation_id = request.query_params.get("cid", None)
         if ser.is_valid():
-            slug = self.kwargs["evt"]
             try:
-                evt: "Event" = self.get_queryset().get(slug=slug)
-                if evt.locked:
-                    raise LockError(evt)
-                if evt.application.locked:
-                    raise LockError(evt.application)
-                if evt.application.project.locked:
-                    raise LockError(evt.application.project)
-                self.check_object_permissions(self.request, evt)
-                opts: OccurrenceOptions = ser.validated_data.get("options", {})
-                if request.auth.environments:
-                    if "environs" in opts:
-                        opts["environs"] = list(set(opts["environs"]).intersection(request.auth.environments))
-                    else:
-                        opts["environs"] = request.auth.environments
-                o: "Occurrence" = evt.trigger(
-                    context=ser.validated_data.get("context", {}),
-                    options=opts,
-                    cid=correlation_id,
-                )
+                evt = self.get_event()
+                trigger = {
+                    "context": ser.validated_data.get("context", {}),
+                    "options": self.get_options(ser.validated_data.get("options", {})),
+                    "cid": correlation_id,
+                }
+                if key := request.headers.get("Idempotency-Key"):
+                    pk, created = IdempotencyKey.objects.trigger(evt, key, **trigger)
+                    if not created:
+                        return Response({"occurrence": pk}, status=200, headers={"Idempotent-Replayed": "true"})
+                    return Response({"occurrence": pk}, status=201)
+                o: "Occurrence" = evt.trigger(**trigger)
                 return Response({"occurrence": o.pk}, status=201)
+            except InactiveError:
+                return Response({"occurrence": None}, status=200)
             except LockError as e:
                 return Response({"error": str(e)}, status=400)
             except Event.DoesNotExist:
                 return Response({"error": f"Event not found {self.kwargs}"}, status=404)
         else:
             return Response(ser.errors, status=400)
+
+
+class EventBatchTrigger(EventTrigger):
+    """
+    Trigger many occurrences of application's event.
+
+    Accepts a JSON array or NDJSON (application/x-ndjson) body. Each item has the same format
+    of the trigger endpoint payload, plus an optional `cid`. The response contains, in the same order,
+    the id of the created occurrence or the validation errors of each item.
+    """
+
+    parser_classes = (JSONParser, NDJSONParser)
+
+    def get_triggers(self, items: list[Any]) -> tuple[list[dict[str, Any]], dict[int, TriggerOptions]]:
+        """Validate `items`, returning the result of each one (errors, if invalid) and the valid triggers."""
+        correlation_id = self.request.query_params.get("cid", None)
+        results: list[dict[str, Any]] = []
+        triggers: dict[int, TriggerOptions] = {}
+        for i, item in enumerate(items):
+            ser = BatchActionSerializer(data=item)
+            if ser.is_valid():
+                triggers[i] = {
+                    "context": ser.validated_data.get("context", {}),
+                    "options": self.get_options(ser.validated_data.get("options", {})),
+                    "cid": ser.validated_data.get("cid") or correlation_id,
+                }
+                results.append({})
+            else:
+                results.append({"errors": ser.errors})
+        return results, triggers
+
+    def post(self, request: "Request", *args: Any, **kwargs: Any) -> Response:
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response({"error": "Expected a non empty list of triggers"}, status=400)
+        if len(items) > config.TRIGGER_BATCH_MAX_SIZE:
+            return Response({"error": f"Too many triggers (max {config.TRIGGER_BATCH_MAX_SIZE})"}, status=400)
+        evt: Optional[Event]
+        try:
+            evt = self.get_event()
+        except InactiveError:
+            evt = None
+        except LockError as e:
+            return Response({"error": str(e)}, status=400)
+        except Event.DoesNotExist:
+            return Response({"error": f"Event not found {self.kwargs}"}, status=404)
+
+        results, triggers = self.get_triggers(items)
+        if not triggers:
+            return Response({"occurrences": results}, status=400)
+        occurrences: list[Optional[Occurrence]] = [None] * len(triggers)  # inactive event: none is created
+        if evt:
+            try:
+                occurrences = list(evt.trigger_many(triggers.values()))
+            except IntegrityError:
+                return Response({"error": "Conflicting concurrent batch, please retry"}, status=409)
+        for i, o in zip(triggers, occurrences):
+            results[i] = {"occurrence": o.pk if o else None}
+        return Response({"occurrences": results}, status=201 if evt else 200)
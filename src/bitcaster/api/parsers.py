@@ -0,0 +1,21 @@
+import json
+from typing import IO, Any, Mapping, Optional
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """Parse newline delimited JSON (one JSON document per line) into a list."""
+
+    media_type = "application/x-ndjson"
+
+    def parse(
+        self, stream: IO[Any], media_type: Optional[str] = None, parser_context: Optional[Mapping[str, Any]] = None
+    ) -> list[Any]:
+        encoding = (parser_context or {}).get("encoding", settings.DEFAULT_CHARSET)
+        try:
+            return [json.loads(line) for line in stream.read().decode(encoding).splitlines() if line.strip()]
+        except ValueError as exc:
+            raise ParseError(f"NDJSON parse error - {exc}")
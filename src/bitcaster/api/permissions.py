@@ -1,10 +1,12 @@
 import logging
 from typing import TYPE_CHECKING, Optional, Tuple
 
-from rest_framework import authentication, permissions
+from django.utils.translation import gettext_lazy as _
+from rest_framework import authentication, exceptions, permissions
 from rest_framework.request import Request
 
 from bitcaster.auth.constants import Grant
+from bitcaster.cache.keys import ApiKeyRecord, keys
 from bitcaster.exceptions import InvalidGrantError
 from bitcaster.models import ApiKey, User
 
@@ -17,18 +19,30 @@ logger = logging.getLogger(__name__)
 
 
 class ApiKeyAuthentication(authentication.TokenAuthentication):
+    """Authenticate ApiKey tokens, resolved through the ApiKey cache.
+
+    `request.auth` is the ApiKeyRecord of the token, not the ApiKey instance.
+    """
+
     keyword = "Key"
     model = ApiKey
 
-    def authenticate(self, request: "ApiRequest") -> "Optional[Tuple[ApiKey, User]]":
-        certs: "Optional[Tuple[ApiKey, User]]" = super().authenticate(request)
+    def authenticate(self, request: "ApiRequest") -> "Optional[Tuple[User, ApiKeyRecord]]":
+        certs: "Optional[Tuple[User, ApiKeyRecord]]" = super().authenticate(request)
         if certs:
-            request.user = certs[1]
+            request.user = certs[0]
         return certs
 
+    def authenticate_credentials(self, key: str) -> "Tuple[User, ApiKeyRecord]":
+        if not (record := keys.get(key)):
+            raise exceptions.AuthenticationFailed(_("Invalid token."))
+        if not record.user_is_active:
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+        return record.get_user(), record
+
 
 class ApiBasePermission(permissions.BasePermission):
-    def _check_valid_scope(self, token: "ApiKey", view: "SecurityMixin") -> bool:
+    def _check_valid_scope(self, token: "ApiKey | ApiKeyRecord", view: "SecurityMixin") -> bool:
         if "org" in view.kwargs and view.kwargs["org"] != token.organization.slug:
             raise InvalidGrantError(f"Invalid organization for {token}")
         if "prj" in view.kwargs:
@@ -11,7 +11,7 @@ from .base import BaseView
 from .permissions import ApiKeyAuthentication
 
 if TYPE_CHECKING:
-    from bitcaster.models import ApiKey
+    from bitcaster.cache.keys import ApiKeyRecord
 
 
 class PingSerializer(serializers.Serializer):
@@ -26,7 +26,7 @@ class PingView(BaseView):
 
     @extend_schema(request=PingSerializer, description=_("Ping system"))
     def get(self, request: Request, **kwargs: Any) -> Response:
-        key: "ApiKey" = request.auth
+        key: "ApiKeyRecord" = request.auth
         # if not key:
         #     return Response(status=status.HTTP_401_UNAUTHORIZED)
         ser = PingSerializer({"token": key.name})
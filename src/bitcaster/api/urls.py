@@ -4,7 +4,7 @@ from rest_framework_extensions.routers import ExtendedDefaultRouter
 from .application import ApplicationView
 from .channel import ChannelView
 from .distribution_list import DistributionMembersView, DistributionView
-from .event import EventList, EventTrigger
+from .event import EventBatchTrigger, EventList, EventTrigger
 from .org import OrgView
 from .project import ProjectView
 from .system import PingView
@@ -37,6 +37,11 @@ urlpatterns = [
     path("o/<slug:org>/p/<slug:prj>/d/<int:pk>/", DistributionView.as_view({"get": "list"}), name="distribution-list"),
     path("o/<slug:org>/p/<slug:prj>/d/", DistributionView.as_view({"get": "list"}), name="distribution-list"),
     #
+    path(
+        "o/<slug:org>/p/<slug:prj>/a/<slug:app>/e/<slug:evt>/trigger/batch/",
+        EventBatchTrigger.as_view(),
+        name="event-trigger-batch",
+    ),
     path("o/<slug:org>/p/<slug:prj>/a/<slug:app>/e/<slug:evt>/trigger/", EventTrigger.as_view(), name="event-trigger"),
     path("o/<slug:org>/p/<slug:prj>/a/<slug:app>/e/", EventList.as_view(), name="events-list"),
 ]
@@ -0,0 +1,85 @@
+import enum
+import time
+
+from django.core.cache import cache
+
+TRIAL_TIMEOUT = 10  # seconds, min lifetime of the half-open trial: at least as long as a dispatch (aio.TIMEOUT)
+
+
+class CircuitState(enum.StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    """Circuit breaker shared by all the workers through the cache backend.
+
+    The circuit opens when, within `window` seconds, at least `min_requests` dispatches have been
+    recorded and at least `failure_rate` of them failed. After `cooldown` seconds it is half-open:
+    a single trial is allowed, which closes the circuit if it succeeds or opens it again if it fails.
+    A trial whose result is never recorded (e.g. the worker died) expires after `cooldown` seconds,
+    or `TRIAL_TIMEOUT` if longer.
+    """
+
+    def __init__(self, key: str, failure_rate: float, min_requests: int, window: int, cooldown: int) -> None:
+        self.key = f"breaker:{key}"
+        self.failure_rate = failure_rate
+        self.min_requests = max(1, min_requests)
+        self.window = max(1, window)
+        self.cooldown = cooldown
+
+    @property
+    def opened_key(self) -> str:
+        return f"{self.key}:opened"
+
+    @property
+    def trial_key(self) -> str:
+        return f"{self.key}:trial"
+
+    def window_keys(self) -> tuple[str, str]:
+        window = int(time.time()) // self.window
+        return f"{self.key}:{window}:total", f"{self.key}:{window}:failures"
+
+    def get_state(self) -> CircuitState:
+        if (opened := cache.get(self.opened_key)) is None:
+            return CircuitState.CLOSED
+        if time.time() - opened < self.cooldown:
+            return CircuitState.OPEN
+        return CircuitState.HALF_OPEN
+
+    def retry_after(self) -> float:
+        """Return the number of seconds before the circuit is half-open."""
+        if (opened := cache.get(self.opened_key)) is None:
+            return 0
+        return max(0.0, opened + self.cooldown - time.time())
+
+    def allowed(self, dispatches: int = 1) -> int:
+        """Return how many of `dispatches` can be attempted: all, none or a single trial if half-open."""
+        state = self.get_state()
+        if state == CircuitState.HALF_OPEN:
+            return 1 if cache.add(self.trial_key, 1, max(self.cooldown, TRIAL_TIMEOUT)) else 0
+        return dispatches if state == CircuitState.CLOSED else 0
+
+    def record(self, successes: int, failures: int) -> None:
+        """Record the results of some dispatches, opening or closing the circuit accordingly."""
+        if self.get_state() != CircuitState.CLOSED:  # result of the trial
+            if failures:
+                self.open()
+            elif successes:
+                self.close()
+            return
+        total_key, failures_key = self.window_keys()
+        cache.add(total_key, 0, self.window * 2)
+        cache.add(failures_key, 0, self.window * 2)
+        total = cache.incr(total_key, successes + failures)
+        failed = cache.incr(failures_key, failures) if failures else cache.get(failures_key, 0)
+        if total >= self.min_requests and failed >= total * self.failure_rate:
+            self.open()
+
+    def open(self) -> None:
+        cache.set(self.opened_key, time.time(), None)
+        cache.delete(self.trial_key)
+
+    def close(self) -> None:
+        cache.delete_many([self.opened_key, self.trial_key, *self.window_keys()])
@@ -0,0 +1,34 @@
+from types import MappingProxyType
+from typing import Any, Hashable, Mapping, Optional
+
+from django import forms
+from django.core.exceptions import ValidationError
+
+from .local import LocalCache
+
+ConfigKey = tuple[type[forms.Form], Hashable, Hashable]
+
+
+class ConfigCache(LocalCache[ConfigKey, Mapping[str, Any]]):
+    """Per-process LRU cache of validated Dispatcher and Agent configurations.
+
+    Configurations are keyed by (form class, owner pk, owner version) so that any change of the
+    owner produces a new entry. Values are read-only mappings, shared by all the callers.
+    """
+
+    def get(
+        self, form_class: type[forms.Form], data: dict[str, Any], pk: Optional[Hashable], version: Hashable
+    ) -> Mapping[str, Any]:
+        if pk is None:
+            return self.validate(form_class, data)
+        return self.get_or_set((form_class, pk, version), lambda: self.validate(form_class, data))
+
+    @staticmethod
+    def validate(form_class: type[forms.Form], data: dict[str, Any]) -> Mapping[str, Any]:
+        cfg = form_class(data=data)
+        if not cfg.is_valid():
+            raise ValidationError(cfg.errors)
+        return MappingProxyType(cfg.cleaned_data)
+
+
+configs = ConfigCache()
@@ -0,0 +1,91 @@
+from typing import TYPE_CHECKING, Any, Iterable, Optional
+
+from .versioned import VersionedCache
+
+if TYPE_CHECKING:
+    from bitcaster.models import Channel, Event, Message, Notification
+    from bitcaster.utils.filters import MatchPlan
+
+
+class DeliveryPlan:
+    """Everything needed to deliver the Occurrences of an Event, loaded once.
+
+    Holds the Notifications (with their compiled payload filters), the Channels of the Event
+    (whose dispatchers are instantiated when loaded) and the Message selected for each
+    (notification, channel) pair. The notifications' message cache is pre-populated so that
+    `Notification.get_message()` never hits the database.
+    """
+
+    def __init__(
+        self,
+        event: "Event",
+        notifications: Iterable["Notification"],
+        channels: Iterable["Channel"],
+        messages: Iterable["Message"],
+    ) -> None:
+        from bitcaster.utils.filters import plans
+
+        self.event = event
+        self.notifications: list["Notification"] = list(notifications)
+        self.channels: dict[int, "Channel"] = {ch.pk: ch for ch in channels}
+        self.matcher: "MatchPlan" = plans.get(self.notifications)
+        self.messages: dict[tuple[int, int], Optional["Message"]] = {}
+
+        # specific messages first: they take precedence over the event ones
+        candidates = sorted(messages, key=lambda m: (m.notification_id is None, m.pk))
+        for notification in self.notifications:
+            notification.event = event
+            for channel in self.channels.values():
+                message = next(
+                    (
+                        m
+                        for m in candidates
+                        if m.channel_id == channel.pk and m.notification_id in (notification.pk, None)
+                    ),
+                    None,
+                )
+                self.messages[notification.pk, channel.pk] = message
+                notification._cached_messages[channel] = message
+
+    def match(self, payload: dict[str, Any], environs: Optional[list[str]] = None) -> list["Notification"]:
+        """Return the Notifications whose payload filter matches `payload`, enabled for any of `environs`."""
+        return [
+            notification
+            for notification, matched in zip(self.notifications, self.matcher.match(payload))
+            if matched and (not environs or set(notification.environments or ()) & set(environs))
+        ]
+
+    def get_channels(self, selected: Optional[list[str]] = None) -> dict[int, "Channel"]:
+        """Return the Channels of the Event, restricted to the `selected` pks if provided."""
+        if not selected:
+            return self.channels
+        return {pk: ch for pk, ch in self.channels.items() if str(pk) in map(str, selected)}
+
+
+class DeliveryPlanCache(VersionedCache[DeliveryPlan]):
+    """Per-process cache of DeliveryPlans, keyed by Event.
+
+    Plans are never stored in the shared cache. Invalidated when any Event, Notification,
+    Channel or Message is saved or deleted.
+    """
+
+    def load(self, event_id: int) -> Optional[DeliveryPlan]:
+        from bitcaster.models import Event, Message
+
+        if not (
+            event := Event.objects.select_related("application__project__organization").filter(pk=event_id).first()
+        ):
+            return None
+        channels = list(event.channels.all())
+        return DeliveryPlan(
+            event,
+            event.notifications.select_related("distribution").order_by("pk"),
+            channels,
+            Message.objects.filter(event=event, channel__in=channels),
+        )
+
+    def get(self, event_id: int) -> Optional[DeliveryPlan]:
+        return self.get_or_set(str(event_id), lambda: self.load(event_id))
+
+
+delivery_plans = DeliveryPlanCache("delivery-plans", maxsize=256, shared=False)
@@ -1,16 +1,95 @@
 import logging
-from typing import Any
+from typing import Any, Optional
 
-from django.core.cache import cache
-from django.db.models.signals import post_save
+from constance.signals import config_updated
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 
-from bitcaster.constants import CacheKey
-from bitcaster.models import Occurrence
+from bitcaster.cache.delivery import delivery_plans
+from bitcaster.cache.keys import keys
+from bitcaster.cache.routes import routes
+from bitcaster.cache.templates import templates
+from bitcaster.models import (
+    ApiKey,
+    Application,
+    Channel,
+    Event,
+    Message,
+    Notification,
+    Organization,
+    Project,
+    User,
+)
+from bitcaster.utils.filters import filters, plans
 
 logger = logging.getLogger(__name__)
 
 
-@receiver(post_save, sender=Occurrence, dispatch_uid="invalidate_occurrence_cache")
-def invalidate_occurrence_cache(**kwargs: Any) -> None:
-    cache.delete(CacheKey.DASHBOARDS_EVENTS)
+@receiver(post_save, sender=Message, dispatch_uid="invalidate_message_templates")
+@receiver(post_delete, sender=Message, dispatch_uid="invalidate_message_templates")
+def invalidate_message_templates(instance: Message, **kwargs: Any) -> None:
+    templates.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=Notification, dispatch_uid="invalidate_notification_filters")
+@receiver(post_delete, sender=Notification, dispatch_uid="invalidate_notification_filters")
+def invalidate_notification_filters(instance: Notification, **kwargs: Any) -> None:
+    filters.invalidate(instance.pk)
+    plans.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=ApiKey, dispatch_uid="invalidate_api_keys_apikey")
+@receiver(post_delete, sender=ApiKey, dispatch_uid="invalidate_api_keys_apikey")
+@receiver(post_save, sender=User, dispatch_uid="invalidate_api_keys_user")
+@receiver(post_delete, sender=User, dispatch_uid="invalidate_api_keys_user")
+@receiver(post_save, sender=Organization, dispatch_uid="invalidate_api_keys_organization")
+@receiver(post_delete, sender=Organization, dispatch_uid="invalidate_api_keys_organization")
+@receiver(post_save, sender=Project, dispatch_uid="invalidate_api_keys_project")
+@receiver(post_delete, sender=Project, dispatch_uid="invalidate_api_keys_project")
+@receiver(post_save, sender=Application, dispatch_uid="invalidate_api_keys_application")
+@receiver(post_delete, sender=Application, dispatch_uid="invalidate_api_keys_application")
+def invalidate_api_keys(update_fields: Optional[frozenset[str]] = None, **kwargs: Any) -> None:
+    if update_fields == {"last_login"}:  # user login
+        return
+    keys.invalidate()
+
+
+@receiver(post_save, sender=Organization, dispatch_uid="invalidate_routes_organization")
+@receiver(post_delete, sender=Organization, dispatch_uid="invalidate_routes_organization")
+@receiver(post_save, sender=Project, dispatch_uid="invalidate_routes_project")
+@receiver(post_delete, sender=Project, dispatch_uid="invalidate_routes_project")
+@receiver(post_save, sender=Application, dispatch_uid="invalidate_routes_application")
+@receiver(post_delete, sender=Application, dispatch_uid="invalidate_routes_application")
+@receiver(post_save, sender=Event, dispatch_uid="invalidate_routes_event")
+@receiver(post_delete, sender=Event, dispatch_uid="invalidate_routes_event")
+@receiver(m2m_changed, sender=Event.channels.through, dispatch_uid="invalidate_routes_event_channels")
+@receiver(post_save, sender=Channel, dispatch_uid="invalidate_routes_channel")
+@receiver(post_delete, sender=Channel, dispatch_uid="invalidate_routes_channel")
+def invalidate_routes(**kwargs: Any) -> None:
+    routes.invalidate()
+
+
+@receiver(post_save, sender=Organization, dispatch_uid="invalidate_delivery_plans_organization")
+@receiver(post_delete, sender=Organization, dispatch_uid="invalidate_delivery_plans_organization")
+@receiver(post_save, sender=Project, dispatch_uid="invalidate_delivery_plans_project")
+@receiver(post_delete, sender=Project, dispatch_uid="invalidate_delivery_plans_project")
+@receiver(post_save, sender=Application, dispatch_uid="invalidate_delivery_plans_application")
+@receiver(post_delete, sender=Application, dispatch_uid="invalidate_delivery_plans_application")
+@receiver(post_save, sender=Event, dispatch_uid="invalidate_delivery_plans_event")
+@receiver(post_delete, sender=Event, dispatch_uid="invalidate_delivery_plans_event")
+@receiver(m2m_changed, sender=Event.channels.through, dispatch_uid="invalidate_delivery_plans_event_channels")
+@receiver(post_save, sender=Notification, dispatch_uid="invalidate_delivery_plans_notification")
+@receiver(post_delete, sender=Notification, dispatch_uid="invalidate_delivery_plans_notification")
+@receiver(post_save, sender=Channel, dispatch_uid="invalidate_delivery_plans_channel")
+@receiver(post_delete, sender=Channel, dispatch_uid="invalidate_delivery_plans_channel")
+@receiver(post_save, sender=Message, dispatch_uid="invalidate_delivery_plans_message")
+@receiver(post_delete, sender=Message, dispatch_uid="invalidate_delivery_plans_message")
+def invalidate_delivery_plans(**kwargs: Any) -> None:
+    delivery_plans.invalidate()
+
+
+@receiver(config_updated, dispatch_uid="invalidate_delivery_plans_config")
+def invalidate_delivery_plans_config(key: str, **kwargs: Any) -> None:
+    # channels read their circuit breaker settings when the plan is built
+    if key.startswith("CIRCUIT_BREAKER_"):
+        delivery_plans.invalidate()
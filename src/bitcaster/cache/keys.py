@@ -0,0 +1,72 @@
+import hashlib
+from typing import TYPE_CHECKING, NamedTuple, Optional
+
+from django.utils.functional import SimpleLazyObject
+
+from .versioned import VersionedCache
+
+if TYPE_CHECKING:
+    from bitcaster.models import User
+
+
+class ScopeRef(NamedTuple):
+    pk: int
+    slug: str
+
+
+class ApiKeyRecord(NamedTuple):
+    """Immutable snapshot of an ApiKey and of its scope, used to authenticate API requests.
+
+    Scope attributes expose the same `pk` and `slug` of the related models. Only the id and the
+    active flag of the User are stored: it is loaded when first accessed (see `get_user()`).
+    """
+
+    pk: int
+    name: str
+    user_id: int
+    user_is_active: bool
+    organization: ScopeRef
+    project: Optional[ScopeRef]
+    application: Optional[ScopeRef]
+    grants: tuple[str, ...]
+    environments: tuple[str, ...]
+
+    def __str__(self) -> str:
+        return self.name
+
+    def get_user(self) -> "User":
+        from bitcaster.models import User
+
+        return SimpleLazyObject(lambda: User.objects.get(pk=self.user_id))  # type: ignore[return-value]
+
+
+class ApiKeyCache(VersionedCache[ApiKeyRecord]):
+    """Resolve tokens to ApiKeyRecords without database access.
+
+    Invalidated when any ApiKey, User, Organization, Project or Application is saved or deleted.
+    """
+
+    def load(self, token: str) -> Optional[ApiKeyRecord]:
+        from bitcaster.models import ApiKey
+
+        try:
+            key = ApiKey.objects.select_related("user", "organization", "project", "application").get(key=token)
+        except ApiKey.DoesNotExist:
+            return None
+        return ApiKeyRecord(
+            pk=key.pk,
+            name=key.name,
+            user_id=key.user.pk,
+            user_is_active=key.user.is_active,
+            organization=ScopeRef(key.organization.pk, key.organization.slug),
+            project=ScopeRef(key.project.pk, key.project.slug) if key.project else None,
+            application=ScopeRef(key.application.pk, key.application.slug) if key.application else None,
+            grants=tuple(key.grants or ()),
+            environments=tuple(key.environments or ()),
+        )
+
+    def get(self, token: str) -> Optional[ApiKeyRecord]:
+        return self.get_or_set(hashlib.sha256(token.encode()).hexdigest(), lambda: self.load(token))
+
+
+keys = ApiKeyCache("apikeys")
@@ -0,0 +1,74 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Hashable, NamedTuple, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class LocalCache(Generic[K, V]):
+    """Thread safe, per-process LRU cache with hit/miss counters.
+
+    Used to store objects that cannot be pickled to the shared cache (compiled templates,
+    compiled filters...). Keys should include the version of the source object so that
+    any change produces a new entry.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._data: OrderedDict[K, V] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._data
+
+    def get_or_set(self, key: K, factory: Callable[[], V]) -> V:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+        value = factory()
+        with self._lock:
+            self.misses += 1
+        self.set(key, value)
+        return value
+
+    def peek(self, key: K) -> Optional[V]:
+        """Return the entry of `key`, or None if it is not cached."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: K, value: V) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, predicate: Callable[[K], Any]) -> None:
+        """Remove all the entries whose key matches `predicate`."""
+        with self._lock:
+            for key in [k for k in self._data if predicate(k)]:
+                del self._data[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._data))
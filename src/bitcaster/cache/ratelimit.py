@@ -0,0 +1,49 @@
+import time
+
+from django.core.cache import cache
+
+US = 1_000_000
+
+
+class RateLimiter:
+    """Token bucket shared by all the workers through the cache backend.
+
+    Implemented as a GCRA: the cache only stores the theoretical arrival time (in µs) of the
+    next token, moved forward with atomic increments. A bucket that has been idle long enough
+    to be full is reset with a plain `set()`, so concurrent resets can grant a few more tokens.
+    """
+
+    def __init__(self, key: str, rate: float, burst: int = 1) -> None:
+        self.key = f"ratelimit:{key}"
+        self.interval = max(1, int(US / rate))
+        self.burst = max(1, burst)
+        self.timeout = int(self.burst * self.interval / US) + 60
+
+    def acquire(self, tokens: int = 1) -> tuple[int, float]:
+        """Take up to `tokens` tokens.
+
+        Returns the number of tokens taken and, if they are less than requested, the number of
+        seconds to wait before the next one is available.
+        """
+        now = time.time_ns() // 1000
+        capacity = self.burst * self.interval
+        try:
+            start = cache.incr(self.key, tokens * self.interval) - tokens * self.interval
+        except ValueError:  # missing or expired
+            start = 0
+        reset = start < now
+        if reset:
+            start = now
+        granted = max(0, min(tokens, (now + capacity - start) // self.interval))
+        if reset:
+            cache.set(self.key, start + granted * self.interval, self.timeout)
+        elif granted < tokens:
+            cache.decr(self.key, (tokens - granted) * self.interval)
+        if granted == tokens:
+            return granted, 0
+        return granted, (start + (granted + 1) * self.interval - capacity - now) / US
+
+    def pause(self, seconds: float) -> None:
+        """Do not grant any token for `seconds` (ie. the provider asked to slow down)."""
+        until = time.time_ns() // 1000 + int(seconds * US) + self.burst * self.interval
+        cache.set(self.key, until, self.timeout + int(seconds))
@@ -0,0 +1,81 @@
+from typing import TYPE_CHECKING, Any, NamedTuple, Optional
+
+from .versioned import VersionedCache
+
+if TYPE_CHECKING:
+    from bitcaster.models import Event
+
+
+class EventRoute(NamedTuple):
+    """Immutable snapshot of the static metadata needed to trigger an Event."""
+
+    pk: int
+    slug: str
+    name: str
+    application_id: int
+    active: bool
+    locked: Optional[str]  # name of the first locked level (Event, Application, Project)
+    channels: tuple[int, ...]
+
+    def as_event(self) -> "Event":
+        """Return a shallow Event instance, enough to create its Occurrences without any query."""
+        from bitcaster.models import Event
+
+        return Event(
+            pk=self.pk,
+            slug=self.slug,
+            name=self.name,
+            application_id=self.application_id,
+            active=self.active,
+            locked=self.locked == Event.__name__,
+        )
+
+
+class RouteCache(VersionedCache[EventRoute]):
+    """Resolve Events by slugs (API) or by name (system events) without database access.
+
+    Invalidated when any Organization, Project, Application, Event or Channel is saved or deleted.
+    """
+
+    def load(self, **filters: Any) -> Optional[EventRoute]:
+        from bitcaster.models import Event
+
+        if not (evt := Event.objects.filter(**filters).first()):
+            return None
+        locked = next((o.__class__.__name__ for o in (evt, evt.application, evt.application.project) if o.locked), None)
+        return EventRoute(
+            pk=evt.pk,
+            slug=evt.slug,
+            name=evt.name,
+            application_id=evt.application_id,
+            active=evt.active,
+            locked=locked,
+            channels=tuple(evt.channels.values_list("pk", flat=True)),
+        )
+
+    def get(self, org: str, prj: str, app: str, evt: str) -> Optional[EventRoute]:
+        return self.get_or_set(
+            f"{org}/{prj}/{app}/{evt}",
+            lambda: self.load(
+                application__project__organization__slug=org,
+                application__project__slug=prj,
+                application__slug=app,
+                slug=evt,
+            ),
+        )
+
+    def system(self, name: str) -> Optional[EventRoute]:
+        from bitcaster.constants import Bitcaster
+
+        return self.get_or_set(
+            f"system/{name}",
+            lambda: self.load(
+                application__project__organization__name=Bitcaster.ORGANIZATION,
+                application__project__name=Bitcaster.PROJECT,
+                application__name=Bitcaster.APPLICATION,
+                name=name,
+            ),
+        )
+
+
+routes = RouteCache("routes")
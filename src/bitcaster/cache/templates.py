@@ -0,0 +1,31 @@
+from typing import TYPE_CHECKING, Optional
+
+from django.template import Template
+
+from .local import LocalCache
+
+if TYPE_CHECKING:
+    from bitcaster.models import Message
+
+TemplateKey = tuple[int, int, str]
+
+
+class TemplateCache(LocalCache[TemplateKey, Template]):
+    """Per-process LRU cache of compiled Message templates.
+
+    Templates are keyed by (message pk, message version, field) so that any change of the
+    Message produces a new entry; stale entries are removed when the Message is saved.
+    """
+
+    def get(self, message: "Message", field: str) -> Optional[Template]:
+        if not (content := getattr(message, field)):
+            return None
+        if message.pk is None:
+            return Template(content)
+        return self.get_or_set((message.pk, message.version, field), lambda: Template(content))
+
+    def invalidate(self, message_pk: int) -> None:
+        self.discard(lambda key: key[0] == message_pk)
+
+
+templates = TemplateCache()
@@ -0,0 +1,59 @@
+import time
+from typing import Callable, Generic, Optional, TypeVar
+
+from django.core.cache import cache
+
+from .local import LocalCache
+
+V = TypeVar("V")
+
+
+class VersionedCache(Generic[V]):
+    """Two level (per-process and shared) cache whose entries are all invalidated at once.
+
+    Entries are keyed by the namespace version, stored in the shared cache: `invalidate()`
+    increments it so that every process misses both its local entries and the shared ones.
+    Lookups cost one shared cache read (the version) when the entry is found locally.
+    `None` values are never stored. With `shared=False` values are only stored locally, for values
+    that cannot (or should not) be pickled; the version is still shared.
+    """
+
+    def __init__(self, namespace: str, maxsize: int = 1024, timeout: Optional[int] = 3600, shared: bool = True) -> None:
+        self.namespace = namespace
+        self.timeout = timeout
+        self.shared = shared
+        self.local: LocalCache[tuple[int, str], V] = LocalCache(maxsize)
+
+    @property
+    def version_key(self) -> str:
+        return f"{self.namespace}:version"
+
+    def get_version(self) -> int:
+        if (version := cache.get(self.version_key)) is None:
+            # a new value (not a restart from 1) so that stale local entries are never matched
+            cache.add(self.version_key, time.time_ns(), None)
+            version = cache.get(self.version_key)
+        return version
+
+    def get_or_set(self, key: str, factory: Callable[[], Optional[V]]) -> Optional[V]:
+        version = self.get_version()
+        if (value := self.local.peek((version, key))) is not None:
+            return value
+        if not self.shared:
+            if (value := factory()) is None:
+                return None
+        elif (value := cache.get(shared_key := f"{self.namespace}:{version}:{key}")) is None:
+            if (value := factory()) is None:
+                return None
+            cache.set(shared_key, value, self.timeout)
+        self.local.set((version, key), value)
+        return value
+
+    def invalidate(self) -> None:
+        try:
+            cache.incr(self.version_key)
+        except ValueError:  # missing (or evicted) version
+            cache.set(self.version_key, time.time_ns(), None)
+
+    def clear(self) -> None:
+        self.local.clear()
@@ -62,6 +62,11 @@ CONFIG: "Mapping[str, ConfigItem]" = {
         True,
         "https://docs.celeryq.dev/en/stable/userguide/configuration.html#task-eager-propagates",
     ),
+    "CELERY_RESULT_BACKEND": (
+        str,
+        "",
+        "https://docs.celeryq.dev/en/stable/userguide/configuration.html#result-backend",
+    ),
     "CELERY_VISIBILITY_TIMEOUT": (
         int,
         1800,
@@ -70,6 +75,9 @@ CONFIG: "Mapping[str, ConfigItem]" = {
     "CSRF_COOKIE_SECURE": (bool, True, setting("csrf-cookie-secure"), False),
     "CSRF_COOKIE_SAMESITE": (str, setting("csrf-cookie-samesite")),
     "CSRF_TRUSTED_ORIGINS": (list, ["http://localhost", "http://127.0.0.1"]),
+    "DISPATCHER_ASYNC": (bool, False, "Deliver the messages concurrently in a shared event loop"),
+    "DISPATCHER_ASYNC_CONCURRENCY": (int, 100, "Maximum number of concurrent asynchronous sends per Channel"),
+    "DISPATCHER_ASYNC_WORKERS": (int, 10, "Threads running the synchronous dispatchers in the event loop"),
     "DATABASE_URL": (
         str,
         "sqlite:///bitcaster.db",
@@ -130,6 +138,12 @@ CONFIG: "Mapping[str, ConfigItem]" = {
     "STATIC_ROOT": (str, "/var/bitcaster/static", setting("static-root")),
     "STATIC_URL": (str, "/static/", setting("static-url")),
     "TIME_ZONE": (str, "UTC", setting("std-setting-TIME_ZONE")),
+    "WEBPUSH_ENCRYPTION_WORKERS": (int, 4, "Number of threads encrypting WebPush payloads"),
+    "WEBPUSH_PARALLEL_THRESHOLD": (
+        int,
+        100,
+        "Min number of WebPush recipients whose payloads are encrypted in parallel (0 disables)",
+    ),
 }
 
 
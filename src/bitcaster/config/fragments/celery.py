@@ -26,7 +26,7 @@ CELERY_SEND_TASK_ERROR_EMAILS = False
 
 CELERY_CACHE_BACKEND = "django-cache"
 
-# CELERY_RESULT_BACKEND = "django-db"
+CELERY_RESULT_BACKEND = env("CELERY_RESULT_BACKEND") or None
 # CELERY_RESULT_EXPIRES = None
 # CELERY_RESULT_EXTENDED = True
 # CELERY_RESULT_SERIALIZER = "json"
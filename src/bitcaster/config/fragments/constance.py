@@ -20,6 +20,10 @@ CONSTANCE_ADDITIONAL_FIELDS = {
         "bitcaster.utils.constance.GroupSelect",
         {"initial": DEFAULT_GROUP_NAME},
     ],
+    "partition_interval_select": [
+        "django.forms.ChoiceField",
+        {"initial": "month", "choices": (("day", "Daily"), ("month", "Monthly"))},
+    ],
 }
 
 CONSTANCE_CONFIG = {
@@ -28,5 +32,42 @@ CONSTANCE_CONFIG = {
     "SYSTEM_EMAIL_CHANNEL": ("", "System Email", "email_channel"),
     "NEW_USER_IS_STAFF": (False, "Set any new user as staff", bool),
     "NEW_USER_DEFAULT_GROUP": (DEFAULT_GROUP_NAME, "Group to assign to any new user", "group_select"),
+    "DELIVERY_MAX_ATTEMPTS": (5, "Max number of dispatch attempts to a single recipient", int),
+    "DELIVERY_RETRY_DELAY": (30, "Number of seconds before the first retry of a failed delivery", int),
+    "DELIVERY_RETRY_MAX_DELAY": (3600, "Max number of seconds between two retries of a failed delivery", int),
+    "CHANNEL_RATE_LIMIT_MAX_WAIT": (
+        1,
+        "Max number of seconds a worker waits for a rate limited channel before rescheduling the deliveries",
+        int,
+    ),
+    "CIRCUIT_BREAKER_FAILURE_RATE": (
+        0.5,
+        "Rate of failed dispatches (0..1) that opens the circuit of a Channel (0 disables the circuit breakers)",
+        float,
+    ),
+    "CIRCUIT_BREAKER_MIN_REQUESTS": (20, "Min number of dispatches before the circuit of a Channel can open", int),
+    "CIRCUIT_BREAKER_WINDOW": (60, "Number of seconds the dispatch failure rate of a Channel is computed over", int),
+    "CIRCUIT_BREAKER_COOLDOWN": (30, "Number of seconds the circuit of a Channel stays open before a trial", int),
+    "IDEMPOTENCY_KEY_TTL": (86400, "Number of seconds an Idempotency-Key of a trigger request is remembered", int),
+    "TRIGGER_BATCH_MAX_SIZE": (1000, "Max number of Occurrences created by a single batch trigger request", int),
     "OCCURRENCE_DEFAULT_RETENTION": (30, "Number of days of Occurrences retention", int),
+    "OCCURRENCE_BATCH_SIZE": (500, "Number of recipients fetched and dispatched per batch", int),
+    "OCCURRENCE_CHECKPOINT_EVERY": (100, "Number of deliveries between two Occurrence progress checkpoints", int),
+    "OCCURRENCE_CHECKPOINT_INTERVAL": (5, "Max number of seconds between two Occurrence progress checkpoints", int),
+    "OCCURRENCE_SHARDS": (1, "Number of parallel tasks a large Occurrence is split into (1 disables sharding)", int),
+    "OCCURRENCE_SHARD_THRESHOLD": (1000, "Min number of recipients for an Occurrence to be sharded", int),
+    "OCCURRENCE_CHANNEL_WORKERS": (4, "Number of Channels of an Occurrence dispatched concurrently (1 disables)", int),
+    "OCCURRENCE_CLAIM_BATCH_SIZE": (1000, "Number of Occurrences claimed by the scheduler per transaction", int),
+    "OCCURRENCE_CLAIM_LEASE": (600, "Number of seconds an Occurrence stays claimed by the scheduler", int),
+    "OCCURRENCE_PURGE_BATCH_SIZE": (1000, "Number of expired Occurrences deleted per transaction", int),
+    "OCCURRENCE_PURGE_RATE": (0, "Max number of Occurrences purged per second (0 means no limit)", int),
+    "OCCURRENCE_PURGE_MAX_RUNTIME": (0, "Max number of seconds a purge can run (0 means no limit)", int),
+    "OCCURRENCE_ROLLUP_RETENTION": (90, "Number of days the hourly Occurrence counters are kept", int),
+    "OCCURRENCE_PARTITION_INTERVAL": (
+        "month",
+        "Period covered by each Occurrence partition",
+        "partition_interval_select",
+    ),
+    "OCCURRENCE_PARTITIONS_AHEAD": (3, "Number of future periods Occurrence partitions are created for", int),
+    "OCCURRENCE_PARTITION_DETACH": (False, "Detach expired Occurrence partitions instead of dropping them", bool),
 }
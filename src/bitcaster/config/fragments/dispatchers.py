@@ -0,0 +1,8 @@
+from ..settings import env
+
+DISPATCHER_ASYNC = env("DISPATCHER_ASYNC")
+DISPATCHER_ASYNC_CONCURRENCY = env("DISPATCHER_ASYNC_CONCURRENCY")
+DISPATCHER_ASYNC_WORKERS = env("DISPATCHER_ASYNC_WORKERS")
+
+WEBPUSH_ENCRYPTION_WORKERS = env("WEBPUSH_ENCRYPTION_WORKERS")
+WEBPUSH_PARALLEL_THRESHOLD = env("WEBPUSH_PARALLEL_THRESHOLD")
@@ -229,6 +229,7 @@ from .fragments.celery import *  # noqa
 from .fragments.constance import *  # noqa
 from .fragments.csp import *  # noqa
 from .fragments.debug_toolbar import *  # noqa
+from .fragments.dispatchers import *  # noqa
 from .fragments.flags import *  # noqa
 from .fragments.logging import *  # noqa
 from .fragments.rest_framework import *  # noqa
@@ -15,7 +15,7 @@ logger = logging.getLogger(__name__)
 
 
 class CacheKey:
-    DASHBOARDS_EVENTS: str = "dashboard_events"
+    OCCURRENCE_ROLLUP: str = "occurrence_rollup"
 
 
 class Bitcaster:
@@ -64,7 +64,12 @@ class Bitcaster:
         correlation_id: Optional[Any] = None,
         parent: "Optional[Occurrence]" = None,
     ) -> "Occurrence":
-        e: "Event" = cls.app.events.get(name=evt.value)
+        from bitcaster.cache.routes import routes
+
+        if route := routes.system(evt.value):
+            e: "Event" = route.as_event()
+        else:
+            e = cls.app.events.get(name=evt.value)
         return e.trigger(context=(context or {}), options=options or {}, cid=correlation_id, parent=parent)
 
     @classmethod
@@ -0,0 +1,100 @@
+import asyncio
+import atexit
+import inspect
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Coroutine, Hashable, Optional, TypeVar
+
+from django.conf import settings
+
+if TYPE_CHECKING:
+    import aiohttp
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+TIMEOUT = 10  # seconds, default total timeout of the pooled HTTP sessions
+
+
+class AsyncRuntime:
+    """Per-process event loop shared by the asynchronous dispatchers.
+
+    The loop runs forever in a daemon thread, so that HTTP sessions (and their connection pools)
+    survive between deliveries. It is started lazily, and again in forked worker processes, where
+    the thread of the parent does not exist. Clients and semaphores must only be used in the loop.
+    Dispatchers without a native asynchronous implementation run `send()` in the default executor of
+    the loop, a pool of `DISPATCHER_ASYNC_WORKERS` threads.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pid: Optional[int] = None
+        self._clients: dict[Hashable, tuple[Any, Any]] = {}
+        self._semaphores: dict[Hashable, asyncio.Semaphore] = {}
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                self._loop = asyncio.new_event_loop()
+                self._pid = os.getpid()
+                self._clients = {}
+                self._semaphores = {}
+                self._loop.set_default_executor(
+                    ThreadPoolExecutor(settings.DISPATCHER_ASYNC_WORKERS, thread_name_prefix="bitcaster-aio")
+                )
+                threading.Thread(target=self._loop.run_forever, name="bitcaster-aio", daemon=True).start()
+            return self._loop
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Run `coro` in the event loop and wait for its result. Must not be called from the loop itself."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def client(self, key: Hashable, factory: Callable[[], T], version: Any = None) -> T:
+        """Return the pooled client for `key`, created by `factory` the first time or when `version` changes."""
+        entry = self._clients.get(key)
+        if entry is None or entry[0] != version or getattr(entry[1], "closed", False):
+            if entry:
+                asyncio.ensure_future(self._close(entry[1]))
+            entry = self._clients[key] = (version, factory())
+        return entry[1]
+
+    def session(self, key: Hashable, version: Any = None) -> "aiohttp.ClientSession":
+        """Return a pooled `aiohttp.ClientSession`, ie. one per remote origin."""
+        import aiohttp
+
+        return self.client(key, lambda: aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=TIMEOUT)), version)
+
+    def semaphore(self, key: Hashable) -> asyncio.Semaphore:
+        """Return the semaphore bounding the concurrent sends for `key` (ie. a Channel)."""
+        if key not in self._semaphores:
+            self._semaphores[key] = asyncio.Semaphore(settings.DISPATCHER_ASYNC_CONCURRENCY)
+        return self._semaphores[key]
+
+    async def _close(self, client: Any) -> None:
+        try:
+            if close := getattr(client, "close", None):
+                if inspect.isawaitable(ret := close()):
+                    await ret
+        except Exception as e:  # pragma: no cover
+            logger.warning(f"Unable to close client: {e}")
+
+    async def _close_all(self) -> None:
+        clients, self._clients = self._clients, {}
+        await asyncio.gather(*(self._close(client) for __, client in clients.values()))
+
+    def close(self) -> None:
+        """Close all the pooled clients and stop the loop."""
+        if self._loop is None or self._pid != os.getpid() or not self._loop.is_running():
+            return
+        self.run(self._close_all())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop = None
+
+
+runtime = AsyncRuntime()
+atexit.register(runtime.close)
@@ -1,8 +1,24 @@
+import asyncio
 import enum
 import logging
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Type, cast
-
-from django.core.exceptions import ValidationError
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    ContextManager,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+    cast,
+)
+
+from django import db
 from django.db import models
 from django.forms import forms
 from django.http import HttpResponseRedirect
@@ -10,11 +26,15 @@ from django.utils.functional import cached_property, classproperty
 from django.utils.module_loading import import_string
 from strategy_field.registry import Registry
 
+from bitcaster.cache.configs import configs
 from bitcaster.constants import AddressType
 
+from .aio import runtime
+from .pool import connections
+
 if TYPE_CHECKING:
     from bitcaster.models import Assignment, Channel, Event, User
-    from bitcaster.types.dispatcher import DispatcherHandler, TDispatcherConfig
+    from bitcaster.types.dispatcher import DispatcherHandler
 
 logger = logging.getLogger(__name__)
 
@@ -68,6 +88,32 @@ class Payload:
         self.user = user
 
 
+class Envelope(NamedTuple):
+    address: str
+    payload: Payload
+    assignment: "Optional[Assignment]" = None
+
+
+def get_retry_after(value: Optional[str], default: float = 1) -> float:
+    """Return the number of seconds to wait from a `Retry-After` header (either seconds or an HTTP date)."""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return default
+
+
+class DispatchResult(NamedTuple):
+    address: str
+    success: bool
+    error: Optional[Exception] = None
+
+
 class DispatcherConfig(forms.Form):
     help_text = ""
 
@@ -98,6 +144,8 @@ class Dispatcher(metaclass=DispatcherMeta):
     channel: "Channel"
     protocol: MessageProtocol = MessageProtocol.PLAINTEXT
     need_subscription = False
+    local = False  # delivers to the database: always dispatched by the worker thread
+    async_capable = False  # `async_send()` is natively asynchronous and does not block the event loop
 
     def __init__(self, channel: "Channel") -> None:
         self.channel = channel
@@ -119,12 +167,22 @@ class Dispatcher(metaclass=DispatcherMeta):
             klass = self.backend
         return klass(fail_silently=False, **self.config)
 
+    def check_connection(self, connection: "DispatcherHandler") -> bool:
+        """Health check of a pooled connection that has been idle for a while."""
+        return True
+
+    def close_connection(self, connection: "DispatcherHandler") -> None:
+        if close := getattr(connection, "close", None):
+            close()
+
+    def connection(self) -> "ContextManager[DispatcherHandler]":
+        """Return a connection from the worker pool, to be used as context manager."""
+        return connections.connection(self)
+
     @property
-    def config(self) -> Dict[str, Any]:
-        cfg: "TDispatcherConfig" = self.config_class(data=self.channel.config)
-        if not cfg.is_valid():
-            raise ValidationError(cfg.errors)
-        return cfg.cleaned_data
+    def config(self) -> Mapping[str, Any]:
+        """The validated (read-only) configuration, cached per Channel version."""
+        return configs.get(self.config_class, self.channel.config, self.channel.pk, self.channel.version)
 
     @classproperty
     def name(cls) -> str:
@@ -133,6 +191,55 @@ class Dispatcher(metaclass=DispatcherMeta):
     def send(self, address: str, payload: Payload, assignment: "Optional[Assignment]" = None, **kwargs: Any) -> bool:
         raise NotImplementedError
 
+    def send_many(self, messages: Iterable[Envelope]) -> list[DispatchResult]:
+        """Send many messages at once and return the result of each one, in the same order.
+
+        Dispatchers whose provider supports batch sending should override this method.
+        """
+        results = []
+        for address, payload, assignment in messages:
+            try:
+                results.append(DispatchResult(address, bool(self.send(address, payload, assignment))))
+            except Exception as e:
+                logger.exception(e)
+                results.append(DispatchResult(address, False, e))
+        return results
+
+    async def async_send(
+        self, address: str, payload: Payload, assignment: "Optional[Assignment]" = None, **kwargs: Any
+    ) -> bool:
+        """Asynchronous `send()`.
+
+        Runs `send()` in the thread pool of the event loop, unless overridden by the dispatchers whose
+        provider can be reached with a native asynchronous client (see `async_capable`).
+        """
+
+        def send() -> bool:
+            try:
+                return self.send(address, payload, assignment, **kwargs)
+            finally:
+                db.connections.close_all()  # of this thread, if any has been opened
+
+        return await asyncio.get_running_loop().run_in_executor(None, send)
+
+    async def async_send_many(self, messages: Iterable[Envelope]) -> list[DispatchResult]:
+        """Asynchronous `send_many()`.
+
+        Messages are sent concurrently with `async_send()`, at most `DISPATCHER_ASYNC_CONCURRENCY`
+        at a time for each Channel. Results are returned in the same order of `messages`.
+        """
+        semaphore = runtime.semaphore(self.channel.pk)
+
+        async def _send(address: str, payload: Payload, assignment: "Optional[Assignment]") -> DispatchResult:
+            async with semaphore:
+                try:
+                    return DispatchResult(address, bool(await self.async_send(address, payload, assignment)))
+                except Exception as e:
+                    logger.exception(e)
+                    return DispatchResult(address, False, e)
+
+        return list(await asyncio.gather(*(_send(*envelope) for envelope in messages)))
+
     def subscribe(self, assignment: "Assignment", **kwargs: Any) -> HttpResponseRedirect:
         return HttpResponseRedirect(".")
 
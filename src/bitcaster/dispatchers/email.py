@@ -1,20 +1,38 @@
 import logging
-from typing import TYPE_CHECKING, Any, Optional, Type
+import smtplib
+from typing import TYPE_CHECKING, Any, Iterable, Optional, Type
 
+from anymail.backends.base import AnymailBaseBackend
+from anymail.exceptions import AnymailAPIError
 from django import forms
 from django.core.mail import EmailMultiAlternatives
+from django.core.mail.backends.smtp import EmailBackend as SMTPBackend
 from django.forms import PasswordInput
 from django.utils.translation import gettext_lazy as _
 
-from ..exceptions import DispatcherError
-from .base import Dispatcher, DispatcherConfig, MessageProtocol, Payload
+from ..exceptions import DispatcherError, DispatcherRateLimited
+from .base import (
+    Dispatcher,
+    DispatcherConfig,
+    DispatchResult,
+    Envelope,
+    MessageProtocol,
+    Payload,
+    get_retry_after,
+)
+from .pool import connections
 
 if TYPE_CHECKING:
     from bitcaster.models import Assignment
+    from bitcaster.types.dispatcher import DispatcherHandler
 
 
 logger = logging.getLogger(__name__)
 
+ANYMAIL_FAILURES = ("rejected", "failed", "invalid")
+# "service not available" and "try again later" replies, used by relays to throttle senders
+SMTP_TRY_LATER = (421, 450, 451)
+
 
 class EmailConfig(DispatcherConfig):
     host = forms.CharField(label=_("Host"))
@@ -34,24 +52,117 @@ class EmailDispatcher(Dispatcher):
     config_class: Type[DispatcherConfig] = EmailConfig
     backend = "django.core.mail.backends.smtp.EmailBackend"
 
+    def get_connection(self) -> "DispatcherHandler":
+        connection = super().get_connection()
+        connection.open()  # an already open connection is not closed by send_messages()
+        return connection
+
+    def check_connection(self, connection: "DispatcherHandler") -> bool:
+        if not isinstance(connection, SMTPBackend):
+            return True
+        try:
+            return connection.connection is not None and connection.connection.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def get_email(self, to: list[str], payload: Payload, connection: "DispatcherHandler") -> EmailMultiAlternatives:
+        subject: str = f"{self.channel.subject_prefix}{payload.subject or ''}"
+        email = EmailMultiAlternatives(
+            # headers={
+            #     "List-Unsubscribe": unsubscribe_url,
+            #     "X-Example-Header": "myapp",
+            # },
+            subject=subject or "",
+            body=payload.message,
+            from_email=self.channel.from_email,
+            to=to,
+            connection=connection,
+        )
+        if payload.html_message:
+            email.attach_alternative(payload.html_message, "text/html")
+        return email
+
     def send(self, address: str, payload: Payload, assignment: "Optional[Assignment]" = None, **kwargs: Any) -> bool:
         try:
-            subject: str = f"{self.channel.subject_prefix}{payload.subject or ''}"
-            email = EmailMultiAlternatives(
-                # headers={
-                #     "List-Unsubscribe": unsubscribe_url,
-                #     "X-Example-Header": "myapp",
-                # },
-                subject=subject or "",
-                body=payload.message,
-                from_email=self.channel.from_email,
-                to=[address],
-                connection=self.get_connection(),
-            )
-            if payload.html_message:
-                email.attach_alternative(payload.html_message, "text/html")
-            email.send()
+            with self.connection() as connection:
+                self.get_email([address], payload, connection).send()
             return True
         except Exception as e:
             logger.exception(e)
             raise DispatcherError(e)
+
+    def send_many(self, messages: Iterable[Envelope]) -> list[DispatchResult]:
+        messages = list(messages)
+        with self.connection() as connection:
+            if isinstance(connection, AnymailBaseBackend):
+                return self._send_anymail(connection, messages)
+            return self._send_smtp(connection, messages)
+
+    def _send_smtp(self, connection: "DispatcherHandler", messages: list[Envelope]) -> list[DispatchResult]:
+        # each message is sent on its own to get the result per address, but all share the same connection
+        results: list[DispatchResult] = []
+        reconnected = False
+        i = 0
+        while i < len(messages):
+            address, payload, __ = messages[i]
+            try:
+                sent = connection.send_messages([self.get_email([address], payload, connection)])
+                results.append(DispatchResult(address, bool(sent)))
+            except smtplib.SMTPServerDisconnected as e:
+                # the server may drop a long lived connection (idle timeout, messages per session): reopen it once
+                if not reconnected and self._reconnect(connection):
+                    reconnected = True
+                    continue
+                logger.exception(e)
+                results.extend(DispatchResult(envelope.address, False, DispatcherError(e)) for envelope in messages[i:])
+                break
+            except smtplib.SMTPResponseException as e:
+                logger.exception(e)
+                error = DispatcherRateLimited(get_retry_after(None), e) if e.smtp_code in SMTP_TRY_LATER else None
+                results.append(DispatchResult(address, False, error or DispatcherError(e)))
+            except Exception as e:
+                logger.exception(e)
+                results.append(DispatchResult(address, False, DispatcherError(e)))
+            i += 1
+        if not all(r.success for r in results):
+            connections.invalidate(self.channel.pk)
+        return results
+
+    def _reconnect(self, connection: "DispatcherHandler") -> bool:
+        try:
+            connection.close()
+            connection.open()
+            return True
+        except Exception as e:
+            logger.exception(e)
+            return False
+
+    def _send_anymail(self, connection: "DispatcherHandler", messages: list[Envelope]) -> list[DispatchResult]:
+        # identical payloads are sent as a single batch: `merge_data` makes the provider
+        # send a separate message to each recipient
+        batches: dict[tuple[str, str | None, str | None], list[int]] = {}
+        for i, (__, payload, __) in enumerate(messages):
+            batches.setdefault((payload.message, payload.subject, payload.html_message), []).append(i)
+
+        results: list[DispatchResult] = [None] * len(messages)  # type: ignore[list-item]
+        for indexes in batches.values():
+            addresses = [messages[i].address for i in indexes]
+            email = self.get_email(addresses, messages[indexes[0]].payload, connection)
+            if len(addresses) > 1:
+                email.merge_data = {address: {} for address in addresses}
+            try:
+                connection.send_messages([email])
+                recipients = email.anymail_status.recipients
+                for i, address in zip(indexes, addresses):
+                    status = getattr(recipients.get(address), "status", None)
+                    results[i] = DispatchResult(address, status not in ANYMAIL_FAILURES)
+            except Exception as e:
+                logger.exception(e)
+                error = DispatcherError(e)
+                if isinstance(e, AnymailAPIError) and e.status_code == 429:
+                    error = DispatcherRateLimited(
+                        get_retry_after(getattr(e.response, "headers", {}).get("Retry-After")), e
+                    )
+                for i, address in zip(indexes, addresses):
+                    results[i] = DispatchResult(address, False, error)
+        return results
@@ -1,17 +1,15 @@
-from typing import TYPE_CHECKING, Any, Dict, Optional
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Mapping, Optional
 
 from django import forms
-from django.core.exceptions import ValidationError
-from django.core.mail import EmailMultiAlternatives
 from django.core.mail.backends.smtp import EmailBackend
 from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 
-from .base import Dispatcher, DispatcherConfig, MessageProtocol, Payload
+from .base import DispatcherConfig, MessageProtocol, Payload
+from .email import EmailDispatcher
 
 if TYPE_CHECKING:
-    from bitcaster.types.dispatcher import TDispatcherConfig
-
     from ..models import Assignment
 
 
@@ -20,7 +18,7 @@ class GMailConfig(DispatcherConfig):
     password = forms.CharField(label=_("Password"), widget=forms.PasswordInput, required=False)
 
 
-class GMailDispatcher(Dispatcher):
+class GMailDispatcher(EmailDispatcher):
     slug = "gmail"
     verbose_name = "GMmail"
 
@@ -29,27 +27,16 @@ class GMailDispatcher(Dispatcher):
     protocol: MessageProtocol = MessageProtocol.EMAIL
 
     @cached_property
-    def config(self) -> Dict[str, Any]:
-        cfg: "TDispatcherConfig" = self.config_class(data=self.channel.config)
-        if not cfg.is_valid():
-            raise ValidationError(cfg.errors)
-        config = {
-            "host": "smtp.gmail.com",
-            "port": 587,
-            "use_tls": True,
-            **cfg.cleaned_data,
-        }
-        return config
+    def config(self) -> Mapping[str, Any]:
+        return MappingProxyType(
+            {
+                "host": "smtp.gmail.com",
+                "port": 587,
+                "use_tls": True,
+                **super().config,
+            }
+        )
 
     def send(self, address: str, payload: Payload, assignment: "Optional[Assignment]" = None, **kwargs: Any) -> bool:
-        subject: str = f"{self.channel.subject_prefix}{payload.subject or ''}"
-        email = EmailMultiAlternatives(
-            subject=subject,
-            body=payload.message,
-            from_email=self.channel.from_email,
-            to=[address],
-            connection=self.get_connection(),
-        )
-        if payload.html_message:
-            email.attach_alternative(payload.html_message, "text/html")
-        return email.send() > 0
+        with self.connection() as connection:
+            return self.get_email([address], payload, connection).send() > 0
@@ -1,7 +1,7 @@
 import logging
-from typing import TYPE_CHECKING, Any, Optional
+from typing import TYPE_CHECKING, Any, Iterable, Optional
 
-from .base import Dispatcher, MessageProtocol, Payload
+from .base import Dispatcher, DispatchResult, Envelope, MessageProtocol, Payload
 
 if TYPE_CHECKING:
     from ..models import Assignment
@@ -23,3 +23,13 @@ class BitcasterSysDispatcher(Dispatcher):
 
         LogMessage.objects.create(level=address, application=payload.event.application, message=payload.message)
         return True
+
+    def send_many(self, messages: Iterable[Envelope]) -> list[DispatchResult]:
+        from bitcaster.models.internal import LogMessage
+
+        messages = list(messages)
+        LogMessage.objects.bulk_create(
+            LogMessage(level=address, application=payload.event.application, message=payload.message)
+            for address, payload, __ in messages
+        )
+        return [DispatchResult(address, True) for address, __, __ in messages]
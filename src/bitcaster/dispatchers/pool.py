@@ -0,0 +1,112 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Callable, Iterator
+
+if TYPE_CHECKING:
+    from bitcaster.types.dispatcher import DispatcherHandler
+
+    from .base import Dispatcher
+
+logger = logging.getLogger(__name__)
+
+
+class PooledConnection:
+    __slots__ = ("handler", "version", "closer", "created", "last_used")
+
+    def __init__(self, handler: "DispatcherHandler", version: int, closer: Callable[[Any], None]) -> None:
+        self.handler = handler
+        self.version = version
+        self.closer = closer
+        self.created = self.last_used = time.monotonic()
+
+
+class ConnectionPool:
+    """Per-worker pool of dispatcher connections, one per Channel.
+
+    Connections are bound to the thread that opened them (SMTP connections and HTTP
+    sessions are not thread safe) and keyed by Channel pk. A connection is replaced when the
+    Channel version changes (ie. its config has been updated), when it has been idle for
+    more than `idle_timeout` seconds, when it is older than `max_lifetime` seconds or when
+    the dispatcher health check fails after `check_after` seconds of inactivity.
+    """
+
+    def __init__(self, idle_timeout: int = 60, max_lifetime: int = 600, check_after: int = 10) -> None:
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.check_after = check_after
+        self._local = threading.local()
+
+    @property
+    def entries(self) -> dict[int, PooledConnection]:
+        if not hasattr(self._local, "entries"):
+            self._local.entries = {}
+        return self._local.entries
+
+    def _close(self, entry: PooledConnection) -> None:
+        try:
+            entry.closer(entry.handler)
+        except Exception as e:  # pragma: no cover
+            logger.warning(f"Unable to close connection: {e}")
+
+    def _is_valid(self, dispatcher: "Dispatcher", entry: PooledConnection, now: float) -> bool:
+        if entry.version != dispatcher.channel.version:
+            return False
+        if now - entry.created > self.max_lifetime or now - entry.last_used > self.idle_timeout:
+            return False
+        if now - entry.last_used > self.check_after:
+            return dispatcher.check_connection(entry.handler)
+        return True
+
+    def sweep(self, now: float) -> None:
+        for pk, entry in list(self.entries.items()):
+            if now - entry.last_used > self.idle_timeout:
+                self.invalidate(pk)
+
+    def acquire(self, dispatcher: "Dispatcher") -> "DispatcherHandler":
+        pk = dispatcher.channel.pk
+        now = time.monotonic()
+        self.sweep(now)
+        entry = self.entries.get(pk)
+        if entry and not self._is_valid(dispatcher, entry, now):
+            self.invalidate(pk)
+            entry = None
+        if entry is None:
+            entry = self.entries[pk] = PooledConnection(
+                dispatcher.get_connection(), dispatcher.channel.version, dispatcher.close_connection
+            )
+        entry.last_used = now
+        return entry.handler
+
+    def invalidate(self, channel_pk: int) -> None:
+        """Forget the connection of the given Channel opened by the current thread.
+
+        Connections opened by other threads are replaced the next time they are used,
+        as the Channel version will not match anymore.
+        """
+        if entry := self.entries.pop(channel_pk, None):
+            self._close(entry)
+
+    def clear(self) -> None:
+        for pk in list(self.entries):
+            self.invalidate(pk)
+
+    @contextmanager
+    def connection(self, dispatcher: "Dispatcher") -> Iterator[Any]:
+        if dispatcher.channel.pk is None:  # unsaved channel: nothing to pool
+            handler = dispatcher.get_connection()
+            try:
+                yield handler
+            finally:
+                dispatcher.close_connection(handler)
+            return
+        handler = self.acquire(dispatcher)
+        try:
+            yield handler
+        except Exception:
+            self.invalidate(dispatcher.channel.pk)
+            raise
+
+
+connections = ConnectionPool()
@@ -1,19 +1,30 @@
 import logging
 from typing import TYPE_CHECKING, Any, Optional, Type
+from urllib.parse import urlsplit
 
 import requests
 from django import forms
 from django.utils.translation import gettext as _
 from requests import Response
 
-from ..exceptions import DispatcherError
-from .base import Dispatcher, DispatcherConfig, MessageProtocol, Payload
+from ..exceptions import DispatcherError, DispatcherRateLimited
+from .aio import runtime
+from .base import (
+    Dispatcher,
+    DispatcherConfig,
+    MessageProtocol,
+    Payload,
+    get_retry_after,
+)
 
 if TYPE_CHECKING:
     from ..models import Assignment
+    from ..types.dispatcher import DispatcherHandler
 
 logger = logging.getLogger(__name__)
 
+TIMEOUT = 10  # seconds, so that an unresponsive endpoint does not block the worker
+
 
 class SlackConfig(DispatcherConfig):
     url = forms.URLField(label=_("URL"), assume_scheme="https")
@@ -24,12 +35,33 @@ class SlackDispatcher(Dispatcher):
     slug = "slack"
     config_class: Type[DispatcherConfig] = SlackConfig
     protocol = MessageProtocol.PLAINTEXT
+    async_capable = True
+
+    def get_connection(self) -> "DispatcherHandler":
+        return requests.Session()
 
     def send(self, address: str, payload: Payload, assignment: "Optional[Assignment]" = None, **kwargs: Any) -> bool:
         try:
-            conn = requests.Session()
-            res: Response = conn.post(self.config["url"], json={"text": payload.message})
-            return res.status_code == 200
+            with self.connection() as session:
+                res: Response = session.post(self.config["url"], json={"text": payload.message}, timeout=TIMEOUT)
+        except Exception as e:
+            logger.exception(e)
+            raise DispatcherError(e)
+        if res.status_code == 429:
+            raise DispatcherRateLimited(get_retry_after(res.headers.get("Retry-After")), res.text)
+        return res.status_code == 200
+
+    async def async_send(
+        self, address: str, payload: Payload, assignment: "Optional[Assignment]" = None, **kwargs: Any
+    ) -> bool:
+        url = self.config["url"]
+        try:
+            session = runtime.session(urlsplit(url)._replace(path="", query="", fragment="").geturl())
+            async with session.post(url, json={"text": payload.message}) as res:
+                status, text, retry_after = res.status, await res.text(), res.headers.get("Retry-After")
         except Exception as e:
             logger.exception(e)
             raise DispatcherError(e)
+        if status == 429:
+            raise DispatcherRateLimited(get_retry_after(retry_after), text)
+        return status == 200
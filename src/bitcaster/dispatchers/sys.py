@@ -1,8 +1,9 @@
 from typing import TYPE_CHECKING, Any, Optional
 
-from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail import get_connection
 
-from .base import Dispatcher, MessageProtocol, Payload
+from .base import MessageProtocol, Payload
+from .email import EmailDispatcher
 
 if TYPE_CHECKING:
     from bitcaster.types.dispatcher import DispatcherHandler
@@ -10,7 +11,7 @@ if TYPE_CHECKING:
     from ..models import Assignment
 
 
-class SystemDispatcher(Dispatcher):
+class SystemDispatcher(EmailDispatcher):
     slug = "system-email"
     verbose_name = "System Email"
     config_class = None
@@ -18,17 +19,10 @@ class SystemDispatcher(Dispatcher):
     protocol: MessageProtocol = MessageProtocol.EMAIL
 
     def get_connection(self) -> "DispatcherHandler":
-        return get_connection()
+        connection = get_connection()
+        connection.open()
+        return connection
 
     def send(self, address: str, payload: Payload, assignment: "Optional[Assignment]" = None, **kwargs: Any) -> bool:
-        subject: str = f"{self.channel.subject_prefix}{payload.subject or ''}"
-        email = EmailMultiAlternatives(
-            subject=subject,
-            body=payload.message,
-            from_email=self.channel.from_email,
-            to=[address],
-            connection=self.get_connection(),
-        )
-        if payload.html_message:
-            email.attach_alternative(payload.html_message, "text/html")
-        return email.send() > 0
+        with self.connection() as connection:
+            return self.get_email([address], payload, connection).send() > 0
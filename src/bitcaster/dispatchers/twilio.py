@@ -1,19 +1,53 @@
 import logging
-from typing import TYPE_CHECKING, Any, Optional, Type
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, Mapping, Optional, Type
 
 from django import forms
 from django.utils.translation import gettext as _
 from twilio.base.exceptions import TwilioRestException
+from twilio.http.async_http_client import AsyncTwilioHttpClient
+from twilio.http.http_client import TwilioHttpClient
+from twilio.http.response import Response
 from twilio.rest import Client
 
-from ..exceptions import DispatcherError
-from .base import Dispatcher, DispatcherConfig, MessageProtocol, Payload
+from ..exceptions import DispatcherError, DispatcherRateLimited
+from .aio import TIMEOUT, runtime
+from .base import (
+    Dispatcher,
+    DispatcherConfig,
+    MessageProtocol,
+    Payload,
+    get_retry_after,
+)
 
 if TYPE_CHECKING:
     from ..models import Assignment
+    from ..types.dispatcher import DispatcherHandler
 
 logger = logging.getLogger(__name__)
 
+# TwilioRestException does not carry the response headers: the clients below record them here
+response_headers: ContextVar[Optional[Mapping[str, str]]] = ContextVar("twilio_response_headers", default=None)
+
+
+class HttpClient(TwilioHttpClient):
+    def request(self, *args: Any, **kwargs: Any) -> Response:
+        response = super().request(*args, **kwargs)
+        response_headers.set(response.headers)
+        return response
+
+
+class AsyncHttpClient(AsyncTwilioHttpClient):
+    async def request(self, *args: Any, **kwargs: Any) -> Response:
+        response = await super().request(*args, **kwargs)
+        response_headers.set(response.headers)
+        return response
+
+
+def rate_limited(e: TwilioRestException) -> DispatcherRateLimited:
+    headers = response_headers.get() or {}
+    return DispatcherRateLimited(get_retry_after(headers.get("Retry-After")), e)
+
 
 class TwilioConfig(DispatcherConfig):
     sid = forms.CharField(label=_("SID"))
@@ -27,18 +61,47 @@ class TwilioSMS(Dispatcher):
     verbose_name = "SMS (Twilio)"
     config_class: Type[DispatcherConfig] = TwilioConfig
     protocol = MessageProtocol.SMS
+    async_capable = True
+
+    def get_connection(self) -> "DispatcherHandler":
+        return Client(username=self.config["sid"], password=self.config["token"], http_client=HttpClient())
+
+    def close_connection(self, connection: "DispatcherHandler") -> None:
+        if session := getattr(connection.http_client, "session", None):
+            session.close()
 
     def send(self, address: str, payload: Payload, assignment: "Optional[Assignment]" = None, **kwargs: Any) -> bool:
+        response_headers.set(None)
         try:
-            number = self.config.pop("number")
-            client = Client(username=self.config["sid"], password=self.config["token"])
-            client.messages.create(
-                body=payload.message,
-                from_=number,
-                to=address,
-            )
+            with self.connection() as client:
+                client.messages.create(
+                    body=payload.message,
+                    from_=self.config["number"],
+                    to=address,
+                )
+
+            return True
+        except TwilioRestException as e:
+            if e.status == 429:
+                raise rate_limited(e)
+            logger.exception(e)
+            raise DispatcherError(e)
 
+    def get_async_client(self) -> Client:
+        # credentials are sent with each request: the HTTP client (and its pool) is shared by all the Channels
+        http_client = runtime.client("twilio", lambda: AsyncHttpClient(timeout=TIMEOUT))
+        return Client(username=self.config["sid"], password=self.config["token"], http_client=http_client)
+
+    async def async_send(
+        self, address: str, payload: Payload, assignment: "Optional[Assignment]" = None, **kwargs: Any
+    ) -> bool:
+        client = self.get_async_client()
+        response_headers.set(None)
+        try:
+            await client.messages.create_async(body=payload.message, from_=self.config["number"], to=address)
             return True
         except TwilioRestException as e:
+            if e.status == 429:
+                raise rate_limited(e)
             logger.exception(e)
             raise DispatcherError(e)
@@ -1,4 +1,4 @@
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
     from bitcaster.models.mixins import LockMixin
@@ -8,13 +8,38 @@ class DispatcherError(Exception):
     pass
 
 
+class DispatcherDeferred(DispatcherError):
+    """The message has not been sent, but it can be sent again after `retry_after` seconds."""
+
+    def __init__(self, retry_after: float, *args: Any) -> None:
+        super().__init__(*args)
+        self.retry_after = retry_after
+
+
+class DispatcherRateLimited(DispatcherDeferred):
+    """The message has not been sent because of a rate limit."""
+
+
+class DispatcherUnavailable(DispatcherDeferred):
+    """The message has not been sent because the circuit of the channel is open."""
+
+
+class SubscriptionExpired(DispatcherError):
+    """The subscription of the recipient is gone (ie. HTTP 404/410 from a push service): do not send to it anymore."""
+
+
 class InvalidGrantError(Exception):
     pass
 
 
 class LockError(Exception):
-    def __init__(self, locked: "LockMixin"):
+    def __init__(self, locked: "LockMixin | str"):
         self.locked = locked
 
     def __str__(self) -> str:
-        return f"Unable to process this event. {self.locked.__class__.__name__} locked"
+        name = self.locked if isinstance(self.locked, str) else self.locked.__class__.__name__
+        return f"Unable to process this event. {name} locked"
+
+
+class InactiveError(Exception):
+    """The event is not active or has no channels: its occurrences would never notify anybody."""
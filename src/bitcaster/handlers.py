@@ -2,10 +2,11 @@ import logging
 from typing import Any
 
 from django.contrib.auth import user_logged_in
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
 from bitcaster import models
+from bitcaster.dispatchers.pool import connections
 from bitcaster.models import Organization, Project
 from bitcaster.state import state
 
@@ -27,6 +28,12 @@ def save_last_choices(sender: Any, instance: Any, **kwargs: Any) -> None:
         state.add_cookie("application", instance.application.pk)
 
 
+@receiver(post_save, sender=models.Channel, dispatch_uid="invalidate_channel_connection")
+@receiver(post_delete, sender=models.Channel, dispatch_uid="invalidate_channel_connection")
+def invalidate_channel_connection(sender: Any, instance: models.Channel, **kwargs: Any) -> None:
+    connections.invalidate(instance.pk)
+
+
 @receiver(user_logged_in, sender=models.User)
 def on_login(sender: Any, user: models.User, **kwargs: Any) -> None:
     if not state.get_cookie("organization"):  # pragma: no branch
@@ -0,0 +1,53 @@
+from typing import TYPE_CHECKING
+
+from constance import config
+from django.core.management import BaseCommand, CommandError, CommandParser
+from django.db import connection
+
+from bitcaster.utils import partitions
+
+if TYPE_CHECKING:
+    from typing import Any
+
+
+class Command(BaseCommand):
+    help = "Manage the (optional) time based partitions of the Occurrence table"
+
+    def add_arguments(self, parser: "CommandParser") -> None:
+        parser.add_argument(
+            "--setup", action="store_true", help="Convert the Occurrence table into a partitioned table"
+        )
+        parser.add_argument(
+            "--interval",
+            choices=partitions.INTERVALS,
+            help="Period covered by each partition (default: OCCURRENCE_PARTITION_INTERVAL)",
+        )
+        parser.add_argument(
+            "--ahead", type=int, help="Number of future periods to create (default: OCCURRENCE_PARTITIONS_AHEAD)"
+        )
+        parser.add_argument("--drop-expired", action="store_true", help="Drop the expired partitions")
+        parser.add_argument("--detach", action="store_true", help="Only detach the expired partitions")
+        parser.add_argument("--list", action="store_true", help="List the partitions")
+
+    def handle(self, *args: "Any", **options: "Any") -> None:
+        if connection.vendor != "postgresql":
+            raise CommandError("Occurrence partitioning is only supported on PostgreSQL")
+        interval = options["interval"] or config.OCCURRENCE_PARTITION_INTERVAL
+        ahead = config.OCCURRENCE_PARTITIONS_AHEAD if options["ahead"] is None else options["ahead"]
+
+        if options["setup"]:
+            if partitions.is_partitioned():
+                raise CommandError("Occurrence table is already partitioned")
+            p = partitions.setup(interval)
+            self.stdout.write(self.style.SUCCESS(f"Occurrence table partitioned. Existing rows moved to {p.name}"))
+        elif not partitions.is_partitioned():
+            raise CommandError("Occurrence table is not partitioned. Use --setup first")
+
+        for p in partitions.create_partitions(interval, ahead):
+            self.stdout.write(f"Created {p.name} [{p.lower:%Y-%m-%d} - {p.upper:%Y-%m-%d})")
+        if options["drop_expired"] or options["detach"]:
+            for p in partitions.drop_expired(detach=options["detach"]):
+                self.stdout.write(f"{'Detached' if options['detach'] else 'Dropped'} {p.name}")
+        if options["list"]:
+            for p in partitions.get_partitions():
+                self.stdout.write(f"{p.name} [{p.lower or '-inf'} - {p.upper or '+inf'})")
@@ -221,6 +221,10 @@ class Command(BaseCommand):
                 name="occurence_processor",
                 defaults={"task": "bitcaster.tasks.schedule_occurrences", "crontab": schedule_every_minute},
             )
+            PeriodicTask.objects.get_or_create(
+                name="rollup_occurrences",
+                defaults={"task": "bitcaster.tasks.rollup_occurrences", "crontab": schedule_every_minute},
+            )
 
             schedule_every_night, _ = CrontabSchedule.objects.get_or_create(hour=3, minute=30)
             PeriodicTask.objects.get_or_create(
@@ -0,0 +1,92 @@
+# Generated by Django 5.1.1 on 2026-10-18 19:57
+
+import concurrency.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def move_delivered(apps, schema_editor):  # type: ignore[no-untyped-def]
+    Assignment = apps.get_model("bitcaster", "Assignment")
+    Delivery = apps.get_model("bitcaster", "Delivery")
+    Occurrence = apps.get_model("bitcaster", "Occurrence")
+
+    for o in Occurrence.objects.filter(data__has_key="delivered").iterator():
+        delivered = o.data.pop("delivered", [])
+        o.data.pop("recipients", None)
+        deliveries = [
+            Delivery(
+                occurrence=o,
+                assignment_id=pk,
+                channel_id=channel_id,
+                status="DELIVERED",
+                attempts=1,
+                delivered=o.last_updated,
+            )
+            for pk, channel_id in Assignment.objects.filter(pk__in=delivered).values_list("pk", "channel_id")
+        ]
+        Delivery.objects.bulk_create(deliveries, ignore_conflicts=True)
+        o.recipients = len(deliveries)
+        o.save(update_fields=["data", "recipients"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bitcaster", "0003_alter_apikey_key_alter_channel_protocol_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Delivery",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("version", concurrency.fields.IntegerVersionField(default=0, help_text="record revision number")),
+                ("last_updated", models.DateTimeField(auto_now=True)),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("PENDING", "Pending"), ("DELIVERED", "Delivered"), ("FAILED", "Failed")],
+                        default="PENDING",
+                        max_length=20,
+                    ),
+                ),
+                ("attempts", models.IntegerField(default=0, help_text="Number of dispatch attempts")),
+                (
+                    "delivered",
+                    models.DateTimeField(blank=True, help_text="Timestamp of the successful dispatch", null=True),
+                ),
+                (
+                    "assignment",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="deliveries",
+                        to="bitcaster.assignment",
+                    ),
+                ),
+                (
+                    "channel",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="deliveries", to="bitcaster.channel"
+                    ),
+                ),
+                (
+                    "occurrence",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="deliveries",
+                        to="bitcaster.occurrence",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Delivery",
+                "verbose_name_plural": "Deliveries",
+                "indexes": [models.Index(fields=["occurrence", "status"], name="delivery_occurrence_status")],
+                "constraints": [
+                    models.UniqueConstraint(fields=("occurrence", "assignment", "channel"), name="delivery_unique")
+                ],
+            },
+        ),
+        migrations.RunPython(move_delivered, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.1 on 2026-10-18 21:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bitcaster", "0004_delivery"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="occurrence",
+            name="claimed_until",
+            field=models.DateTimeField(
+                blank=True, editable=False, help_text="The Occurrence is queued for processing until then", null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="occurrence",
+            index=models.Index(fields=["status", "claimed_until"], name="occurrence_claim"),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.1 on 2026-10-18 21:46
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bitcaster", "0005_occurrence_claimed_until"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="occurrence",
+            name="timestamp",
+            field=models.DateTimeField(
+                blank=True,
+                default=django.utils.timezone.now,
+                editable=False,
+                help_text="Timestamp when occurrence has been created.",
+            ),
+        ),
+    ]
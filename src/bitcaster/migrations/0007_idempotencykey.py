@@ -0,0 +1,49 @@
+# Generated by Django 5.1.1 on 2026-10-18 22:14
+
+import concurrency.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bitcaster", "0006_occurrence_timestamp"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IdempotencyKey",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("version", concurrency.fields.IntegerVersionField(default=0, help_text="record revision number")),
+                ("last_updated", models.DateTimeField(auto_now=True)),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("key", models.CharField(max_length=255)),
+                ("expires", models.DateTimeField(help_text="The key can be reused after this time")),
+                (
+                    "event",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="idempotency_keys",
+                        to="bitcaster.event",
+                    ),
+                ),
+                (
+                    "occurrence",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="bitcaster.occurrence",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Idempotency Key",
+                "verbose_name_plural": "Idempotency Keys",
+                "indexes": [models.Index(fields=["expires"], name="idempotency_key_expires")],
+                "constraints": [models.UniqueConstraint(fields=("event", "key"), name="idempotency_key_unique")],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 23:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bitcaster", "0007_idempotencykey"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="delivery",
+            name="next_attempt",
+            field=models.DateTimeField(blank=True, help_text="Timestamp of the scheduled retry", null=True),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.1 on 2026-10-18 23:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bitcaster", "0008_delivery_next_attempt"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="channel",
+            name="rate_burst",
+            field=models.PositiveIntegerField(
+                default=1, help_text="Max number of messages sent at once without exceeding the rate limit"
+            ),
+        ),
+        migrations.AddField(
+            model_name="channel",
+            name="rate_limit",
+            field=models.FloatField(
+                blank=True, help_text="Max number of messages sent per second (empty means no limit)", null=True
+            ),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.1.1 on 2026-10-19 00:58
+
+import concurrency.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bitcaster", "0009_channel_rate_limit"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OccurrenceRollup",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("version", concurrency.fields.IntegerVersionField(default=0, help_text="record revision number")),
+                ("last_updated", models.DateTimeField(auto_now=True)),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("NEW", "New"), ("PROCESSED", "Processed"), ("FAILED", "Failed")], max_length=20
+                    ),
+                ),
+                ("period", models.CharField(choices=[("minute", "Minute"), ("hour", "Hour")], max_length=10)),
+                ("bucket", models.DateTimeField(help_text="Beginning of the counted period")),
+                ("count", models.IntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "Occurrence Rollup",
+                "verbose_name_plural": "Occurrence Rollups",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="occurrence",
+            index=models.Index(fields=["last_updated"], name="occurrence_last_updated"),
+        ),
+        migrations.AddField(
+            model_name="occurrencerollup",
+            name="event",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, related_name="+", to="bitcaster.event"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="occurrencerollup",
+            index=models.Index(fields=["period", "bucket"], name="occurrence_rollup_bucket"),
+        ),
+        migrations.AddConstraint(
+            model_name="occurrencerollup",
+            constraint=models.UniqueConstraint(
+                fields=("event", "status", "period", "bucket"), name="occurrence_rollup_unique"
+            ),
+        ),
+    ]
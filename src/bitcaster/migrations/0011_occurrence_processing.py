@@ -0,0 +1,40 @@
+# Generated by Django 5.1.1 on 2026-10-19 01:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bitcaster", "0010_occurrence_rollup"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="occurrence",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("NEW", "New"),
+                    ("PROCESSING", "Processing"),
+                    ("PROCESSED", "Processed"),
+                    ("FAILED", "Failed"),
+                ],
+                default="NEW",
+                max_length=20,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="occurrencerollup",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("NEW", "New"),
+                    ("PROCESSING", "Processing"),
+                    ("PROCESSED", "Processed"),
+                    ("FAILED", "Failed"),
+                ],
+                max_length=20,
+            ),
+        ),
+    ]
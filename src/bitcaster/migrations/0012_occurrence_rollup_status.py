@@ -0,0 +1,30 @@
+# Generated by Django 5.1.1 on 2026-10-19 02:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bitcaster", "0011_occurrence_processing"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="occurrence",
+            name="rollup_status",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("NEW", "New"),
+                    ("PROCESSING", "Processing"),
+                    ("PROCESSED", "Processed"),
+                    ("FAILED", "Failed"),
+                ],
+                editable=False,
+                help_text="Status counted by the Occurrence Rollups",
+                max_length=20,
+                null=True,
+            ),
+        ),
+    ]
@@ -4,9 +4,11 @@ from .address import Address  # noqa
 from .application import Application  # noqa
 from .assignment import Assignment  # noqa
 from .channel import Channel  # noqa
+from .delivery import Delivery  # noqa
 from .distribution import DistributionList  # noqa
 from .event import Event  # noqa
 from .group import Group  # noqa
+from .idempotency import IdempotencyKey  # noqa
 from .internal import LogMessage  # noqa
 from .key import ApiKey  # noqa
 from .log import LogEntry  # noqa
@@ -17,6 +19,7 @@ from .notification import Notification  # noqa
 from .occurrence import Occurrence  # noqa
 from .organization import Organization  # noqa
 from .project import Project  # noqa
+from .rollup import OccurrenceRollup  # noqa
 from .user import User  # noqa
 from .userrole import UserRole  # noqa
 
@@ -26,9 +29,11 @@ __all__ = [
     "ApiKey",
     "Assignment",
     "Channel",
+    "Delivery",
     "DistributionList",
     "Event",
     "Group",
+    "IdempotencyKey",
     "LogEntry",
     "LogMessage",
     "MediaFile",
@@ -36,6 +41,7 @@ __all__ = [
     "Monitor",
     "Notification",
     "Occurrence",
+    "OccurrenceRollup",
     "Organization",
     "Organization",
     "Project",
@@ -1,5 +1,6 @@
 from typing import TYPE_CHECKING, Any, Iterable, Optional
 
+from constance import config
 from django.db import models
 from django.db.models import Q
 from django.db.models.base import ModelBase
@@ -7,6 +8,8 @@ from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 from strategy_field.fields import StrategyField
 
+from bitcaster.cache.breaker import CircuitBreaker
+from bitcaster.cache.ratelimit import RateLimiter
 from bitcaster.dispatchers.base import Dispatcher, MessageProtocol, dispatcherManager
 
 from .mixins import BitcasterBaseModel, LockMixin, ScopedManager
@@ -40,6 +43,12 @@ class Channel(LockMixin, BitcasterBaseModel):
     config = models.JSONField(blank=True, default=dict)
     protocol = models.CharField(choices=MessageProtocol.choices, max_length=50)
     active = models.BooleanField(default=True)
+    rate_limit = models.FloatField(
+        blank=True, null=True, help_text=_("Max number of messages sent per second (empty means no limit)")
+    )
+    rate_burst = models.PositiveIntegerField(
+        default=1, help_text=_("Max number of messages sent at once without exceeding the rate limit")
+    )
     parent = models.ForeignKey("self", blank=True, null=True, related_name="children", on_delete=models.CASCADE)
 
     objects = ChannelManager()
@@ -85,6 +94,26 @@ class Channel(LockMixin, BitcasterBaseModel):
         else:
             return self.name, None, *self.organization.natural_key()
 
+    @cached_property
+    def breaker(self) -> "Optional[CircuitBreaker]":
+        """Circuit breaker shared by all the workers, unless disabled (`CIRCUIT_BREAKER_FAILURE_RATE` is 0)."""
+        if config.CIRCUIT_BREAKER_FAILURE_RATE > 0:
+            return CircuitBreaker(
+                f"channel:{self.pk}",
+                config.CIRCUIT_BREAKER_FAILURE_RATE,
+                config.CIRCUIT_BREAKER_MIN_REQUESTS,
+                config.CIRCUIT_BREAKER_WINDOW,
+                config.CIRCUIT_BREAKER_COOLDOWN,
+            )
+        return None
+
+    @cached_property
+    def limiter(self) -> "Optional[RateLimiter]":
+        """Rate limiter shared by all the workers, if the channel has a rate limit."""
+        if self.rate_limit:
+            return RateLimiter(f"channel:{self.pk}", self.rate_limit, self.rate_burst)
+        return None
+
     @cached_property
     def from_email(self) -> str:
         if self.project:
@@ -0,0 +1,92 @@
+import logging
+import random
+from typing import Any, Optional
+
+from constance import config
+from django.db import models
+from django.utils.translation import gettext as _
+
+from .mixins import BitcasterBaselManager, BitcasterBaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class DeliveryManager(BitcasterBaselManager["Delivery"]):
+
+    def get_by_natural_key(
+        self,
+        timestamp: str,
+        evt: str,
+        app: str,
+        prj: str,
+        org: str,
+        user: str,
+        addr: str,
+        ch: str,
+        ch_prj: Optional[str],
+        ch_org: str,
+        *args: Any,
+    ) -> "Delivery":
+        filters: dict[str, Any] = {}
+        if ch_prj:
+            filters["channel__project__slug"] = ch_prj
+        else:
+            filters["channel__project"] = None
+
+        return self.get(
+            occurrence__timestamp=timestamp,
+            occurrence__event__application__project__organization__slug=org,
+            occurrence__event__application__project__slug=prj,
+            occurrence__event__application__slug=app,
+            occurrence__event__slug=evt,
+            assignment__address__user__username=user,
+            assignment__address__name=addr,
+            channel__organization__slug=ch_org,
+            channel__name=ch,
+            **filters,
+        )
+
+
+class Delivery(BitcasterBaseModel):
+    class Status(models.TextChoices):
+        PENDING = "PENDING", _("Pending")
+        DELIVERED = "DELIVERED", _("Delivered")
+        FAILED = "FAILED", _("Failed")
+
+    occurrence = models.ForeignKey("bitcaster.Occurrence", on_delete=models.CASCADE, related_name="deliveries")
+    assignment = models.ForeignKey("bitcaster.Assignment", on_delete=models.CASCADE, related_name="deliveries")
+    channel = models.ForeignKey("bitcaster.Channel", on_delete=models.CASCADE, related_name="deliveries")
+    status = models.CharField(choices=Status, default=Status.PENDING.value, max_length=20)
+    attempts = models.IntegerField(default=0, help_text=_("Number of dispatch attempts"))
+    delivered = models.DateTimeField(blank=True, null=True, help_text=_("Timestamp of the successful dispatch"))
+    next_attempt = models.DateTimeField(blank=True, null=True, help_text=_("Timestamp of the scheduled retry"))
+
+    objects = DeliveryManager()
+
+    class Meta:
+        verbose_name = _("Delivery")
+        verbose_name_plural = _("Deliveries")
+        constraints = [
+            models.UniqueConstraint(fields=("occurrence", "assignment", "channel"), name="delivery_unique"),
+        ]
+        indexes = [
+            models.Index(fields=("occurrence", "status"), name="delivery_occurrence_status"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.assignment} - {self.status}"
+
+    def natural_key(self) -> tuple[str | None, ...]:
+        return *self.occurrence.natural_key(), *self.assignment.natural_key()
+
+    @staticmethod
+    def get_retry_delay(attempts: int) -> float:
+        """Return the number of seconds to wait before the next attempt, or 0 if no more attempts are allowed.
+
+        The delay grows exponentially from `DELIVERY_RETRY_DELAY` up to `DELIVERY_RETRY_MAX_DELAY` and is
+        randomized (between half and the whole of it) so that recipients failed together are not retried together.
+        """
+        if attempts >= config.DELIVERY_MAX_ATTEMPTS:
+            return 0
+        delay = min(config.DELIVERY_RETRY_MAX_DELAY, config.DELIVERY_RETRY_DELAY * 2 ** (attempts - 1))
+        return random.uniform(delay / 2, delay)
@@ -1,7 +1,10 @@
-from typing import TYPE_CHECKING, Any, Optional
+import logging
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any, Iterable, Optional
 
-from django.db import models
-from django.db.models import QuerySet
+from django.db import IntegrityError, models, transaction
+from django.db.models import Max, QuerySet
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from ..constants import Bitcaster
@@ -14,7 +17,11 @@ from .notification import Notification
 if TYPE_CHECKING:
     from bitcaster.models import DistributionList, Message, Occurrence
 
-    from .occurrence import OccurrenceOptions
+    from .occurrence import OccurrenceOptions, TriggerOptions
+
+logger = logging.getLogger(__name__)
+
+TRIGGER_MANY_ATTEMPTS = 3
 
 
 class EventManager(BitcasterBaselManager["Event"]):
@@ -88,6 +95,40 @@ class Event(SlugMixin, LockMixin, BitcasterBaseModel):
             event=self, context=context, options=options or {}, correlation_id=cid, parent=parent
         )
 
+    def trigger_many(self, triggers: "Iterable[TriggerOptions]") -> "list[Occurrence]":
+        """Create, with a single INSERT, one Occurrence for each of `triggers`.
+
+        Each Occurrence gets its own timestamp, as (timestamp, event) is unique: consecutive
+        microseconds starting from now or, if a concurrent batch already took them, from the latest
+        Occurrence of the event. A conflicting INSERT is retried up to `TRIGGER_MANY_ATTEMPTS` times,
+        then the `IntegrityError` is raised.
+        """
+        from .occurrence import Occurrence
+
+        triggers = list(triggers)
+        for attempt in range(1, TRIGGER_MANY_ATTEMPTS + 1):
+            start = timezone.now()
+            if latest := self.occurrence_set.filter(timestamp__gte=start).aggregate(Max("timestamp"))["timestamp__max"]:
+                start = latest + timedelta(microseconds=1)
+            occurrences = [
+                Occurrence(
+                    event=self,
+                    timestamp=start + timedelta(microseconds=i),
+                    context=t.get("context", {}),
+                    options=t.get("options") or {},
+                    correlation_id=str(t["cid"]) if t.get("cid") else None,
+                )
+                for i, t in enumerate(triggers)
+            ]
+            try:
+                with transaction.atomic():
+                    return Occurrence.objects.bulk_create(occurrences)
+            except IntegrityError:
+                if attempt == TRIGGER_MANY_ATTEMPTS:
+                    raise
+                logger.warning(f"Timestamps of {self} taken by a concurrent batch, retrying ({attempt})")
+        return []  # pragma: no cover
+
     def create_message(self, name: str, channel: Channel, defaults: Optional[dict[str, Any]] = None) -> "Message":
         return self.messages.get_or_create(
             name=name,
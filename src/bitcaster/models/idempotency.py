@@ -0,0 +1,96 @@
+import logging
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any, Optional
+
+from constance import config
+from django.core.cache import cache
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
+from django.utils.translation import gettext as _
+
+from .mixins import BitcasterBaselManager, BitcasterBaseModel
+
+if TYPE_CHECKING:
+    from .event import Event
+
+logger = logging.getLogger(__name__)
+
+
+class IdempotencyKeyManager(BitcasterBaselManager["IdempotencyKey"]):
+
+    def get_by_natural_key(self, key: str, evt: str, app: str, prj: str, org: str) -> "IdempotencyKey":
+        return self.get(
+            key=key,
+            event__application__project__organization__slug=org,
+            event__application__project__slug=prj,
+            event__application__slug=app,
+            event__slug=evt,
+        )
+
+    def valid(self) -> models.QuerySet["IdempotencyKey"]:
+        return self.filter(expires__gt=timezone.now())
+
+    def expired(self) -> models.QuerySet["IdempotencyKey"]:
+        return self.filter(expires__lte=timezone.now())
+
+    @staticmethod
+    def cache_key(event: "Event", key: str) -> str:
+        return f"idempotency:{event.pk}:{key}"
+
+    def lookup(self, event: "Event", key: str) -> Optional[int]:
+        """Return the pk of the Occurrence triggered with `key`, if it is not expired.
+
+        The shared cache is checked before the database.
+        """
+        if occurrence_id := cache.get(self.cache_key(event, key)):
+            return occurrence_id
+        if found := self.valid().filter(event=event, key=key).values_list("occurrence_id", "expires").first():
+            occurrence_id, expires = found
+            cache.set(self.cache_key(event, key), occurrence_id, (expires - timezone.now()).total_seconds())
+            return occurrence_id
+        return None
+
+    def trigger(self, event: "Event", key: str, **kwargs: Any) -> tuple[int, bool]:
+        """Trigger `event` only once for `key` within `IDEMPOTENCY_KEY_TTL` seconds.
+
+        Returns the pk of the Occurrence and whether it has been created by this call
+        or by a previous one with the same key.
+        """
+        if occurrence_id := self.lookup(event, key):
+            return occurrence_id, False
+        ttl = timedelta(seconds=config.IDEMPOTENCY_KEY_TTL)
+        try:
+            with transaction.atomic():
+                self.expired().filter(event=event, key=key).delete()
+                occurrence = event.trigger(**kwargs)
+                self.create(event=event, key=key, occurrence=occurrence, expires=timezone.now() + ttl)
+        except IntegrityError:  # concurrent request with the same key
+            if occurrence_id := self.lookup(event, key):
+                return occurrence_id, False
+            raise
+        cache.set(self.cache_key(event, key), occurrence.pk, ttl.total_seconds())
+        return occurrence.pk, True
+
+
+class IdempotencyKey(BitcasterBaseModel):
+    event = models.ForeignKey("bitcaster.Event", on_delete=models.CASCADE, related_name="idempotency_keys")
+    key = models.CharField(max_length=255)
+    # not enforced by the database, as Occurrence can be partitioned (see bitcaster.utils.partitions)
+    occurrence = models.ForeignKey(
+        "bitcaster.Occurrence", on_delete=models.CASCADE, related_name="+", db_constraint=False
+    )
+    expires = models.DateTimeField(help_text=_("The key can be reused after this time"))
+
+    objects = IdempotencyKeyManager()
+
+    class Meta:
+        verbose_name = _("Idempotency Key")
+        verbose_name_plural = _("Idempotency Keys")
+        constraints = [models.UniqueConstraint(fields=("event", "key"), name="idempotency_key_unique")]
+        indexes = [models.Index(fields=("expires",), name="idempotency_key_expires")]
+
+    def __str__(self) -> str:
+        return self.key
+
+    def natural_key(self) -> tuple[str, ...]:
+        return self.key, *self.event.natural_key()
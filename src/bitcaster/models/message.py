@@ -1,10 +1,12 @@
 import logging
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 from django.db import models
 from django.db.models import UniqueConstraint
+from django.template import Context
 from django.utils.translation import gettext_lazy as _
 
+from ..cache.templates import templates
 from ..dispatchers.base import Capability
 from .channel import Channel
 from .event import Event
@@ -104,10 +106,11 @@ class Message(Scoped3Mixin, BitcasterBaseModel):
     def support_text(self) -> bool:
         return self.channel.dispatcher.protocol.has_capability(Capability.TEXT)
 
-    #
-    # def render(self, context: Dict[str, Any]) -> str:
-    #     tpl = Template(self.content)
-    #     return tpl.render(Context(context))
+    def render(self, field: str, context: dict[str, Any]) -> str:
+        """Render `field` (subject, content or html_content) using the compiled templates cache."""
+        if tpl := templates.get(self, field):
+            return str(tpl.render(Context(context)))
+        return ""
 
     def clone(self, channel: Channel) -> "Message":
         return Message.objects.get_or_create(
@@ -1,33 +1,46 @@
 import logging
-from typing import TYPE_CHECKING, Any, Optional
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Optional
 
-import jmespath
-import yaml
+from constance import config
+from django.conf import settings
 from django.contrib.postgres.fields import ArrayField
 from django.db import models
-from django.db.models import QuerySet
+from django.db.models import Exists, OuterRef, QuerySet, Subquery
+from django.db.models.functions import Coalesce
 from django.utils.functional import cached_property
 from django.utils.translation import gettext as _
 
-from ..dispatchers.base import Payload
-from ..utils.shortcuts import render_string
+from ..dispatchers.aio import runtime
+from ..dispatchers.base import DispatchResult, Envelope, Payload
+from ..utils.filters import compile_filter, filters, plans
 from .assignment import Assignment
 from .distribution import DistributionList
 from .mixins import BaseQuerySet, BitcasterBaselManager, BitcasterBaseModel
 
 if TYPE_CHECKING:
     from bitcaster.dispatchers.base import Dispatcher
-    from bitcaster.models import Address, Application, Channel, Message
+    from bitcaster.models import Address, Application, Channel, Message, Occurrence
     from bitcaster.types.core import YamlPayload
 
 logger = logging.getLogger(__name__)
 
 
 class NotificationQuerySet(BaseQuerySet["Notification"]):
-    def match(self, payload: dict[str, Any], rules: "Optional[YamlPayload]" = None) -> list["Notification"]:
-        for subscription in self.all():
-            if subscription.match_filter(payload, rules=rules):
-                yield subscription
+    def match(self, payload: dict[str, Any], rules: "Optional[YamlPayload]" = None) -> Iterator["Notification"]:
+        """Yield the Notifications whose payload filter (or `rules`, if provided) matches `payload`.
+
+        All the filters are evaluated through a single, cached, MatchPlan so that each
+        expression is evaluated once even if it is used by many Notifications.
+        """
+        if rules:
+            matcher = compile_filter(rules)
+            yield from (n for n in self.all() if matcher(payload))
+            return
+        notifications = list(self.all())
+        if notifications:
+            for notification, matched in zip(notifications, plans.get(notifications).match(payload)):
+                if matched:
+                    yield notification
 
     def get_by_natural_key(self, name: str, evt: str, app: str, prj: str, org: str, *args: Any) -> "Notification":
         return self.get(
@@ -88,67 +101,131 @@ class Notification(BitcasterBaseModel):
     def get_context(self, ctx: dict[str, str]) -> dict[str, Any]:
         return {**ctx, "notification": self.name}
 
-    def get_pending_subscriptions(self, delivered: list[str | int], channel: "Channel") -> QuerySet[Assignment]:
+    def get_pending_subscriptions(
+        self, occurrence: "Occurrence", channel: "Channel | Iterable[Channel]"
+    ) -> QuerySet[Assignment]:
+        from .delivery import Delivery
+
+        if isinstance(channel, models.Model):
+            channels = [channel]
+        else:
+            channels = list(channel)
+        deliveries = Delivery.objects.filter(occurrence=occurrence, assignment=OuterRef("pk"))
+        # failed deliveries with a scheduled retry are handled by `retry_delivery`, exhausted ones are never resent
+        done = (
+            models.Q(status=Delivery.Status.DELIVERED)
+            | models.Q(next_attempt__isnull=False)
+            | models.Q(status=Delivery.Status.FAILED, attempts__gte=config.DELIVERY_MAX_ATTEMPTS)
+        )
         return (
             self.distribution.recipients.select_related(
                 "address",
                 "channel",
                 "address__user",
             )
-            .filter(active=True, channel=channel)
-            .exclude(id__in=delivered)
+            .filter(active=True, channel__in=channels)
+            .filter(~Exists(deliveries.filter(done)))
+            .annotate(delivery_attempts=Coalesce(Subquery(deliveries.values("attempts")[:1]), 0))
+            .order_by("channel", "pk")
+        )
+
+    def get_payload(
+        self, message: "Message", channel: "Channel", context: dict[str, Any], assignment: Optional[Assignment] = None
+    ) -> Payload:
+        user = None
+        context = {**context, "channel": channel}
+        if assignment:
+            addr: "Address" = assignment.address
+            user = addr.user
+            context["address"] = addr.value
+        return Payload(
+            event=self.event,
+            user=user,
+            subject=message.render("subject", context),
+            message=message.render("content", context),
+            html_message=message.render("html_content", context),
         )
 
+    def get_newsletter_payload(self, channel: "Channel", context: dict[str, Any]) -> Optional[Payload]:
+        """Return the payload shared by all the recipients of `channel`, rendered without any recipient info."""
+        if message := self.get_message(channel):
+            return self.get_payload(message, channel, context)
+        return None
+
     def notify_to_channel(self, channel: "Channel", assignment: Assignment, context: dict[str, Any]) -> Optional[str]:
         message: Optional["Message"]
         dispatcher: "Dispatcher" = channel.dispatcher
-        addr: "Address" = assignment.address
 
         if message := self.get_message(channel):
-            context.update({"channel": channel, "address": addr.value})
-            payload: Payload = Payload(
-                event=self.event,
-                user=addr.user,
-                subject=render_string(message.subject, context),
-                message=render_string(message.content, context),
-                html_message=render_string(message.html_content, context),
-                # message=message.render(context),
-            )
-            dispatcher.send(addr.value, payload)
-            return addr.value
+            payload: Payload = self.get_payload(message, channel, context, assignment)
+            dispatcher.send(assignment.address.value, payload)
+            return assignment.address.value
 
         return None
 
+    def get_envelopes(
+        self,
+        channel: "Channel",
+        assignments: list[Assignment],
+        context: dict[str, Any],
+        payload: Optional[Payload] = None,
+    ) -> Optional[list[Envelope]]:
+        """Return the envelopes to send to `assignments`, or None if there is no message for `channel`.
+
+        If `payload` is provided it is sent as is to every recipient (newsletters), otherwise
+        the message is rendered for each recipient.
+        """
+        message: Optional["Message"]
+        if not (message := self.get_message(channel)):
+            return None
+        return [
+            Envelope(
+                assignment.address.value,
+                payload or self.get_payload(message, channel, context, assignment),
+                assignment,
+            )
+            for assignment in assignments
+        ]
+
+    def send_envelopes(self, channel: "Channel", envelopes: list[Envelope]) -> list[DispatchResult]:
+        """Send the already rendered `envelopes` with a single `Dispatcher.send_many()` call.
+
+        With `DISPATCHER_ASYNC` the messages are sent concurrently in the shared event loop, natively
+        or in its thread pool; local dispatchers always send in the calling thread.
+        """
+        dispatcher = channel.dispatcher
+        if settings.DISPATCHER_ASYNC and not dispatcher.local:
+            return runtime.run(dispatcher.async_send_many(envelopes))
+        return dispatcher.send_many(envelopes)
+
+    def notify_many(
+        self,
+        channel: "Channel",
+        assignments: list[Assignment],
+        context: dict[str, Any],
+        payload: Optional[Payload] = None,
+    ) -> list[DispatchResult]:
+        """Notify all the `assignments` of `channel` with a single `Dispatcher.send_many()` call.
+
+        See `get_envelopes()` and `send_envelopes()`.
+        """
+        if (envelopes := self.get_envelopes(channel, assignments, context, payload)) is None:
+            return [DispatchResult(assignment.address.value, True) for assignment in assignments]
+        return self.send_envelopes(channel, envelopes)
+
     @classmethod
     def match_line_filter(cls, filter_rules_dict: "YamlPayload", payload: "YamlPayload") -> bool:
-        if not filter_rules_dict:
-            return True
-
-        if isinstance(filter_rules_dict, str):
-            # this is a leaf, apply the filter
-            return bool(jmespath.search(filter_rules_dict, payload))
-
-        # it is not a str hence it must be a dict with one of AND, OR, NOT
-        if and_stm := filter_rules_dict.get("AND"):
-            return all([cls.match_line_filter(rules, payload) for rules in and_stm])
-        elif or_stm := filter_rules_dict.get("OR"):
-            return any([cls.match_line_filter(rules, payload) for rules in or_stm])
-        elif not_stm := filter_rules_dict.get("NOT"):
-            return not cls.match_line_filter(not_stm, payload)
-        return False
+        return compile_filter(filter_rules_dict)(payload)
 
     def match_filter(self, payload: "YamlPayload", rules: Optional[dict[str, Any] | str] = None) -> bool:
         """Check if given payload matches rules.
 
-        If no rules are specified, it defaults to match rules configured in subscription.
+        If no rules are specified, it defaults to match rules configured in subscription,
+        compiled once per Notification version.
         """
-        if not rules:
-            rules = yaml.safe_load(self.payload_filter or "")
-        return self.match_line_filter(rules, payload)
-
-    # @staticmethod
-    # def check_filter(filter_rules_dict: "YamlPayload") -> Any:
-    #     return jmespath.compile(filter_rules_dict)
+        if rules:
+            return compile_filter(rules)(payload)
+        return filters.get(self)(payload)
 
     def get_messages(self, channel: "Channel") -> QuerySet["Message"]:
         from .message import Message
@@ -1,18 +1,34 @@
 import logging
+import time
+from collections import deque
+from concurrent.futures import Future
 from datetime import timedelta
-from typing import TYPE_CHECKING, Any, NotRequired, TypedDict
+from itertools import batched, groupby
+from operator import attrgetter
+from typing import TYPE_CHECKING, Any, Iterable, NotRequired, Optional, TypedDict
 
 from constance import config
-from django.db import models
+from django.db import connection, models, transaction
+from django.db.models.base import ModelBase
 from django.db.models.expressions import F
-from django.db.models.functions import Coalesce
+from django.db.models.functions import Coalesce, Mod
 from django.utils import timezone
 from django.utils.translation import gettext as _
 
 from ..constants import Bitcaster
+from ..dispatchers.base import DispatchResult, Envelope, Payload
+from ..exceptions import (
+    DispatcherDeferred,
+    DispatcherRateLimited,
+    DispatcherUnavailable,
+    SubscriptionExpired,
+)
+from ..utils.lanes import LaneExecutor, get_pool
 from .assignment import Assignment
+from .delivery import Delivery
 from .event import Event
-from .mixins import BitcasterBaselManager, BitcasterBaseModel
+from .idempotency import IdempotencyKey
+from .mixins import BaseQuerySet, BitcasterBaselManager, BitcasterBaseModel
 
 if TYPE_CHECKING:
     from .application import Application
@@ -20,16 +36,28 @@ if TYPE_CHECKING:
     from .message import Message
     from .notification import Notification
 
-    OccurrenceData = TypedDict("OccurrenceData", {"delivered": list[str | int], "recipients": list[tuple[str, str]]})
-
 logger = logging.getLogger(__name__)
 OccurrenceOptions = TypedDict(
     "OccurrenceOptions",
     {"limit_to": NotRequired[list[str]], "channels": NotRequired[list[str]], "environs": NotRequired[list[str]]},
 )
+TriggerOptions = TypedDict(
+    "TriggerOptions",
+    {"context": NotRequired[dict[str, Any]], "options": NotRequired[OccurrenceOptions], "cid": NotRequired[Any]},
+)
+
+
+class OccurrenceQuerySet(BaseQuerySet["Occurrence"]):
+
+    def update(self, **kwargs: Any) -> int:
+        # status changes must be seen by the rollups, that only read the recently updated Occurrences
+        if "status" in kwargs:
+            kwargs.setdefault("last_updated", timezone.now())
+        return super().update(**kwargs)
 
 
 class OccurrenceManager(BitcasterBaselManager["Occurrence"]):
+    _queryset_class = OccurrenceQuerySet
 
     def get_by_natural_key(self, timestamp: str, evt: str, app: str, prj: str, org: str) -> "Occurrence":
         return self.get(
@@ -43,6 +71,34 @@ class OccurrenceManager(BitcasterBaselManager["Occurrence"]):
     def system(self, *args: Any, **kwargs: Any) -> models.QuerySet["Occurrence"]:
         return self.filter(event__application__name=Bitcaster.APPLICATION).filter(*args, **kwargs)
 
+    def claimable(self) -> models.QuerySet["Occurrence"]:
+        """Return the NEW Occurrences not claimed, or whose lease is expired, and the PROCESSING ones left
+        by a dead worker (ie. their lease is no longer renewed)."""
+        now = timezone.now()
+        return self.filter(
+            models.Q(status=Occurrence.Status.NEW, claimed_until__isnull=True)
+            | models.Q(status__in=(Occurrence.Status.NEW, Occurrence.Status.PROCESSING), claimed_until__lt=now)
+        )
+
+    def claim(self, limit: int, lease: timedelta, *args: Any, **kwargs: Any) -> list[int]:
+        """Claim, for `lease`, up to `limit` NEW Occurrences (ordered by pk) matching the given filters.
+
+        Only Occurrences not claimed or whose lease is expired are taken and rows locked by
+        other transactions (ie. being claimed or processed) are skipped.
+        """
+        with transaction.atomic():
+            ids = list(
+                self.claimable()
+                .filter(*args, **kwargs)
+                .order_by("pk")
+                .select_for_update(skip_locked=True)
+                .values_list("pk", flat=True)[:limit]
+                .iterator()
+            )
+            # abandoned PROCESSING ones are resumed from their last checkpoint
+            self.filter(pk__in=ids).update(claimed_until=timezone.now() + lease, status=Occurrence.Status.NEW)
+        return ids
+
     def purgeable(self, *args: Any, **kwargs: Any) -> models.QuerySet["Occurrence"]:
         return self.filter(
             last_updated__lt=timezone.now()
@@ -53,14 +109,96 @@ class OccurrenceManager(BitcasterBaselManager["Occurrence"]):
             )
         ).filter(*args, **kwargs)
 
+    def delete_tree(self, ids: list[int]) -> int:
+        """Delete the given Occurrences, their descendants and all their related rows in one transaction.
+
+        Unlike `QuerySet.delete()`, the `parent` cascade is resolved by the database and rows are
+        never loaded in memory. Returns the number of deleted Occurrences.
+        """
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"WITH RECURSIVE tree(id) AS (SELECT id FROM {table} WHERE id = ANY(%s) "
+                f"UNION SELECT o.id FROM {table} o JOIN tree ON o.parent_id = tree.id) SELECT id FROM tree",
+                [ids],
+            )
+            tree = [row[0] for row in cursor.fetchall()]
+            Delivery.objects.filter(occurrence_id__in=tree)._raw_delete(self.db)
+            IdempotencyKey.objects.filter(occurrence_id__in=tree)._raw_delete(self.db)
+            return self.filter(pk__in=tree)._raw_delete(self.db)
+
+
+class Dispatches:
+    """Dispatch the recipients of an Occurrence concurrently across its Channels.
+
+    Each Channel is a lane of a `LaneExecutor`: its groups of recipients are sent in order, by one
+    thread at a time, while the other Channels proceed. Messages are rendered in the calling thread
+    (templates may query the database through the instances in their context), so that the lanes
+    only send the rendered envelopes. Dispatchers that write to the database (`Dispatcher.local`)
+    run in the calling thread, which is also the only one that turns results into Deliveries,
+    in submission order.
+    """
+
+    def __init__(self, occurrence: "Occurrence", workers: int, max_wait: float) -> None:
+        self.occurrence = occurrence
+        self.max_wait = max_wait
+        self.max_pending = workers * 2
+        self.lanes = LaneExecutor(get_pool(workers)) if workers > 1 else None
+        self.pending: deque[tuple["Channel", list[Assignment], Future[list[DispatchResult]] | list[DispatchResult]]] = (
+            deque()
+        )
+
+    def submit(
+        self,
+        notification: "Notification",
+        channel: "Channel",
+        assignments: list[Assignment],
+        context: dict[str, Any],
+        payloads: Optional[dict[tuple[int, int], Optional[Payload]]] = None,
+    ) -> None:
+        results: Future[list[DispatchResult]] | list[DispatchResult]
+        try:
+            envelopes = self.occurrence.render(notification, channel, assignments, context, payloads)
+        except Exception as e:
+            logger.exception(e)
+            results = [DispatchResult(a.address.value, False, e) for a in assignments]
+        else:
+            args = (notification, channel, assignments, envelopes, self.max_wait)
+            if self.lanes and not channel.dispatcher.local:
+                _ = channel.breaker  # reads the configuration: never loaded by the lane threads
+                results = self.lanes.submit(channel.pk, self.occurrence.notify_limited, *args)
+            else:
+                results = self.occurrence.notify_limited(*args)
+        self.pending.append((channel, assignments, results))
+
+    def collect(self, wait: bool = False) -> list[Delivery]:
+        """Return the deliveries of the completed dispatches, in submission order.
+
+        Waits for all the pending dispatches if `wait`, otherwise only for the oldest ones while
+        more than twice the number of workers are pending.
+        """
+        deliveries: list[Delivery] = []
+        while self.pending:
+            channel, assignments, results = self.pending[0]
+            if isinstance(results, Future):
+                if not (wait or results.done() or len(self.pending) > self.max_pending):
+                    break
+                results = results.result()
+            self.pending.popleft()
+            deliveries.extend(self.occurrence.get_deliveries(channel, assignments, results))
+        return deliveries
+
 
 class Occurrence(BitcasterBaseModel):
     class Status(models.TextChoices):
         NEW = "NEW", _("New")
+        PROCESSING = "PROCESSING", _("Processing")
         PROCESSED = "PROCESSED", _("Processed")
         FAILED = "FAILED", _("Failed")
 
-    timestamp = models.DateTimeField(auto_now_add=True, help_text=_("Timestamp when occurrence has been created."))
+    timestamp = models.DateTimeField(
+        default=timezone.now, blank=True, editable=False, help_text=_("Timestamp when occurrence has been created.")
+    )
     event = models.ForeignKey(Event, on_delete=models.CASCADE)
     context = models.JSONField(blank=True, default=dict, help_text=_("Context provided by the sender"))
     options: "OccurrenceOptions" = models.JSONField(  # type: ignore[assignment]
@@ -69,18 +207,31 @@ class Occurrence(BitcasterBaseModel):
     correlation_id = models.CharField(max_length=255, editable=False, blank=True, null=True)
     recipients = models.IntegerField(default=0, help_text=_("Total number of recipients"))
     newsletter = models.BooleanField(default=False, help_text=_("Do not customise notifications per single user"))
-    data: "OccurrenceData" = models.JSONField(  # type: ignore[assignment]
-        default=dict, help_text=_("Information about the processing (recipients, channels)")
-    )
+    data = models.JSONField(default=dict, help_text=_("Information about the processing (recipients, channels)"))
     status = models.CharField(choices=Status, default=Status.NEW.value, max_length=20)
     attempts = models.IntegerField(default=5)
+    claimed_until = models.DateTimeField(
+        blank=True, null=True, editable=False, help_text=_("The Occurrence is queued for processing until then")
+    )
     parent = models.ForeignKey("self", editable=False, blank=True, null=True, on_delete=models.CASCADE)
+    rollup_status = models.CharField(
+        choices=Status,
+        max_length=20,
+        blank=True,
+        null=True,
+        editable=False,
+        help_text=_("Status counted by the Occurrence Rollups"),
+    )
 
     objects = OccurrenceManager()
 
     class Meta:
         ordering = ("timestamp",)
         constraints = [models.UniqueConstraint(fields=("timestamp", "event"), name="occurrence_unique")]
+        indexes = [
+            models.Index(fields=("status", "claimed_until"), name="occurrence_claim"),
+            models.Index(fields=("last_updated",), name="occurrence_last_updated"),
+        ]
 
     def __str__(self) -> str:
         return f"Occurrence of {self.event.name} on {self.timestamp}"
@@ -92,6 +243,21 @@ class Occurrence(BitcasterBaseModel):
         self._cached_messages: dict[Channel, Message] = {}
         super().__init__(*args, **kwargs)
 
+    def save(
+        self,
+        *args: Any,
+        force_insert: bool | tuple[ModelBase, ...] = False,
+        force_update: bool = False,
+        using: Optional[str] = None,
+        update_fields: Optional[Iterable[str]] = None,
+    ) -> None:
+        # `rollup_status` is only written by the rollups, never from a (possibly stale) instance
+        if update_fields is None and not self._state.adding:
+            update_fields = [
+                f.name for f in self._meta.concrete_fields if not f.primary_key and f.name != "rollup_status"
+            ]
+        super().save(force_insert=force_insert, force_update=force_update, using=using, update_fields=update_fields)
+
     def get_context(self) -> dict[str, Any]:
         return {
             "timestamp": self.timestamp,
@@ -102,11 +268,7 @@ class Occurrence(BitcasterBaseModel):
     def application(self) -> "Application":
         return self.event.application
 
-    def process(self) -> bool:
-        assignment: "Assignment"
-        notification: "Notification"
-        delivered = self.data.get("delivered", [])
-        recipients = self.data.get("recipients", [])
+    def get_filters(self) -> tuple[dict[str, Any], dict[str, Any], dict[str, Any]]:
         assignment_filter = {}
         notification_filter = {}
         channel_filter = {}
@@ -117,22 +279,251 @@ class Occurrence(BitcasterBaseModel):
             channel_filter["pk__in"] = channels
         if environs := self.options.get("environs", []):
             notification_filter["environments__overlap"] = environs
+        return assignment_filter, notification_filter, channel_filter
 
-        for notification in self.event.notifications.filter(**notification_filter).match(self.context):
-            context = notification.get_context(self.get_context())
-            for channel in self.event.channels.filter(**channel_filter):
-                for assignment in notification.get_pending_subscriptions(delivered, channel).filter(
-                    **assignment_filter
+    def checkpoint(self, deliveries: list[Delivery]) -> None:
+        """Save `deliveries`, in their own transaction, and schedule the retry of the failed ones once committed.
+
+        The lease of a PROCESSING Occurrence is renewed, as its worker is still alive.
+        """
+        from bitcaster.tasks import retry_delivery
+
+        delivered = sum(1 for d in deliveries if d.status == Delivery.Status.DELIVERED)
+        with transaction.atomic():
+            Delivery.objects.bulk_create(
+                deliveries,
+                update_conflicts=True,
+                unique_fields=["occurrence", "assignment", "channel"],
+                update_fields=["status", "attempts", "delivered", "next_attempt", "last_updated"],
+            )
+            for d in deliveries:
+                if d.next_attempt:
+                    transaction.on_commit(
+                        lambda pk=d.pk, eta=d.next_attempt: retry_delivery.apply_async((pk,), eta=eta)
+                    )
+            if delivered:
+                # atomic increment: shards of the same occurrence can checkpoint concurrently
+                Occurrence.objects.filter(pk=self.pk).update(recipients=F("recipients") + delivered)
+            self.renew_lease()
+        self.recipients += delivered
+
+    def renew_lease(self) -> None:
+        """Extend the lease of a PROCESSING Occurrence, as its worker (or shard) is still alive."""
+        Occurrence.objects.filter(pk=self.pk, status=Occurrence.Status.PROCESSING).update(
+            claimed_until=timezone.now() + timedelta(seconds=config.OCCURRENCE_CLAIM_LEASE)
+        )
+
+    def estimate_recipients(self) -> int:
+        return Assignment.objects.filter(active=True, distributionlist__notifications__event=self.event).count()
+
+    def get_shards(self) -> int:
+        """Return the number of parallel shards the processing should be split into (1 means no sharding)."""
+        shards = config.OCCURRENCE_SHARDS
+        if shards > 1 and self.estimate_recipients() >= config.OCCURRENCE_SHARD_THRESHOLD:
+            return shards
+        return 1
+
+    def render(
+        self,
+        notification: "Notification",
+        channel: "Channel",
+        assignments: list[Assignment],
+        context: dict[str, Any],
+        payloads: Optional[dict[tuple[int, int], Optional[Payload]]] = None,
+    ) -> Optional[list[Envelope]]:
+        """Return the envelopes to send to `assignments` (see `Notification.get_envelopes()`).
+
+        `payloads` is the cache of the newsletter payloads, rendered once per (notification, channel).
+        """
+        payload = None
+        if payloads is not None:
+            key = (notification.pk, channel.pk)
+            if key not in payloads:
+                payloads[key] = notification.get_newsletter_payload(channel, context)
+            payload = payloads[key]
+        return notification.get_envelopes(channel, assignments, context, payload)
+
+    def notify(
+        self,
+        notification: "Notification",
+        channel: "Channel",
+        assignments: list[Assignment],
+        envelopes: Optional[list[Envelope]],
+    ) -> list[DispatchResult]:
+        """Send the `envelopes` of `assignments` and return the result of each dispatch.
+
+        If `envelopes` is None (there is no message for `channel`) nothing is sent.
+        """
+        try:
+            if envelopes is None:
+                return [DispatchResult(a.address.value, True) for a in assignments]
+            return notification.send_envelopes(channel, envelopes)
+        except Exception as e:
+            logger.exception(e)
+            return [DispatchResult(a.address.value, False, e) for a in assignments]
+
+    def notify_limited(
+        self,
+        notification: "Notification",
+        channel: "Channel",
+        assignments: list[Assignment],
+        envelopes: Optional[list[Envelope]],
+        max_wait: Optional[float] = None,
+    ) -> list[DispatchResult]:
+        """Send the `envelopes` of `assignments` within the circuit breaker and the rate limit of `channel`.
+
+        The worker waits for the rate limit up to `max_wait` (default `CHANNEL_RATE_LIMIT_MAX_WAIT`)
+        seconds overall. The recipients still exceeding it, refused by the provider or not sent
+        because the circuit is open get a `DispatcherDeferred` result.
+        """
+        results: list[DispatchResult] = []
+        waited = 0.0
+        while (done := len(results)) < len(assignments):
+            pending = assignments[done:]
+            if not (allowed := channel.breaker.allowed(len(pending)) if channel.breaker else len(pending)):
+                retry_after = channel.breaker.retry_after() or channel.breaker.cooldown
+                results.extend(
+                    DispatchResult(a.address.value, False, DispatcherUnavailable(retry_after)) for a in pending
+                )
+                break
+            granted, wait = channel.limiter.acquire(allowed) if channel.limiter else (allowed, 0)
+            if granted:
+                batch = None if envelopes is None else envelopes[done:][:granted]
+                results.extend(sent := self.notify(notification, channel, pending[:granted], batch))
+                if channel.breaker:
+                    failures = sum(1 for r in sent if not r.success and not isinstance(r.error, DispatcherDeferred))
+                    channel.breaker.record(len(sent) - failures, failures)
+                if not (limited := next((r.error for r in sent if isinstance(r.error, DispatcherRateLimited)), None)):
+                    continue
+                if channel.limiter:
+                    channel.limiter.pause(limited.retry_after)
+                wait, pending = limited.retry_after, pending[granted:]
+            elif waited + wait <= (config.CHANNEL_RATE_LIMIT_MAX_WAIT if max_wait is None else max_wait):
+                time.sleep(wait)
+                waited += wait
+                continue
+            interval = 1 / channel.rate_limit if channel.rate_limit else 0
+            results.extend(
+                DispatchResult(a.address.value, False, DispatcherRateLimited(wait + i * interval))
+                for i, a in enumerate(pending)
+            )
+        return results
+
+    def deliver(
+        self,
+        notification: "Notification",
+        channel: "Channel",
+        assignments: list[Assignment],
+        context: dict[str, Any],
+        payloads: Optional[dict[tuple[int, int], Optional[Payload]]] = None,
+    ) -> list[Delivery]:
+        """Dispatch to `assignments` and return the resulting deliveries.
+
+        Failed deliveries are scheduled to be retried with an increasing delay. Deferred ones (rate
+        limited or with the circuit open) are scheduled as soon as possible, without counting as an attempt.
+        """
+        dispatches = Dispatches(self, 1, config.CHANNEL_RATE_LIMIT_MAX_WAIT)
+        dispatches.submit(notification, channel, assignments, context, payloads)
+        return dispatches.collect(wait=True)
+
+    def get_deliveries(
+        self, channel: "Channel", assignments: list[Assignment], results: list[DispatchResult]
+    ) -> list[Delivery]:
+        """Return the deliveries of the `results` of the dispatch to `assignments`.
+
+        Assignments whose subscription has expired are deactivated, and never retried.
+        """
+        deliveries = [
+            Delivery(occurrence=self, assignment=a, channel=channel, attempts=a.delivery_attempts + 1)
+            for a in assignments
+        ]
+        expired = []
+        now = timezone.now()
+        for delivery, result in zip(deliveries, results):
+            if result.success:
+                delivery.status = Delivery.Status.DELIVERED
+                delivery.delivered = now
+            elif isinstance(result.error, DispatcherDeferred):
+                delivery.status = Delivery.Status.PENDING
+                delivery.attempts -= 1
+                delivery.next_attempt = now + timedelta(seconds=result.error.retry_after)
+            elif isinstance(result.error, SubscriptionExpired):
+                delivery.status = Delivery.Status.FAILED
+                expired.append(delivery.assignment_id)
+            else:
+                delivery.status = Delivery.Status.FAILED
+                if delay := Delivery.get_retry_delay(delivery.attempts):
+                    delivery.next_attempt = now + timedelta(seconds=delay)
+        if expired:
+            Assignment.objects.filter(pk__in=expired).update(active=False, validated=False, data={"status": "expired"})
+        return deliveries
+
+    def redeliver(self, delivery: Delivery) -> bool:
+        """Retry a failed delivery, through the first matching notification that still targets its recipient."""
+        from bitcaster.cache.delivery import delivery_plans
+
+        assignment = delivery.assignment
+        assignment.delivery_attempts = delivery.attempts
+        if (plan := delivery_plans.get(self.event_id)) and (channel := plan.channels.get(delivery.channel_id)):
+            for notification in plan.match(self.context, self.options.get("environs")):
+                if (
+                    notification.distribution
+                    and notification.distribution.recipients.filter(pk=assignment.pk, active=True).exists()
                 ):
-                    try:
-                        notification.notify_to_channel(channel, assignment, context)
-
-                        delivered.append(assignment.id)
-                        recipients.append((assignment.address.value, assignment.channel.name))
-                    except Exception as e:
-                        logger.exception(e)
-                        return False
-                    finally:
-                        self.data = {"delivered": delivered, "recipients": recipients}
-                        self.save()
-        return True
+                    payloads = {} if self.newsletter or plan.event.newsletter else None
+                    context = notification.get_context(self.get_context())
+                    delivered = self.deliver(notification, channel, [assignment], context, payloads)
+                    self.checkpoint(delivered)
+                    return delivered[0].status == Delivery.Status.DELIVERED
+        Delivery.objects.filter(pk=delivery.pk).update(next_attempt=None)
+        return False
+
+    def process(self, shard: Optional[tuple[int, int]] = None) -> bool:
+        """Deliver the occurrence to every pending recipient.
+
+        Recipients are fetched in batches and each batch is dispatched with a single `send_many()`
+        call per channel. Progress is checkpointed every `OCCURRENCE_CHECKPOINT_EVERY` deliveries
+        or `OCCURRENCE_CHECKPOINT_INTERVAL` seconds. Failed deliveries do not stop the processing:
+        each one is retried on its own, with exponential backoff, up to `DELIVERY_MAX_ATTEMPTS` times.
+        If `shard` is provided as `(index, total)` only the assignments where `pk % total == index` are processed.
+        Newsletters are rendered once per notification and channel and the same payload is sent to all recipients.
+        Notifications, channels and messages come from the (cached) delivery plan of the event.
+        Channels are dispatched concurrently, up to `OCCURRENCE_CHANNEL_WORKERS` at a time (see `Dispatches`).
+        Returns False if any delivery has failed with no more attempts left.
+        """
+        from bitcaster.cache.delivery import delivery_plans
+
+        notification: "Notification"
+        if not (plan := delivery_plans.get(self.event_id)):
+            return True
+        assignment_filter = self.get_filters()[0]
+
+        batch_size = max(1, config.OCCURRENCE_BATCH_SIZE)
+        checkpoint_every = max(1, config.OCCURRENCE_CHECKPOINT_EVERY)
+        checkpoint_interval = config.OCCURRENCE_CHECKPOINT_INTERVAL
+        deliveries: list[Delivery] = []
+        last_checkpoint = time.monotonic()
+        payloads: Optional[dict[tuple[int, int], Optional[Payload]]] = (
+            {} if self.newsletter or plan.event.newsletter else None
+        )
+
+        selected = plan.get_channels(self.options.get("channels"))
+        dispatches = Dispatches(self, config.OCCURRENCE_CHANNEL_WORKERS, config.CHANNEL_RATE_LIMIT_MAX_WAIT)
+        for notification in plan.match(self.context, self.options.get("environs")):
+            context = notification.get_context(self.get_context())
+            pending = notification.get_pending_subscriptions(self, selected.values()).filter(**assignment_filter)
+            if shard:
+                pending = pending.alias(shard=Mod("pk", shard[1])).filter(shard=shard[0])
+            for batch in batched(pending.iterator(chunk_size=batch_size), batch_size):
+                # pending subscriptions are ordered by channel
+                for channel_id, group in groupby(batch, key=attrgetter("channel_id")):
+                    dispatches.submit(notification, selected[channel_id], list(group), context, payloads)
+                deliveries.extend(dispatches.collect())
+                if len(deliveries) >= checkpoint_every or time.monotonic() - last_checkpoint >= checkpoint_interval:
+                    self.checkpoint(deliveries)
+                    deliveries = []
+                    last_checkpoint = time.monotonic()
+        deliveries.extend(dispatches.collect(wait=True))
+        if deliveries:
+            self.checkpoint(deliveries)
+        return not self.deliveries.filter(status=Delivery.Status.FAILED, next_attempt__isnull=True).exists()
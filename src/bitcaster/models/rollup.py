@@ -0,0 +1,148 @@
+import datetime
+from collections import defaultdict
+from datetime import timedelta
+from typing import Any, Optional
+
+from constance import config
+from django.db import models, transaction
+from django.db.models import F, Q, Sum
+from django.db.models.functions import TruncMinute
+from django.utils import timezone
+from django.utils.translation import gettext as _
+
+from .mixins import BitcasterBaselManager, BitcasterBaseModel
+from .occurrence import Occurrence
+
+MINUTE_RETENTION = timedelta(days=2)  # minute rollups are only read for the last hour
+OVERLAP = timedelta(minutes=5)  # Occurrences saved by transactions committed after the previous run
+BATCH_SIZE = 1000
+
+
+class OccurrenceRollupManager(BitcasterBaselManager["OccurrenceRollup"]):
+
+    def get_by_natural_key(
+        self, period: str, bucket: str, status: str, evt: str, app: str, prj: str, org: str
+    ) -> "OccurrenceRollup":
+        return self.get(
+            period=period,
+            bucket=bucket,
+            status=status,
+            event__application__project__organization__slug=org,
+            event__application__project__slug=prj,
+            event__application__slug=app,
+            event__slug=evt,
+        )
+
+    def _retention(self) -> dict[str, datetime.datetime]:
+        now = timezone.now()
+        return {
+            OccurrenceRollup.Period.MINUTE: now - MINUTE_RETENTION,
+            OccurrenceRollup.Period.HOUR: now - timedelta(days=config.OCCURRENCE_ROLLUP_RETENTION),
+        }
+
+    def expired(self) -> models.QuerySet["OccurrenceRollup"]:
+        retention = self._retention()
+        return self.filter(
+            Q(period=OccurrenceRollup.Period.MINUTE, bucket__lt=retention[OccurrenceRollup.Period.MINUTE])
+            | Q(period=OccurrenceRollup.Period.HOUR, bucket__lt=retention[OccurrenceRollup.Period.HOUR])
+        )
+
+    def add(self, deltas: dict[tuple[int, str, str, datetime.datetime], int]) -> None:
+        """Add `deltas`, keyed by (event_id, status, period, bucket), to the counters.
+
+        Missing counters are created, the ones past their retention are skipped.
+        """
+        retention = self._retention()
+        for (event_id, status, period, bucket), delta in deltas.items():
+            if not delta or bucket < retention[period]:
+                continue
+            rollup, created = self.get_or_create(
+                event_id=event_id, status=status, period=period, bucket=bucket, defaults={"count": delta}
+            )
+            if not created:
+                self.filter(pk=rollup.pk).update(count=F("count") + delta)
+
+    def count_pending(
+        self, since: datetime.datetime, until: datetime.datetime, batch_size: int = BATCH_SIZE
+    ) -> tuple[int, Optional[datetime.datetime]]:
+        """Count the Occurrences updated between `since` and `until` whose status is not counted yet.
+
+        Each Occurrence is moved from the counters of its `rollup_status` (if any) to the ones of its
+        current status, `batch_size` at a time. Returns the number of counted Occurrences and the
+        highest `last_updated` among them.
+        """
+        pending = (
+            Occurrence.objects.filter(last_updated__gte=since, last_updated__lt=until)
+            .filter(Q(rollup_status__isnull=True) | ~Q(rollup_status=F("status")))
+            .annotate(minute=TruncMinute("timestamp", tzinfo=datetime.timezone.utc))
+            .order_by("last_updated", "pk")
+            .values("pk", "event_id", "status", "rollup_status", "minute", "last_updated")
+        )
+        counted, high_water = 0, None
+        while True:
+            with transaction.atomic():
+                # locked, so that their status cannot change before `rollup_status` is updated
+                rows = list(pending.select_for_update()[:batch_size])
+                if not rows:
+                    break
+                deltas: dict[tuple[int, str, str, datetime.datetime], int] = defaultdict(int)
+                for row in rows:
+                    for status, delta in ((row["rollup_status"], -1), (row["status"], 1)):
+                        if status:
+                            hour = row["minute"].replace(minute=0)
+                            deltas[(row["event_id"], status, OccurrenceRollup.Period.MINUTE, row["minute"])] += delta
+                            deltas[(row["event_id"], status, OccurrenceRollup.Period.HOUR, hour)] += delta
+                self.add(deltas)
+                Occurrence.objects.filter(pk__in=[row["pk"] for row in rows]).update(rollup_status=F("status"))
+            counted += len(rows)
+            high_water = rows[-1]["last_updated"]
+        return counted, high_water
+
+    def summary(self, period: str, since: datetime.datetime) -> models.QuerySet["OccurrenceRollup", dict[str, Any]]:
+        """Return, for each Event, the number of Occurrences by status counted by the `period` rollups since `since`."""
+        return (
+            self.filter(period=period, bucket__gte=since)
+            .values("event_id", application=F("event__application__name"), event_name=F("event__name"))
+            .annotate(
+                total=Sum("count"),
+                **{
+                    status.lower(): Sum("count", filter=Q(status=status), default=0)
+                    for status in Occurrence.Status.values
+                },
+            )
+            .order_by("-total")
+        )
+
+
+class OccurrenceRollup(BitcasterBaseModel):
+    """Number of Occurrences of an Event with a given status, per minute or per hour (by timestamp).
+
+    Rollups are maintained by the `rollup_occurrences` task, so that the dashboard never reads the
+    Occurrence table. Each Occurrence records the status it is counted with in `rollup_status`.
+    """
+
+    class Period(models.TextChoices):
+        MINUTE = "minute", _("Minute")
+        HOUR = "hour", _("Hour")
+
+    event = models.ForeignKey("bitcaster.Event", on_delete=models.CASCADE, related_name="+")
+    status = models.CharField(choices=Occurrence.Status, max_length=20)
+    period = models.CharField(choices=Period, max_length=10)
+    bucket = models.DateTimeField(help_text=_("Beginning of the counted period"))
+    count = models.IntegerField(default=0)
+
+    objects = OccurrenceRollupManager()
+
+    class Meta:
+        verbose_name = _("Occurrence Rollup")
+        verbose_name_plural = _("Occurrence Rollups")
+        constraints = [
+            models.UniqueConstraint(fields=("event", "status", "period", "bucket"), name="occurrence_rollup_unique")
+        ]
+        indexes = [models.Index(fields=("period", "bucket"), name="occurrence_rollup_bucket")]
+
+    def __str__(self) -> str:
+        return f"{self.event} {self.status} {self.period} {self.bucket}: {self.count}"
+
+    def natural_key(self) -> tuple[str, ...]:
+        return self.period, str(self.bucket), self.status, *self.event.natural_key()
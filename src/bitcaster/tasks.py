@@ -1,39 +1,82 @@
 import logging
+import time
+from datetime import timedelta
+from typing import TYPE_CHECKING, Optional
 
+from celery import chord
+from constance import config
+from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import transaction
+from django.utils import timezone
 
 from bitcaster.config.celery import app
-from bitcaster.constants import Bitcaster, SystemEvent
+from bitcaster.constants import Bitcaster, CacheKey, SystemEvent
 from bitcaster.models import LogEntry, User
 
+if TYPE_CHECKING:
+    from bitcaster.models import Occurrence
+
 logger = logging.getLogger(__name__)
 
 
+def complete_occurrence(o: "Occurrence", success: bool) -> int:
+    from bitcaster.models import Occurrence
+
+    # a failed fan-out goes back to NEW, to be claimed again
+    o.status = Occurrence.Status.PROCESSED if success else Occurrence.Status.NEW
+    o.claimed_until = None  # let the scheduler pick it up again if it has to be retried
+    o.save()
+    if (
+        success
+        and o.recipients == 0
+        and o.event.name != SystemEvent.OCCURRENCE_SILENCE.value
+        and not o.deliveries.exists()  # failed deliveries are going to be retried
+    ):
+        Bitcaster.trigger_event(
+            SystemEvent.OCCURRENCE_SILENCE,
+            o.context,
+            options=o.options,
+            correlation_id=o.correlation_id,
+            parent=o,
+        )
+    return o.recipients
+
+
+def trigger_occurrence_error(o: "Occurrence") -> None:
+    Bitcaster.trigger_event(SystemEvent.OCCURRENCE_ERROR, options=o.options, correlation_id=o.correlation_id, parent=o)
+
+
+def can_shard() -> bool:
+    # chords need a result backend to collect the shard results
+    return bool(app.conf.task_always_eager or app.conf.result_backend)
+
+
 @app.task()
 def process_occurrence(occurrence_pk: int) -> int | Exception:
+    """Process a NEW Occurrence, or split it into shards.
+
+    The row is locked only to take the Occurrence, which is then PROCESSING. It is processed outside
+    of any transaction: each checkpoint (of any shard) is committed on its own and renews the
+    `OCCURRENCE_CLAIM_LEASE`, so that if the worker dies, or a shard is lost, the Occurrence is claimed
+    again, and resumed, once the lease expires.
+    """
     from bitcaster.models import Occurrence
 
     try:
+        shards = 1
         with transaction.atomic():
             o: Occurrence = Occurrence.objects.select_related("event").select_for_update().get(id=occurrence_pk)
             if o.attempts > 0:
                 o.attempts = o.attempts - 1
-                o.save()
                 if o.status == Occurrence.Status.NEW:
-                    success = o.process()
-                    if success:
-                        o.status = Occurrence.Status.PROCESSED
-                    o.recipients = len(o.data.get("delivered", []))
+                    if can_shard():
+                        shards = o.get_shards()
+                    o.status = Occurrence.Status.PROCESSING
+                    o.claimed_until = timezone.now() + timedelta(seconds=config.OCCURRENCE_CLAIM_LEASE)
+                    o.save()
+                else:
                     o.save()
-                    if success and o.recipients == 0 and o.event.name != SystemEvent.OCCURRENCE_SILENCE.value:
-                        Bitcaster.trigger_event(
-                            SystemEvent.OCCURRENCE_SILENCE,
-                            o.context,
-                            options=o.options,
-                            correlation_id=o.correlation_id,
-                            parent=o,
-                        )
                     return o.recipients
             elif (
                 o.attempts == 0
@@ -42,34 +85,185 @@ def process_occurrence(occurrence_pk: int) -> int | Exception:
             ):
                 o.status = Occurrence.Status.FAILED
                 o.save()
-                Bitcaster.trigger_event(
-                    SystemEvent.OCCURRENCE_ERROR, options=o.options, correlation_id=o.correlation_id, parent=o
-                )
+                trigger_occurrence_error(o)
                 return 0
+            else:
+                return o.recipients
+        if shards > 1:
+            # each shard runs in its own task and the finalizer sets the status, `attempts` identifies this run
+            chord(process_occurrence_shard.s(o.pk, shard, shards) for shard in range(shards))(
+                finalize_occurrence.s(o.pk, o.attempts)
+            )
+            return o.recipients
+        try:
+            success = o.process()
+        except Exception:
+            complete_occurrence(o, False)
+            raise
+        with transaction.atomic():
+            return complete_occurrence(o, success)
     except Exception as e:
         logger.exception(e)
         return e
 
 
 @app.task()
-def schedule_occurrences() -> None | Exception:
+def process_occurrence_shard(occurrence_pk: int, shard: int, shards: int) -> bool:
     from bitcaster.models import Occurrence
 
-    o: Occurrence
     try:
-        for o in Occurrence.objects.select_related("event").filter(status=Occurrence.Status.NEW):
-            process_occurrence.delay(o.id)
+        o: Occurrence = Occurrence.objects.select_related("event").get(id=occurrence_pk)
+        o.renew_lease()  # the shard may have been queued for a while
+        return o.process(shard=(shard, shards))
+    except Exception as e:
+        logger.exception(e)
+        return False
+
+
+@app.task()
+def finalize_occurrence(results: list[bool], occurrence_pk: int, attempts: Optional[int] = None) -> int | Exception:
+    """Complete a sharded Occurrence once all its shards are done.
+
+    Nothing is done if the run that started the shards (identified by the `attempts` left) is no longer
+    the current one, ie. the Occurrence has been claimed again after its lease expired.
+    """
+    from bitcaster.models import Delivery, Occurrence
+
+    try:
+        with transaction.atomic():
+            o: Occurrence = Occurrence.objects.select_related("event").select_for_update().get(id=occurrence_pk)
+            if o.status != Occurrence.Status.PROCESSING or attempts not in (None, o.attempts):
+                return o.recipients
+            o.recipients = o.deliveries.filter(status=Delivery.Status.DELIVERED).count()
+            return complete_occurrence(o, all(results))
     except Exception as e:
         logger.exception(e)
         return e
 
 
 @app.task()
-def purge_occurrences() -> None | Exception:
+def retry_delivery(delivery_pk: int) -> bool | Exception:
+    """Retry a failed (or rate limited) Delivery, scheduled when it failed with an increasing delay.
+
+    If the Delivery fails with no more attempts left, an already processed Occurrence is marked as
+    FAILED (a NEW one fails when processed, see `Occurrence.process`). The Delivery is only locked to
+    claim it: the dispatch runs out of any transaction and its result is saved by its own checkpoint.
+    """
+    from bitcaster.models import Delivery, Occurrence
+
+    try:
+        with transaction.atomic():
+            d: Delivery | None = (
+                Delivery.objects.select_related("occurrence", "assignment__address__user")
+                .select_for_update(of=("self",))
+                .filter(pk=delivery_pk, next_attempt__isnull=False)
+                .exclude(status=Delivery.Status.DELIVERED)
+                .first()
+            )
+            if d is None:  # already delivered, no more scheduled or claimed by another task
+                return False
+            Delivery.objects.filter(pk=d.pk).update(next_attempt=None)
+        if delivered := d.occurrence.redeliver(d):
+            return delivered
+        with transaction.atomic():
+            exhausted = Delivery.objects.filter(pk=d.pk, status=Delivery.Status.FAILED, next_attempt__isnull=True)
+            if (
+                exhausted.exists()
+                and Occurrence.objects.filter(pk=d.occurrence.pk, status=Occurrence.Status.PROCESSED).update(
+                    status=Occurrence.Status.FAILED
+                )
+                and d.occurrence.event.name != SystemEvent.OCCURRENCE_SILENCE.value
+            ):
+                trigger_occurrence_error(d.occurrence)
+        return False
+    except Exception as e:
+        logger.exception(e)
+        return e
+
+
+@app.task()
+def schedule_occurrences() -> None | Exception:
+    """Enqueue the NEW Occurrences that are not already queued.
+
+    Occurrences are claimed in batches for `OCCURRENCE_CLAIM_LEASE` seconds, so that the ones
+    already queued or in flight are not enqueued again until they are released or the lease expires.
+    """
     from bitcaster.models import Occurrence
 
     try:
-        Occurrence.objects.purgeable().delete()
+        batch_size = max(1, config.OCCURRENCE_CLAIM_BATCH_SIZE)
+        lease = timedelta(seconds=config.OCCURRENCE_CLAIM_LEASE)
+        start, last = timezone.now(), 0
+        while ids := Occurrence.objects.claim(batch_size, lease, pk__gt=last, timestamp__lte=start):
+            for pk in ids:
+                process_occurrence.delay(pk)
+            last = ids[-1]
+    except Exception as e:
+        logger.exception(e)
+        return e
+
+
+@app.task()
+def purge_occurrences() -> int | Exception:
+    """Delete the expired Occurrences, `OCCURRENCE_PURGE_BATCH_SIZE` at a time.
+
+    Expired Idempotency Keys and Occurrence Rollups are deleted as well. If the Occurrence table is partitioned, the
+    partitions for the next periods are created and the expired ones are dropped (or detached) first.
+    Each batch is deleted in its own short transaction. The purge is throttled to
+    `OCCURRENCE_PURGE_RATE` Occurrences per second and stops after `OCCURRENCE_PURGE_MAX_RUNTIME`
+    seconds (0 means no limit): what is left is deleted by the next run.
+    """
+    from bitcaster.models import IdempotencyKey, Occurrence, OccurrenceRollup
+    from bitcaster.utils import partitions
+
+    try:
+        batch_size = max(1, config.OCCURRENCE_PURGE_BATCH_SIZE)
+        OccurrenceRollup.objects.expired().delete()
+        while ids := list(IdempotencyKey.objects.expired().values_list("pk", flat=True)[:batch_size]):
+            IdempotencyKey.objects.filter(pk__in=ids).delete()
+        if partitions.is_partitioned():
+            partitions.create_partitions(config.OCCURRENCE_PARTITION_INTERVAL, config.OCCURRENCE_PARTITIONS_AHEAD)
+            partitions.drop_expired(config.OCCURRENCE_PARTITION_DETACH, batch_size)
+        rate, max_runtime = config.OCCURRENCE_PURGE_RATE, config.OCCURRENCE_PURGE_MAX_RUNTIME
+        start, last, deleted = time.monotonic(), 0, 0
+        while ids := list(
+            Occurrence.objects.purgeable(pk__gt=last).order_by("pk").values_list("pk", flat=True)[:batch_size]
+        ):
+            deleted += Occurrence.objects.delete_tree(ids)
+            last = ids[-1]
+            elapsed = time.monotonic() - start
+            logger.info(f"Occurrence purge: {deleted} deleted in {elapsed:.1f}s")
+            if rate and (wait := deleted / rate - elapsed) > 0:
+                time.sleep(wait)
+                elapsed += wait
+            if max_runtime and elapsed >= max_runtime:
+                logger.info("Occurrence purge: max runtime reached, stopping")
+                break
+        return deleted
+    except Exception as e:
+        logger.exception(e)
+        return e
+
+
+@app.task()
+def rollup_occurrences() -> int | Exception:
+    """Refresh the Occurrence Rollups read by the admin dashboard.
+
+    Only the Occurrences created or updated since the previous run (the highest `last_updated`
+    counted) are read, and their changes are added to the counters. Returns the number of
+    counted Occurrences.
+    """
+    from bitcaster.models import OccurrenceRollup
+    from bitcaster.models.rollup import OVERLAP
+
+    try:
+        now = timezone.now()
+        # the first run counts all the Occurrences within the retention of the hourly rollups
+        since = cache.get(CacheKey.OCCURRENCE_ROLLUP) or now - timedelta(days=config.OCCURRENCE_ROLLUP_RETENTION)
+        counted, high_water = OccurrenceRollup.objects.count_pending(since - OVERLAP, now)
+        if high_water:
+            cache.set(CacheKey.OCCURRENCE_ROLLUP, max(since, high_water), None)
+        return counted
     except Exception as e:
         logger.exception(e)
         return e
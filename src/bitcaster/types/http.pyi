@@ -5,11 +5,12 @@ from django.http import HttpRequest, HttpResponseBase, HttpResponseRedirect
 from rest_framework.request import Request
 from user_agents.parsers import UserAgent
 
-from bitcaster.models import ApiKey, User
+from bitcaster.cache.keys import ApiKeyRecord
+from bitcaster.models import User
 
 class ApiRequest(Request):
     user: Optional[User]
-    auth: Optional[ApiKey]
+    auth: Optional[ApiKeyRecord]
 
 # ApiRequest = TypeVar("ApiRequest", bound=Request, covariant=True)
 AnyRequest = TypeVar("AnyRequest", bound=HttpRequest, covariant=True)
@@ -0,0 +1,111 @@
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Sequence
+
+import jmespath
+import yaml
+from jmespath.parser import ParsedResult
+
+from ..cache.local import LocalCache
+
+if TYPE_CHECKING:
+    from bitcaster.models import Notification
+    from bitcaster.types.core import YamlPayload
+
+Matcher = Callable[[Any], bool]
+# a node of a MatchPlan: evaluates its subtree given the function that returns the value of a leaf
+PlanNode = Callable[[Callable[[int], bool]], bool]
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(expression: str) -> ParsedResult:
+    return jmespath.compile(expression)
+
+
+class MatchPlan:
+    """Evaluation plan of the payload filters of a set of Notifications.
+
+    Leaf expressions are deduplicated across all the filter trees: every distinct expression
+    is compiled once and evaluated at most once per payload, lazily, so that its result is
+    shared by all the AND/OR/NOT trees that reference it.
+    """
+
+    def __init__(self, rules: Iterable["YamlPayload"]) -> None:
+        self.expressions: list[ParsedResult] = []
+        self._index: dict[str, int] = {}
+        self.trees: list[PlanNode] = [self._compile(r) for r in rules]
+
+    def _leaf(self, expression: str) -> int:
+        if expression not in self._index:
+            self._index[expression] = len(self.expressions)
+            self.expressions.append(compile_expression(expression))
+        return self._index[expression]
+
+    def _compile(self, rules: "YamlPayload") -> PlanNode:
+        if not rules:
+            return lambda value: True
+        if isinstance(rules, str):
+            i = self._leaf(rules)
+            return lambda value: value(i)
+        if and_stm := rules.get("AND"):
+            nodes = [self._compile(r) for r in and_stm]
+            return lambda value: all(n(value) for n in nodes)
+        elif or_stm := rules.get("OR"):
+            nodes = [self._compile(r) for r in or_stm]
+            return lambda value: any(n(value) for n in nodes)
+        elif not_stm := rules.get("NOT"):
+            node = self._compile(not_stm)
+            return lambda value: not node(value)
+        return lambda value: False
+
+    def match(self, payload: Any) -> list[bool]:
+        """Return, for each filter of the plan, whether `payload` matches it."""
+        results: dict[int, bool] = {}
+
+        def value(i: int) -> bool:
+            if i not in results:
+                results[i] = bool(self.expressions[i].search(payload))
+            return results[i]
+
+        return [tree(value) for tree in self.trees]
+
+
+def compile_filter(rules: "YamlPayload") -> Matcher:
+    """Compile a filter tree into a callable.
+
+    A filter is either a JMESPath expression or a dict with one of the AND, OR, NOT keys
+    whose values are filters themselves. An empty filter matches everything.
+    """
+    plan = MatchPlan([rules])
+    return lambda payload: plan.match(payload)[0]
+
+
+class FilterCache(LocalCache[tuple[int, int], Matcher]):
+    """Per-process cache of the compiled Notification payload filters, keyed by (pk, version)."""
+
+    def get(self, notification: "Notification") -> Matcher:
+        if notification.pk is None:
+            return compile_filter(yaml.safe_load(notification.payload_filter or ""))
+        return self.get_or_set(
+            (notification.pk, notification.version),
+            lambda: compile_filter(yaml.safe_load(notification.payload_filter or "")),
+        )
+
+    def invalidate(self, notification_pk: int) -> None:
+        self.discard(lambda key: key[0] == notification_pk)
+
+
+class PlanCache(LocalCache[tuple[tuple[int, int], ...], MatchPlan]):
+    """Per-process cache of MatchPlans, keyed by the (pk, version) of the Notifications they include."""
+
+    def get(self, notifications: Sequence["Notification"]) -> MatchPlan:
+        return self.get_or_set(
+            tuple((n.pk, n.version) for n in notifications),
+            lambda: MatchPlan(yaml.safe_load(n.payload_filter or "") for n in notifications),
+        )
+
+    def invalidate(self, notification_pk: int) -> None:
+        self.discard(lambda key: any(pk == notification_pk for pk, __ in key))
+
+
+filters = FilterCache()
+plans = PlanCache(maxsize=256)
@@ -0,0 +1,69 @@
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Hashable, Optional, TypeVar
+
+from django.db import connections
+
+T = TypeVar("T")
+
+_lock = threading.Lock()
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_pid: Optional[int] = None
+
+
+def get_pool(max_workers: int) -> ThreadPoolExecutor:
+    """Return the per-process thread pool, (re)created after a fork or if `max_workers` changes.
+
+    Threads are kept alive between Occurrences so that their pooled dispatcher connections are reused.
+    A replaced pool is not shut down (lanes still running may need to queue their next task): its
+    threads exit once it is garbage collected.
+    """
+    global _pool, _pool_pid
+
+    with _lock:
+        if _pool is None or _pool_pid != os.getpid() or _pool._max_workers != max_workers:
+            _pool = ThreadPoolExecutor(max_workers, thread_name_prefix="bitcaster-lane")
+            _pool_pid = os.getpid()
+        return _pool
+
+
+class LaneExecutor:
+    """Run tasks on a thread pool, concurrently across lanes and in submission order within each lane.
+
+    A lane has at most one task in the pool at any time: the next one is queued when the previous
+    one completes, so a slow lane never holds more than one thread. If a task cannot be queued, its
+    future fails with the error raised by the pool.
+    """
+
+    def __init__(self, pool: ThreadPoolExecutor) -> None:
+        self.pool = pool
+        self.tails: dict[Hashable, Future[Any]] = {}
+
+    def submit(self, lane: Hashable, fn: Callable[..., T], *args: Any, **kwargs: Any) -> "Future[T]":
+        future: Future[T] = Future()
+
+        def run() -> None:
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                connections.close_all()  # of this thread, if any has been opened
+
+        def schedule(__: Any = None) -> None:
+            try:
+                self.pool.submit(run)
+            except BaseException as e:  # i.e. the pool has been shut down
+                # completing the future schedules (and fails) the following tasks of the lane as well
+                if future.set_running_or_notify_cancel():
+                    future.set_exception(e)
+
+        previous, self.tails[lane] = self.tails.get(lane), future
+        if previous is None:
+            schedule()
+        else:
+            previous.add_done_callback(schedule)
+        return future
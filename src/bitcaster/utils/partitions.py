@@ -0,0 +1,234 @@
+"""Optional range partitioning of the Occurrence table by `timestamp`.
+
+Partitioning is a Postgres only, opt-in layout enabled with `./manage.py occurrence_partitions --setup`:
+the existing table becomes the first partition and new partitions (daily or monthly) are created ahead
+of time. Postgres requires the partition key to be part of any unique constraint, so the primary key
+becomes (id, timestamp) and the foreign keys that reference Occurrence (`Delivery.occurrence`,
+`Occurrence.parent`) are no longer enforced by the database; their cascade is handled by
+`OccurrenceManager.delete_tree()` and by `drop_expired()`.
+"""
+
+import logging
+import re
+from datetime import datetime, timedelta
+from datetime import timezone as tz
+from typing import TYPE_CHECKING, NamedTuple, Optional
+
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+if TYPE_CHECKING:
+    from django.db.backends.utils import CursorWrapper
+
+logger = logging.getLogger(__name__)
+
+DAY = "day"
+MONTH = "month"
+INTERVALS = (DAY, MONTH)
+
+BOUND = re.compile(r"FROM \((?:MINVALUE|'(?P<lower>[^']+)')\) TO \((?:MAXVALUE|'(?P<upper>[^']+)')\)")
+
+
+class Partition(NamedTuple):
+    name: str
+    lower: Optional[datetime]
+    upper: Optional[datetime]
+
+
+def get_table() -> str:
+    from bitcaster.models import Occurrence
+
+    return Occurrence._meta.db_table
+
+
+def get_event_table() -> str:
+    from bitcaster.models import Event
+
+    return Event._meta.db_table
+
+
+def get_model_indexes_sql() -> list[str]:
+    """Return the statements that create the constraints and indexes declared in `Occurrence.Meta`."""
+    from bitcaster.models import Occurrence
+
+    editor = connection.schema_editor()
+    return [
+        str(item.create_sql(Occurrence, editor)) for item in [*Occurrence._meta.constraints, *Occurrence._meta.indexes]
+    ]
+
+
+def period_start(value: datetime, interval: str) -> datetime:
+    value = value.astimezone(tz.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == MONTH:
+        value = value.replace(day=1)
+    return value
+
+
+def next_period(value: datetime, interval: str) -> datetime:
+    if interval == MONTH:
+        return (value.replace(day=1) + timedelta(days=32)).replace(day=1)
+    return value + timedelta(days=1)
+
+
+def is_partitioned() -> bool:
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.relname = %s AND c.relnamespace = to_regnamespace(current_schema())::oid)",
+            [get_table()],
+        )
+        return cursor.fetchone()[0]
+
+
+def get_partitions() -> list[Partition]:
+    """Return the partitions of the Occurrence table ordered by their lower bound."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = %s::regclass",
+            [connection.ops.quote_name(get_table())],
+        )
+        partitions = []
+        for name, bound in cursor.fetchall():
+            if m := BOUND.search(bound):
+                lower, upper = m.group("lower"), m.group("upper")
+                partitions.append(
+                    Partition(name, lower and parse_datetime(lower), upper and parse_datetime(upper))  # type: ignore
+                )
+    return sorted(partitions, key=lambda p: p.lower or datetime.min.replace(tzinfo=tz.utc))
+
+
+def _drop_references(cursor: "CursorWrapper", table: str) -> None:
+    cursor.execute(
+        "SELECT conrelid::regclass, conname FROM pg_constraint WHERE contype = 'f' AND confrelid = %s::regclass",
+        [connection.ops.quote_name(table)],
+    )
+    for relation, name in cursor.fetchall():
+        cursor.execute(f"ALTER TABLE {relation} DROP CONSTRAINT {connection.ops.quote_name(name)}")
+
+
+def setup(interval: str = MONTH) -> Partition:
+    """Convert the Occurrence table into a range partitioned table.
+
+    The existing table, with all its rows, is attached as the partition that ends at the beginning
+    of the next period. Returns that partition.
+    """
+    table = get_table()
+    qn = connection.ops.quote_name
+    legacy = f"{table}_legacy"
+    upper = next_period(period_start(timezone.now(), interval), interval)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        _drop_references(cursor, table)
+        cursor.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {qn(table)}")
+        next_id = cursor.fetchone()[0]
+        cursor.execute(f"ALTER TABLE {qn(table)} ALTER COLUMN id DROP IDENTITY IF EXISTS")
+        cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [table])
+        if sequence := cursor.fetchone()[0]:  # serial column
+            cursor.execute(f"ALTER TABLE {qn(table)} ALTER COLUMN id DROP DEFAULT")
+            cursor.execute(f"DROP SEQUENCE {sequence}")
+        cursor.execute("SELECT conname FROM pg_constraint WHERE contype = 'p' AND conrelid = %s::regclass", [qn(table)])
+        cursor.execute(f"ALTER TABLE {qn(table)} DROP CONSTRAINT {qn(cursor.fetchone()[0])}")
+        cursor.execute(f"ALTER TABLE {qn(table)} RENAME TO {qn(legacy)}")
+        cursor.execute("SELECT indexrelid::regclass::text FROM pg_index WHERE indrelid = %s::regclass", [qn(legacy)])
+        for (index,) in cursor.fetchall():
+            cursor.execute(f"ALTER INDEX {index} RENAME TO {qn(f'{index.strip(chr(34))[:55]}_legacy')}")
+        cursor.execute(
+            f"CREATE TABLE {qn(table)} (LIKE {qn(legacy)} INCLUDING DEFAULTS) PARTITION BY RANGE (timestamp)"
+        )
+        cursor.execute(f"CREATE SEQUENCE {qn(f'{table}_id_seq')} START WITH {next_id} OWNED BY {qn(table)}.id")
+        cursor.execute(f"ALTER TABLE {qn(table)} ALTER COLUMN id SET DEFAULT nextval('{table}_id_seq')")
+        cursor.execute(f"ALTER TABLE {qn(table)} ADD PRIMARY KEY (id, timestamp)")
+        for statement in get_model_indexes_sql():
+            cursor.execute(statement)
+        cursor.execute(f"CREATE INDEX {qn(f'{table}_event_id')} ON {qn(table)} (event_id)")
+        cursor.execute(f"CREATE INDEX {qn(f'{table}_parent_id')} ON {qn(table)} (parent_id)")
+        cursor.execute(
+            f"ALTER TABLE {qn(table)} ADD FOREIGN KEY (event_id) REFERENCES {qn(get_event_table())} (id) "
+            "DEFERRABLE INITIALLY DEFERRED"
+        )
+        cursor.execute(
+            f"ALTER TABLE {qn(table)} ATTACH PARTITION {qn(legacy)} FOR VALUES FROM (MINVALUE) TO (%s)", [upper]
+        )
+    return Partition(legacy, None, upper)
+
+
+def create_partitions(interval: str = MONTH, ahead: int = 3) -> list[Partition]:
+    """Create the partitions needed to store the Occurrences of the next `ahead` periods.
+
+    New partitions start where the last one ends, so that the ranges are always contiguous
+    even if `interval` changes.
+    """
+    table = get_table()
+    qn = connection.ops.quote_name
+    partitions = get_partitions()
+    lower = partitions[-1].upper if partitions else period_start(timezone.now(), interval)
+    if lower is None:  # last partition is unbounded
+        return []
+    until = period_start(timezone.now(), interval)
+    for __ in range(ahead + 1):
+        until = next_period(until, interval)
+    created = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        while lower < until:
+            upper = next_period(period_start(lower, interval), interval)
+            name = f"{table}_{lower:%Y%m%d}" if interval == DAY else f"{table}_{lower:%Y%m}"
+            cursor.execute(
+                f"CREATE TABLE {qn(name)} PARTITION OF {qn(table)} FOR VALUES FROM (%s) TO (%s)", [lower, upper]
+            )
+            created.append(Partition(name, lower, upper))
+            lower = upper
+    return created
+
+
+def is_expired(partition: Partition) -> bool:
+    """Whether `partition` is in the past and contains no Occurrence still within its Event retention."""
+    from constance import config
+
+    if partition.upper is None or partition.upper > timezone.now():
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT EXISTS (SELECT 1 FROM {connection.ops.quote_name(partition.name)} o "
+            f"JOIN {connection.ops.quote_name(get_event_table())} e ON e.id = o.event_id "
+            "WHERE o.last_updated >= %s - interval '1 day' * COALESCE(e.occurrence_retention, %s))",
+            [timezone.now(), config.OCCURRENCE_DEFAULT_RETENTION],
+        )
+        return not cursor.fetchone()[0]
+
+
+def drop_expired(detach: bool = False, batch_size: int = 1000) -> list[Partition]:
+    """Drop (or only detach) the partitions whose Occurrences are all past their retention.
+
+    Deliveries and Idempotency Keys of the dropped Occurrences and descendants stored in other
+    partitions are deleted first, `batch_size` at a time.
+    """
+    from bitcaster.models import Delivery, IdempotencyKey, Occurrence
+
+    qn = connection.ops.quote_name
+    dropped = []
+    for partition in get_partitions():
+        if not is_expired(partition):
+            continue
+        in_partition = {"timestamp__lt": partition.upper}
+        if partition.lower:
+            in_partition["timestamp__gte"] = partition.lower
+        outside = Occurrence.objects.filter(**{f"parent__{k}": v for k, v in in_partition.items()}).exclude(
+            **in_partition
+        )
+        while ids := list(outside.values_list("pk", flat=True)[:batch_size]):
+            Occurrence.objects.delete_tree(ids)
+        for model in (Delivery, IdempotencyKey):
+            related = model.objects.filter(**{f"occurrence__{k}": v for k, v in in_partition.items()})
+            while ids := list(related.values_list("pk", flat=True)[:batch_size]):
+                model.objects.filter(pk__in=ids)._raw_delete(model.objects.db)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {qn(get_table())} DETACH PARTITION {qn(partition.name)}")
+            if not detach:
+                cursor.execute(f"DROP TABLE {qn(partition.name)}")
+        logger.info(f"Occurrence partition {partition.name} {'detached' if detach else 'dropped'}")
+        dropped.append(partition)
+    return dropped
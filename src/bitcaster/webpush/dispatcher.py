@@ -1,7 +1,8 @@
 import json
 import logging
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Iterable, Optional
 
+import requests
 from cryptography.hazmat.primitives import serialization
 from django import forms
 from django.utils.translation import gettext as _
@@ -10,6 +11,8 @@ from py_vapid import Vapid02, b64urlencode
 from bitcaster.dispatchers.base import (
     Dispatcher,
     DispatcherConfig,
+    DispatchResult,
+    Envelope,
     MessageProtocol,
     Payload,
 )
@@ -17,6 +20,13 @@ from bitcaster.exceptions import DispatcherError
 from bitcaster.models import Assignment
 from bitcaster.state import state
 
+from .utils import encrypt_all, get_subscription_info, webpush_send_message
+
+if TYPE_CHECKING:
+    from bitcaster.types.dispatcher import DispatcherHandler
+
+    from .utils import SubscriptionInfo
+
 logger = logging.getLogger(__name__)
 
 
@@ -79,18 +89,55 @@ class WebPushDispatcher(Dispatcher):
     protocol = MessageProtocol.WEBPUSH
     need_subscription = True
 
-    def send(self, address: str, payload: Payload, assignment: "Optional[Assignment]" = None, **kwargs: Any) -> bool:
-        try:
-            from .utils import webpush_send_message
+    def get_connection(self) -> "DispatcherHandler":
+        # a single session keeps a pool of connections per push service origin
+        return requests.Session()
 
-            if not assignment:
-                raise ValueError(_("WebPushDispatcher: assignment arg must be provided"))
+    @staticmethod
+    def get_subscription(assignment: "Optional[Assignment]") -> "SubscriptionInfo":
+        if not assignment:
+            raise ValueError(_("WebPushDispatcher: assignment arg must be provided"))
+        if not assignment.data:
+            raise DispatcherError(_("Assignment not subscribed"))
+        return get_subscription_info(assignment)
 
-            if not assignment.data:
-                raise DispatcherError(_("Assignment not subscribed"))
-            msg = json.dumps({"message": payload.message, "subject": payload.subject})
-            res: dict[str, Any] = webpush_send_message(message=msg, assignment=assignment, **kwargs)
+    @staticmethod
+    def get_message(payload: Payload) -> str:
+        return json.dumps({"message": payload.message, "subject": payload.subject})
+
+    def send(self, address: str, payload: Payload, assignment: "Optional[Assignment]" = None, **kwargs: Any) -> bool:
+        try:
+            self.get_subscription(assignment)
+            with self.connection() as session:
+                res = webpush_send_message(assignment, self.get_message(payload), session=session, **kwargs)
             return res["success"] == 1
+        except DispatcherError:
+            raise
         except Exception as e:
             logger.exception(e)
             raise DispatcherError(e)
+
+    def send_many(self, messages: Iterable[Envelope]) -> list[DispatchResult]:
+        """Send to many subscriptions, encrypting all the payloads first."""
+        messages = list(messages)
+        prepared: "list[tuple[SubscriptionInfo, str] | Exception]" = []
+        for __, payload, assignment in messages:
+            try:
+                prepared.append((self.get_subscription(assignment), self.get_message(payload)))
+            except Exception as e:
+                prepared.append(e if isinstance(e, DispatcherError) else DispatcherError(e))
+        bodies = iter(encrypt_all([item for item in prepared if not isinstance(item, Exception)]))
+        results = []
+        with self.connection() as session:
+            for (address, __, assignment), item in zip(messages, prepared):
+                try:
+                    if isinstance(item, Exception):
+                        raise item
+                    if isinstance(body := next(bodies), Exception):
+                        raise body
+                    webpush_send_message(assignment, item[1], session=session, body=body)
+                    results.append(DispatchResult(address, True))
+                except Exception as e:
+                    logger.exception(e)
+                    results.append(DispatchResult(address, False, e))
+        return results
@@ -1,20 +1,43 @@
+import functools
+import hashlib
 import json
 import logging
-from typing import TYPE_CHECKING, Any, TypedDict
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Any, Optional, TypedDict
+from urllib.parse import urlsplit
 
+import requests
+from django.conf import settings
 from django.core.signing import Signer
-from pywebpush import WebPushException, webpush
+from py_vapid import Vapid
+from pywebpush import WebPusher, WebPushException
 
-from bitcaster.exceptions import DispatcherError
+from bitcaster.cache.local import LocalCache
+from bitcaster.dispatchers.base import get_retry_after
+from bitcaster.exceptions import (
+    DispatcherError,
+    DispatcherRateLimited,
+    SubscriptionExpired,
+)
 
 if TYPE_CHECKING:
     from bitcaster.models import Assignment
 
     SignatureT = TypedDict("SignatureT", {"pk": int, "address": str})
+    SubscriptionInfo = TypedDict("SubscriptionInfo", {"endpoint": str, "keys": dict[str, str]})
 
 
 logger = logging.getLogger(__name__)
 
+TIMEOUT = 10  # seconds
+VAPID_TTL = 12 * 60 * 60  # seconds, lifetime of the signed VAPID JWT (24 hours at most)
+VAPID_RENEW = 10 * 60  # seconds before the expiry a new JWT is signed
+GONE = (404, 410)  # the subscription has expired or has been revoked
+
 
 def sign(assignment: "Assignment") -> str:
     signer = Signer()
@@ -28,23 +51,128 @@ def unsign(secret: str) -> "SignatureT":
     return data
 
 
-def webpush_send_message(assignment: "Assignment", message: str, **kwargs: Any) -> dict[str, Any]:
-    subscription: dict[str, str] = assignment.data["webpush"]["subscription"]
-    cfg: "dict[str,str]" = assignment.channel.config
+@functools.lru_cache(maxsize=64)
+def get_vapid(private_key: str) -> Vapid:
+    """Return the parsed VAPID private key."""
+    return Vapid.from_string(private_key=private_key)
+
+
+class VapidCache(LocalCache[tuple[str, str, str], tuple[int, dict[str, str]]]):
+    """Per-process cache of the signed VAPID headers.
+
+    Headers are keyed by (private key digest, claims, audience) and signed again `VAPID_RENEW`
+    seconds before they expire, so the JWT is signed once per push service for hours. All the
+    configured claims are signed, except `aud` and `exp`: the audience is the origin of the push
+    service (RFC 8292) and the expiry is managed by the cache.
+    """
+
+    def get(self, private_key: str, claims: dict[str, Any], audience: str) -> dict[str, str]:
+        claims = {k: v for k, v in claims.items() if k not in ("aud", "exp")}
+        key = (hashlib.sha256(private_key.encode()).hexdigest(), json.dumps(claims, sort_keys=True), audience)
+        if (entry := self.peek(key)) and entry[0] - VAPID_RENEW > time.time():
+            return entry[1]
+        expires = int(time.time()) + VAPID_TTL
+        headers = get_vapid(private_key).sign({**claims, "aud": audience, "exp": expires})
+        self.set(key, (expires, headers))
+        return headers
+
+
+vapid_headers = VapidCache(maxsize=256)
+
+
+def get_subscription_info(assignment: "Assignment") -> "SubscriptionInfo":
+    subscription: dict[str, Any] = assignment.data["webpush"]["subscription"]
+    return {"endpoint": subscription["endpoint"], "keys": subscription["keys"]}
+
+
+def get_audience(endpoint: str) -> str:
+    """Return the origin of the push service, the audience of the VAPID JWT."""
+    url = urlsplit(endpoint)
+    return f"{url.scheme}://{url.netloc}"
+
+
+def get_headers(cfg: dict[str, Any], endpoint: str, ttl: int = 0) -> dict[str, str]:
+    headers = {"content-encoding": "aes128gcm", "ttl": str(ttl)}
+    if claims := json.loads(cfg.get("CLAIMS") or "{}"):
+        if not cfg.get("private_key"):
+            raise DispatcherError("VAPID private key missing")
+        headers.update(vapid_headers.get(cfg["private_key"], claims, get_audience(endpoint)))
+    return headers
+
+
+def encrypt(subscription_info: "SubscriptionInfo", message: str) -> bytes:
+    """Encrypt `message` for the subscription (ECDH + AES-GCM, RFC 8291)."""
+    return WebPusher(subscription_info).encode(message.encode(), "aes128gcm")["body"]
+
 
-    subscription_info = {"endpoint": subscription["endpoint"], "keys": subscription["keys"]}
-    results: dict[str, Any] = {"results": []}
+_pool_lock = threading.Lock()
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_pid: Optional[int] = None
+
+
+def get_encryption_pool() -> ThreadPoolExecutor:
+    """Return the per-process encryption pool, (re)created after a fork.
+
+    Threads are enough: the `cryptography` primitives (ECDH, HKDF, AES-GCM) release the GIL.
+    """
+    global _pool, _pool_pid
+
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ThreadPoolExecutor(settings.WEBPUSH_ENCRYPTION_WORKERS, thread_name_prefix="bitcaster-webpush")
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def _encrypt(item: "tuple[SubscriptionInfo, str]") -> bytes | DispatcherError:
+    try:
+        return encrypt(*item)
+    except Exception as e:
+        return DispatcherError(str(e))
+
+
+def encrypt_all(items: "list[tuple[SubscriptionInfo, str]]") -> list[bytes | DispatcherError]:
+    """Encrypt many messages, returning the error of the ones that cannot be encrypted.
+
+    At least `WEBPUSH_PARALLEL_THRESHOLD` messages are encrypted in parallel by the encryption pool.
+    """
+    if settings.WEBPUSH_PARALLEL_THRESHOLD and len(items) >= settings.WEBPUSH_PARALLEL_THRESHOLD:
+        return list(get_encryption_pool().map(_encrypt, items))
+    return [_encrypt(item) for item in items]
+
+
+def push(
+    session: "requests.Session", endpoint: str, body: bytes, headers: dict[str, str], timeout: int = TIMEOUT
+) -> None:
+    res = session.post(endpoint, data=body, headers=headers, timeout=timeout)
+    if res.status_code in GONE:
+        raise SubscriptionExpired(res.status_code, res.text)
+    if res.status_code == 429:
+        raise DispatcherRateLimited(get_retry_after(res.headers.get("Retry-After")), res.text)
+    if res.status_code > 202:
+        raise DispatcherError(f"Push failed: {res.status_code} {res.reason}\nResponse body:{res.text}")
+
+
+def webpush_send_message(
+    assignment: "Assignment",
+    message: str,
+    session: "Optional[requests.Session]" = None,
+    body: Optional[bytes] = None,
+    ttl: int = 0,
+) -> dict[str, Any]:
+    """Send `message` to the WebPush subscription of `assignment`.
+
+    `body` is the already encrypted `message`, if available (see `encrypt_all()`).
+    """
+    subscription_info = get_subscription_info(assignment)
+    cfg: "dict[str,str]" = assignment.channel.config
     try:
-        webpush(
-            subscription_info=subscription_info,
-            data=message,
-            vapid_private_key=cfg["private_key"],
-            vapid_claims=json.loads(cfg["CLAIMS"]),
-            verbose=True,
-            **kwargs,
-        )
-        results["success"] = 1
-        return results
+        if body is None:
+            body = encrypt(subscription_info, message)
+        headers = get_headers(cfg, subscription_info["endpoint"], ttl)
     except WebPushException as e:
         logger.exception(e)
         raise DispatcherError(e.message)
+    with nullcontext(session) if session else requests.Session() as s:
+        push(s, subscription_info["endpoint"], body, headers)
+    return {"results": [], "success": 1}
@@ -75,6 +75,7 @@ class SubscribeView(SecretMixin, RedirectView):
         assignment: Assignment = self.unsign()
         assignment.data = {"webpush": json.loads(request.body)}
         assignment.validated = True
+        assignment.active = True  # deactivated if the previous subscription expired
         assignment.save()
         return JsonResponse({"error": "Subscription created"}, status=201)
 
@@ -116,6 +116,17 @@ def test_configure(app: DjangoTestApp, gmail_channel: "Channel") -> None:
     assert res.status_code == 302
 
 
+def test_close_circuit(app: DjangoTestApp, gmail_channel: "Channel") -> None:
+    breaker = gmail_channel.breaker
+    breaker.open()
+    res = app.get(reverse(admin_urlname(Channel._meta, SafeString("change")), args=[gmail_channel.pk]))
+    assert "open (retry in" in res.text
+
+    res = app.get(reverse(admin_urlname(Channel._meta, SafeString("close_circuit")), args=[gmail_channel.pk]))
+    assert res.status_code == 302
+    assert breaker.get_state() == "closed"
+
+
 def test_test_404(app: DjangoTestApp) -> None:
     opts: Options[Channel] = Channel._meta
     url = reverse(admin_urlname(opts, SafeString("test")), args=[-1])
@@ -1,7 +1,9 @@
+from datetime import timedelta
 from typing import TYPE_CHECKING, Any
 
 import pytest
 from django.urls import reverse
+from django.utils import timezone
 from pytest_django.fixtures import DjangoAssertNumQueries, SettingsWrapper
 from responses import RequestsMock
 from testutils.factories.user import SuperUserFactory
@@ -43,3 +45,23 @@ def test_admin_index(app: "DjangoTestApp", data: Any, django_assert_num_queries:
     with django_assert_num_queries(14):
         res = app.get(url)
         assert res.status_code == 200
+
+
+def test_admin_dashboard(django_app_factory: "MixinWithInstanceVariables", settings: SettingsWrapper) -> None:
+    from testutils.factories import OccurrenceFactory, OccurrenceRollupFactory
+
+    from bitcaster.admin_site import LAST_EVENTS
+
+    settings.FLAGS = {"OLD_STYLE_UI": [("boolean", False)]}
+    rollup = OccurrenceRollupFactory(count=7)
+    now = timezone.now()
+    for i in range(LAST_EVENTS + 1):
+        OccurrenceFactory(event=rollup.event, timestamp=now - timedelta(minutes=i))
+    django_app = django_app_factory(csrf_checks=False)
+    django_app.set_user(SuperUserFactory(username="superuser"))
+    res = django_app.get(reverse("admin:index"))
+    assert res.status_code == 200
+    assert len(res.context["last_events"]) == LAST_EVENTS
+    assert [(r["event_name"], r["new"], r["total"]) for r in res.context["event_stats"]["day"]] == [
+        (rollup.event.name, 7, 7)
+    ]
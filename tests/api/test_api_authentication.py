@@ -4,6 +4,7 @@ from unittest.mock import MagicMock
 import pytest
 from django.test.client import RequestFactory
 from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.test import APIClient
 from testutils.factories.event import EventFactory
 from testutils.factories.key import ApiKeyFactory
@@ -13,6 +14,8 @@ from bitcaster.api.permissions import ApiKeyAuthentication
 from bitcaster.auth.constants import Grant
 
 if TYPE_CHECKING:
+    from pytest_django import DjangoAssertNumQueries
+
     from bitcaster.models import ApiKey, Event, User
     from bitcaster.types.http import ApiRequest
 
@@ -59,3 +62,21 @@ def test_handle_permission_error(client: APIClient, key: "ApiKey") -> None:
 
     res = client.get(url, data={})
     assert res.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_authenticate_cached(
+    rf: "RequestFactory", context: "Context", django_assert_num_queries: "DjangoAssertNumQueries"
+) -> None:
+    b: ApiKeyAuthentication = context["backend"]
+    api_key: ApiKey = context["key"]
+    req = cast("ApiRequest", rf.get("/", headers={"AUTHORIZATION": "Key %s" % api_key.key}))
+    b.authenticate(req)
+    with django_assert_num_queries(0):
+        user, record = b.authenticate(req)
+    assert user == api_key.user
+    assert record.application.pk == api_key.application.pk
+
+    api_key.user.is_active = False
+    api_key.user.save()
+    with pytest.raises(AuthenticationFailed):
+        b.authenticate(req)
@@ -3,12 +3,15 @@ from typing import TYPE_CHECKING, Any, TypedDict
 from unittest.mock import Mock
 
 import pytest
+from django.db import IntegrityError
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APIClient
 from testutils.perms import key_grants, lock
 
 from bitcaster.auth.constants import Grant
 from bitcaster.constants import SystemEvent
+from bitcaster.dispatchers.base import DispatchResult, Envelope
 from bitcaster.tasks import process_occurrence
 
 if TYPE_CHECKING:
@@ -44,6 +47,10 @@ pytestmark = [pytest.mark.api, pytest.mark.django_db]
 # WE DO NOT USE REVERSE HERE. WE NEED TO CHECK ENDPOINTS CONTRACTS
 
 
+def sent(channel: "Channel", envelopes: "list[Envelope]") -> list[DispatchResult]:
+    return [DispatchResult(e.address, True) for e in envelopes]
+
+
 @pytest.fixture()
 def client() -> APIClient:
     c = APIClient()
@@ -217,13 +224,13 @@ def test_trigger_limit_to_receiver(client: APIClient, data: "Context", monkeypat
         assert res.data["occurrence"]
         o: "Occurrence" = Occurrence.objects.get(pk=res.data["occurrence"])
 
-    monkeypatch.setattr("bitcaster.models.notification.Notification.notify_to_channel", Mock())
+    monkeypatch.setattr("bitcaster.models.notification.Notification.send_envelopes", Mock(side_effect=sent))
     assert o.options == {"limit_to": [target.address.value]}
 
     delivered = process_occurrence(o.pk)
     assert delivered == 1
     o.refresh_from_db()
-    assert o.data == {"delivered": [target.pk], "recipients": [[target.address.value, target.channel.name]]}
+    assert list(o.deliveries.values_list("assignment", "channel")) == [(target.pk, target.channel.pk)]
 
 
 def test_trigger_limit_by_channel(client: APIClient, data: "Context", monkeypatch: "MonkeyPatch") -> None:
@@ -249,11 +256,11 @@ def test_trigger_limit_by_channel(client: APIClient, data: "Context", monkeypatc
         assert res.data["occurrence"]
         o: "Occurrence" = Occurrence.objects.get(pk=res.data["occurrence"])
 
-    monkeypatch.setattr("bitcaster.models.notification.Notification.notify_to_channel", Mock())
+    monkeypatch.setattr("bitcaster.models.notification.Notification.send_envelopes", Mock(side_effect=sent))
     assert o.options == {"channels": [str(target.channel.id)]}
     process_occurrence(o.pk)
     o.refresh_from_db()
-    assert list(set([x[1] for x in o.data["recipients"]]))[0] == target.channel.name
+    assert set(o.deliveries.values_list("channel", flat=True)) == {target.channel.pk}
 
 
 def test_trigger_limit_to_with_wrong_receiver(
@@ -278,7 +285,7 @@ def test_trigger_limit_to_with_wrong_receiver(
         assert res.data["occurrence"]
         o: "Occurrence" = Occurrence.objects.get(pk=res.data["occurrence"])
 
-    monkeypatch.setattr("bitcaster.models.notification.Notification.notify_to_channel", Mock())
+    monkeypatch.setattr("bitcaster.models.notification.Notification.send_envelopes", Mock(side_effect=sent))
     assert o.options == {"limit_to": ["invalid-address"]}
 
     delivered = process_occurrence(o.pk)
@@ -307,7 +314,7 @@ def test_trigger_selected_environment(
 
     from bitcaster.models import Occurrence
 
-    monkeypatch.setattr("bitcaster.models.notification.Notification.notify_to_channel", Mock())
+    monkeypatch.setattr("bitcaster.models.notification.Notification.send_envelopes", Mock(side_effect=sent))
     NotificationFactory(
         environments=["develop"],
         distribution__recipients=[AssignmentFactory(channel=data["channel"]) for __ in range(3)],
@@ -343,7 +350,7 @@ def test_trigger_environment_by_key(
 
     from bitcaster.models import Occurrence
 
-    monkeypatch.setattr("bitcaster.models.notification.Notification.notify_to_channel", Mock())
+    monkeypatch.setattr("bitcaster.models.notification.Notification.send_envelopes", Mock(side_effect=sent))
     NotificationFactory(
         environments=["develop"],
         distribution__recipients=[AssignmentFactory(channel=data["channel"]) for __ in range(3)],
@@ -419,3 +426,121 @@ def test_trigger_locked_event(
             res = client.post(url, data={"context": {}, "options": {}}, format="json")
             assert res.status_code == status.HTTP_400_BAD_REQUEST, res.json()
             assert res.json() == {"error": "Unable to process this event. Event locked"}
+
+
+def test_trigger_batch(client: APIClient, data: "Context") -> None:
+    from bitcaster.models import Occurrence
+
+    api_key = data["key"]
+    url: str = f"{data['url']}batch/"
+    cid = str(uuid.uuid4())
+    client.credentials(HTTP_AUTHORIZATION=f"Key {api_key.key}")
+    with key_grants(api_key, Grant.EVENT_TRIGGER):
+        res = client.post(
+            f"{url}?cid=default",
+            data=[{"context": {"idx": 1}}, {"context": 22}, {"context": {"idx": 3}, "cid": cid, "options": {}}],
+            format="json",
+        )
+        assert res.status_code == status.HTTP_201_CREATED, res.json()
+        first, error, last = res.json()["occurrences"]
+        assert error["errors"]["context"]
+        o1 = Occurrence.objects.get(pk=first["occurrence"])
+        o3 = Occurrence.objects.get(pk=last["occurrence"])
+        assert (o1.context, o1.correlation_id) == ({"idx": 1}, "default")
+        assert (o3.context, o3.correlation_id) == ({"idx": 3}, cid)
+        assert o1.timestamp < o3.timestamp
+
+        res = client.post(
+            url, data=b'{"context": {"a": 1}}\n\n{"context": {"a": 2}}\n', content_type="application/x-ndjson"
+        )
+        assert res.status_code == status.HTTP_201_CREATED, res.json()
+        assert len(res.json()["occurrences"]) == 2
+
+        res = client.post(url, data=b'{"context": \n', content_type="application/x-ndjson")
+        assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+        res = client.post(url, data={"context": {}}, format="json")
+        assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+        res = client.post(url, data=[{"context": 1}], format="json")
+        assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_trigger_batch_conflict(client: APIClient, data: "Context", monkeypatch: "MonkeyPatch") -> None:
+    api_key = data["key"]
+    url: str = f"{data['url']}batch/"
+    monkeypatch.setattr("bitcaster.models.event.Event.trigger_many", Mock(side_effect=IntegrityError))
+    client.credentials(HTTP_AUTHORIZATION=f"Key {api_key.key}")
+    with key_grants(api_key, Grant.EVENT_TRIGGER):
+        res = client.post(url, data=[{"context": {}}], format="json")
+        assert res.status_code == status.HTTP_409_CONFLICT, res.json()
+
+
+def test_trigger_batch_locked(client: APIClient, data: "Context", system_objects: Any) -> None:
+    api_key = data["key"]
+    url: str = f"{data['url']}batch/"
+    evt: Event = data["event"]
+    client.credentials(HTTP_AUTHORIZATION=f"Key {api_key.key}")
+    with key_grants(api_key, Grant.EVENT_TRIGGER):
+        with lock(evt):
+            res = client.post(url, data=[{"context": {}}], format="json")
+            assert res.status_code == status.HTTP_400_BAD_REQUEST, res.json()
+            assert res.json() == {"error": "Unable to process this event. Event locked"}
+
+
+@pytest.mark.parametrize("inactive", ["active", "channels"])
+def test_trigger_inactive(client: APIClient, data: "Context", inactive: str) -> None:
+    from bitcaster.models import Occurrence
+
+    api_key = data["key"]
+    url: str = data["url"]
+    evt: Event = data["event"]
+    if inactive == "active":
+        evt.active = False
+        evt.save()
+    else:
+        evt.channels.clear()
+    client.credentials(HTTP_AUTHORIZATION=f"Key {api_key.key}")
+    with key_grants(api_key, Grant.EVENT_TRIGGER):
+        res = client.post(url, data={"context": {}}, format="json")
+        assert res.status_code == status.HTTP_200_OK, res.json()
+        assert res.json() == {"occurrence": None}
+
+        res = client.post(f"{url}batch/", data=[{"context": {}}, {"context": 22}], format="json")
+        assert res.status_code == status.HTTP_200_OK, res.json()
+        ok, error = res.json()["occurrences"]
+        assert ok == {"occurrence": None}
+        assert error["errors"]["context"]
+    assert not Occurrence.objects.filter(event=evt).exists()
+
+
+def test_trigger_idempotency_key(client: APIClient, data: "Context") -> None:
+    from django.core.cache import cache
+
+    from bitcaster.models import IdempotencyKey, Occurrence
+
+    api_key = data["key"]
+    url: str = data["url"]
+    client.credentials(HTTP_AUTHORIZATION=f"Key {api_key.key}")
+    with key_grants(api_key, Grant.EVENT_TRIGGER):
+        res = client.post(url, data={"context": {"a": 1}}, format="json", HTTP_IDEMPOTENCY_KEY="abc")
+        assert res.status_code == status.HTTP_201_CREATED, res.json()
+        pk = res.json()["occurrence"]
+
+        res = client.post(url, data={"context": {"a": 2}}, format="json", HTTP_IDEMPOTENCY_KEY="abc")
+        assert res.status_code == status.HTTP_200_OK, res.json()
+        assert res.json()["occurrence"] == pk
+        assert res.headers["Idempotent-Replayed"] == "true"
+
+        cache.clear()  # database lookup
+        res = client.post(url, data={"context": {"a": 2}}, format="json", HTTP_IDEMPOTENCY_KEY="abc")
+        assert res.json()["occurrence"] == pk
+        assert Occurrence.objects.filter(event=data["event"]).count() == 1
+
+        # expired keys can be reused
+        IdempotencyKey.objects.update(expires=timezone.now())
+        cache.clear()
+        res = client.post(url, data={"context": {"a": 3}}, format="json", HTTP_IDEMPOTENCY_KEY="abc")
+        assert res.status_code == status.HTTP_201_CREATED, res.json()
+        assert res.json()["occurrence"] != pk
+        assert IdempotencyKey.objects.get().occurrence.context == {"a": 3}
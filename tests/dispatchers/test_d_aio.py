@@ -0,0 +1,59 @@
+import asyncio
+from typing import Generator
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from bitcaster.dispatchers.aio import AsyncRuntime
+
+pytestmark = [pytest.mark.dispatcher]
+
+
+@pytest.fixture
+def rt() -> Generator[AsyncRuntime, None, None]:
+    runtime = AsyncRuntime()
+    yield runtime
+    runtime.close()
+
+
+def test_run(rt: AsyncRuntime) -> None:
+    async def coro() -> asyncio.AbstractEventLoop:
+        return asyncio.get_running_loop()
+
+    assert rt.run(coro()) is rt.loop
+    assert rt.run(coro()) is rt.loop
+
+
+def test_client(rt: AsyncRuntime) -> None:
+    old = Mock(closed=False, close=AsyncMock())
+    factory = Mock(side_effect=[old, Mock(closed=False)])
+
+    async def get(version: int) -> Mock:
+        return rt.client("key", factory, version)
+
+    assert rt.run(get(1)) is old
+    assert rt.run(get(1)) is old
+    assert rt.run(get(2)) is not old
+    rt.run(asyncio.sleep(0))
+    old.close.assert_awaited_once()
+
+
+def test_fork(rt: AsyncRuntime, monkeypatch: pytest.MonkeyPatch) -> None:
+    loop = rt.loop
+    monkeypatch.setattr("os.getpid", lambda: -1)
+    forked = rt.loop
+    monkeypatch.undo()
+    assert forked is not loop
+    for lp in (loop, forked):
+        lp.call_soon_threadsafe(lp.stop)
+
+
+def test_close(rt: AsyncRuntime) -> None:
+    async def get() -> Mock:
+        return rt.client("key", lambda: Mock(closed=False, close=AsyncMock()))
+
+    client = rt.run(get())
+    loop = rt.loop
+    rt.close()
+    client.close.assert_awaited_once()
+    assert rt.loop is not loop
@@ -1,9 +1,15 @@
+from typing import Any
 from unittest.mock import Mock
 
 import pytest
 from strategy_field.utils import fqn
 
-from bitcaster.dispatchers.base import dispatcherManager
+from bitcaster.dispatchers.base import (
+    DispatchResult,
+    Envelope,
+    dispatcherManager,
+    get_retry_after,
+)
 
 pytestmark = [pytest.mark.dispatcher, pytest.mark.django_db]
 
@@ -19,3 +25,38 @@ def test_methods() -> None:
     from testutils.dispatcher import XDispatcher
 
     assert XDispatcher(Mock()).subscribe(Mock())
+
+
+def test_send_many(monkeypatch: pytest.MonkeyPatch) -> None:
+    from testutils.dispatcher import XDispatcher
+
+    error = Exception("error")
+    monkeypatch.setattr(XDispatcher, "send", Mock(side_effect=[True, False, error]))
+    results = XDispatcher(Mock()).send_many([Envelope("a", Mock()), Envelope("b", Mock()), Envelope("c", Mock())])
+    assert results == [DispatchResult("a", True), DispatchResult("b", False), DispatchResult("c", False, error)]
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [(None, 1), ("", 1), ("30", 30), ("-1", 0), ("Wed, 21 Oct 2015 07:28:00 GMT", 0), ("invalid", 1)],
+)
+def test_get_retry_after(value: str, expected: float) -> None:
+    assert get_retry_after(value) == expected
+
+
+def test_async_send_many(monkeypatch: pytest.MonkeyPatch) -> None:
+    from testutils.dispatcher import XDispatcher
+
+    from bitcaster.dispatchers.aio import runtime
+
+    error = Exception("error")
+    sent = {"a": True, "b": False, "c": error}
+
+    def send(address: str, *args: Any) -> bool:
+        if isinstance(result := sent[address], Exception):
+            raise result
+        return result
+
+    monkeypatch.setattr(XDispatcher, "send", Mock(side_effect=send))
+    results = runtime.run(XDispatcher(Mock(pk=1)).async_send_many([Envelope(k, Mock()) for k in sent]))
+    assert results == [DispatchResult("a", True), DispatchResult("b", False), DispatchResult("c", False, error)]
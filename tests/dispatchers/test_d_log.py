@@ -3,8 +3,9 @@ from typing import TYPE_CHECKING
 import pytest
 from strategy_field.utils import fqn
 
+from bitcaster.dispatchers.base import Envelope
 from bitcaster.dispatchers.log import BitcasterSysDispatcher
-from bitcaster.models import Channel
+from bitcaster.models import Channel, LogMessage
 
 if TYPE_CHECKING:
     from bitcaster.dispatchers.base import Payload
@@ -16,3 +17,11 @@ def test_log(mail_payload: "Payload") -> None:
     ch = Channel(dispatcher=fqn(BitcasterSysDispatcher), config={})
 
     assert BitcasterSysDispatcher(ch).send("123456", mail_payload)
+
+
+def test_log_send_many(mail_payload: "Payload") -> None:
+    ch = Channel(dispatcher=fqn(BitcasterSysDispatcher), config={})
+
+    results = BitcasterSysDispatcher(ch).send_many([Envelope("info", mail_payload), Envelope("error", mail_payload)])
+    assert [r.success for r in results] == [True, True]
+    assert sorted(LogMessage.objects.values_list("level", flat=True)) == ["error", "info"]
@@ -1,6 +1,6 @@
 import os
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 from unittest.mock import Mock
 
 import pytest
@@ -8,7 +8,7 @@ from django.core.exceptions import ValidationError
 from responses import RequestsMock
 
 from bitcaster.dispatchers import MailgunDispatcher
-from bitcaster.dispatchers.base import Payload
+from bitcaster.dispatchers.base import DispatchResult, Envelope, Payload
 
 if TYPE_CHECKING:
     from pytest import MonkeyPatch
@@ -34,3 +34,36 @@ def test_config() -> None:
     d: MailgunDispatcher = MailgunDispatcher(Mock(config={}))
     with pytest.raises(ValidationError):
         d.config
+
+
+def test_mailgun_send_many(monkeypatch: "MonkeyPatch", mail_payload: Payload, mailoutbox: list[Any]) -> None:
+    from anymail.exceptions import AnymailAPIError
+
+    from bitcaster.models import Channel, Project
+
+    monkeypatch.setattr(MailgunDispatcher, "backend", "anymail.backends.test.EmailBackend")
+    ch = Channel(
+        project=Project(from_email="sender@example.com"),
+        config={"api_key": "key", "sender_domain": "example.com"},
+    )
+    other = Payload("other", event=mail_payload.event, subject="other")
+    results = MailgunDispatcher(ch).send_many(
+        [
+            Envelope("a@example.com", mail_payload),
+            Envelope("b@example.com", other),
+            Envelope("c@example.com", mail_payload),
+        ]
+    )
+    assert results == [
+        DispatchResult("a@example.com", True),
+        DispatchResult("b@example.com", True),
+        DispatchResult("c@example.com", True),
+    ]
+    assert len(mailoutbox) == 2
+    assert mailoutbox[0].to == ["a@example.com", "c@example.com"]
+    assert mailoutbox[0].anymail_test_params["is_batch_send"]
+    assert mailoutbox[1].to == ["b@example.com"]
+
+    monkeypatch.setattr("anymail.backends.test.EmailBackend.post_to_esp", Mock(side_effect=AnymailAPIError("error")))
+    results = MailgunDispatcher(ch).send_many([Envelope("a@example.com", mail_payload)])
+    assert results[0].success is False
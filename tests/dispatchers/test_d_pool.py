@@ -0,0 +1,94 @@
+from typing import TYPE_CHECKING
+from unittest.mock import Mock
+
+import pytest
+from strategy_field.utils import fqn
+
+from bitcaster.dispatchers import SlackDispatcher
+from bitcaster.dispatchers.pool import ConnectionPool
+from bitcaster.models import Channel
+
+if TYPE_CHECKING:
+    from pytest import MonkeyPatch
+
+pytestmark = [pytest.mark.dispatcher, pytest.mark.django_db]
+
+
+@pytest.fixture()
+def dispatcher(monkeypatch: "MonkeyPatch") -> SlackDispatcher:
+    monkeypatch.setattr(SlackDispatcher, "get_connection", Mock(side_effect=lambda: Mock()))
+    return SlackDispatcher(Channel(pk=1, version=1, dispatcher=fqn(SlackDispatcher)))
+
+
+@pytest.fixture()
+def pool() -> ConnectionPool:
+    return ConnectionPool(idle_timeout=60, max_lifetime=600, check_after=10)
+
+
+def test_pool_reuse(pool: ConnectionPool, dispatcher: SlackDispatcher) -> None:
+    with pool.connection(dispatcher) as c1:
+        pass
+    with pool.connection(dispatcher) as c2:
+        pass
+    assert c1 is c2
+    assert dispatcher.get_connection.call_count == 1
+    c1.close.assert_not_called()
+
+
+def test_pool_version(pool: ConnectionPool, dispatcher: SlackDispatcher) -> None:
+    c1 = pool.acquire(dispatcher)
+    dispatcher.channel.version = 2
+    c2 = pool.acquire(dispatcher)
+    assert c1 is not c2
+    c1.close.assert_called_once()
+
+
+def test_pool_expired(pool: ConnectionPool, dispatcher: SlackDispatcher) -> None:
+    c1 = pool.acquire(dispatcher)
+    pool.entries[dispatcher.channel.pk].last_used -= 61
+    assert pool.acquire(dispatcher) is not c1
+    c1.close.assert_called_once()
+
+    c2 = pool.acquire(dispatcher)
+    pool.entries[dispatcher.channel.pk].created -= 601
+    assert pool.acquire(dispatcher) is not c2
+
+
+def test_pool_health_check(pool: ConnectionPool, dispatcher: SlackDispatcher, monkeypatch: "MonkeyPatch") -> None:
+    monkeypatch.setattr(SlackDispatcher, "check_connection", check := Mock(return_value=False))
+    c1 = pool.acquire(dispatcher)
+    assert pool.acquire(dispatcher) is c1
+    check.assert_not_called()
+
+    pool.entries[dispatcher.channel.pk].last_used -= 11
+    assert pool.acquire(dispatcher) is not c1
+    check.assert_called_once_with(c1)
+
+
+def test_pool_error(pool: ConnectionPool, dispatcher: SlackDispatcher) -> None:
+    with pytest.raises(ValueError):
+        with pool.connection(dispatcher) as c1:
+            raise ValueError()
+    c1.close.assert_called_once()
+    assert pool.entries == {}
+
+
+def test_pool_unsaved_channel(pool: ConnectionPool, dispatcher: SlackDispatcher) -> None:
+    dispatcher.channel.pk = None
+    with pool.connection(dispatcher) as c1:
+        pass
+    c1.close.assert_called_once()
+    assert pool.entries == {}
+
+
+def test_pool_invalidate_on_save(dispatcher: SlackDispatcher) -> None:
+    from testutils.factories import ChannelFactory
+
+    from bitcaster.dispatchers.pool import connections
+
+    ch: Channel = ChannelFactory()
+    dispatcher.channel = ch
+    c1 = connections.acquire(dispatcher)
+    ch.save()
+    c1.close.assert_called_once()
+    assert ch.pk not in connections.entries
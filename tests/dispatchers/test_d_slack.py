@@ -1,9 +1,14 @@
+from typing import Any
+from unittest.mock import AsyncMock, Mock
+
 import pytest
 from responses import RequestsMock
 from strategy_field.utils import fqn
 
 from bitcaster.dispatchers import SlackDispatcher
+from bitcaster.dispatchers.aio import runtime
 from bitcaster.dispatchers.base import Payload
+from bitcaster.exceptions import DispatcherRateLimited
 from bitcaster.models import Channel
 
 pytestmark = [pytest.mark.dispatcher, pytest.mark.django_db]
@@ -17,3 +22,44 @@ def test_twilio_send(mail_payload: Payload, mocked_responses: RequestsMock, twil
     )
 
     assert SlackDispatcher(ch).send("123456", mail_payload)
+
+
+def test_slack_rate_limited(mail_payload: Payload, mocked_responses: RequestsMock) -> None:
+    mocked_responses.add(
+        mocked_responses.POST, "http://test-slack.com/abdce/", status=429, headers={"Retry-After": "10"}
+    )
+    ch = Channel(dispatcher=fqn(SlackDispatcher), config={"url": "http://test-slack.com/abdce/"})
+
+    with pytest.raises(DispatcherRateLimited) as e:
+        SlackDispatcher(ch).send("123456", mail_payload)
+    assert e.value.retry_after == 10
+
+
+class FakeSession:
+    def __init__(self, status: int, headers: dict[str, str]) -> None:
+        self.response = Mock(status=status, headers=headers, text=AsyncMock(return_value=""))
+        self.post = Mock(return_value=self)
+
+    async def __aenter__(self) -> Mock:
+        return self.response
+
+    async def __aexit__(self, *args: Any) -> None:
+        pass
+
+
+@pytest.mark.parametrize("status,expected", [(200, True), (500, False)])
+def test_slack_async_send(mail_payload: Payload, monkeypatch: pytest.MonkeyPatch, status: int, expected: bool) -> None:
+    monkeypatch.setattr(runtime, "session", session := Mock(return_value=FakeSession(status, {})))
+    ch = Channel(dispatcher=fqn(SlackDispatcher), config={"url": "http://test-slack.com/abdce/"})
+
+    assert runtime.run(SlackDispatcher(ch).async_send("123456", mail_payload)) is expected
+    session.assert_called_with("http://test-slack.com")
+
+
+def test_slack_async_rate_limited(mail_payload: Payload, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(runtime, "session", Mock(return_value=FakeSession(429, {"Retry-After": "10"})))
+    ch = Channel(dispatcher=fqn(SlackDispatcher), config={"url": "http://test-slack.com/abdce/"})
+
+    with pytest.raises(DispatcherRateLimited) as e:
+        runtime.run(SlackDispatcher(ch).async_send("123456", mail_payload))
+    assert e.value.retry_after == 10
@@ -1,14 +1,18 @@
 from typing import TYPE_CHECKING, Any
 from unittest import mock
-from unittest.mock import Mock
+from unittest.mock import AsyncMock, Mock
 
 import pytest
 from strategy_field.utils import fqn
 from twilio.base.exceptions import TwilioRestException
+from twilio.http.async_http_client import AsyncTwilioHttpClient
+from twilio.http.http_client import TwilioHttpClient
+from twilio.http.response import Response
 
+from bitcaster.dispatchers.aio import runtime
 from bitcaster.dispatchers.base import Payload
 from bitcaster.dispatchers.twilio import TwilioSMS
-from bitcaster.exceptions import DispatcherError
+from bitcaster.exceptions import DispatcherError, DispatcherRateLimited
 from bitcaster.models import Channel
 
 if TYPE_CHECKING:
@@ -34,4 +38,39 @@ def test_twilio_send(mail_payload: "Payload", smsoutbox: list[Any], twilio_sid:
         config={"sid": twilio_sid, "token": "__token__", "number": "123456"},
     )
 
-    assert TwilioSMS(ch).send("123456", mail_payload)
+    dispatcher = TwilioSMS(ch)
+    assert dispatcher.send("123456", mail_payload)
+    assert dispatcher.send("654321", mail_payload)
+    assert [sms["From"] for sms in smsoutbox] == ["123456", "123456"]
+
+
+@pytest.mark.parametrize("status,error", [(201, None), (429, DispatcherRateLimited), (400, DispatcherError)])
+def test_twilio_async_send(monkeypatch: "MonkeyPatch", mail_payload: "Payload", status: int, error: Any) -> None:
+    monkeypatch.setattr(AsyncTwilioHttpClient, "request", request := AsyncMock(return_value=Response(status, "{}")))
+    ch = Channel(
+        dispatcher=fqn(TwilioSMS),
+        config={"sid": "__sid__", "token": "__token__", "number": "123456"},
+    )
+    if error:
+        with pytest.raises(error):
+            runtime.run(TwilioSMS(ch).async_send("654321", mail_payload))
+    else:
+        assert runtime.run(TwilioSMS(ch).async_send("654321", mail_payload))
+    assert request.call_args.kwargs["data"] == {"To": "654321", "From": "123456", "Body": mail_payload.message}
+
+
+def test_twilio_rate_limited(monkeypatch: "MonkeyPatch", mail_payload: "Payload") -> None:
+    response = Response(429, "{}", {"Retry-After": "10"})
+    monkeypatch.setattr(TwilioHttpClient, "request", Mock(return_value=response))
+    monkeypatch.setattr(AsyncTwilioHttpClient, "request", AsyncMock(return_value=response))
+    ch = Channel(
+        dispatcher=fqn(TwilioSMS),
+        config={"sid": "__sid__", "token": "__token__", "number": "123456"},
+    )
+    with pytest.raises(DispatcherRateLimited) as e:
+        TwilioSMS(ch).send("654321", mail_payload)
+    assert e.value.retry_after == 10
+
+    with pytest.raises(DispatcherRateLimited) as e:
+        runtime.run(TwilioSMS(ch).async_send("654321", mail_payload))
+    assert e.value.retry_after == 10
@@ -1,9 +1,11 @@
 import os
+import smtplib
+from typing import Any
 from unittest.mock import ANY, Mock, patch
 
 import pytest
 
-from bitcaster.dispatchers.base import Payload
+from bitcaster.dispatchers.base import DispatchResult, Envelope, Payload
 
 pytestmark = [pytest.mark.dispatcher, pytest.mark.django_db]
 
@@ -30,3 +32,48 @@ def test_smtp(mail_payload: Payload) -> None:
         s.login.assert_called()
         s.sendmail.assert_called()
         s.sendmail.assert_called_with(from_addr=os.environ["GMAIL_USER"], to_addrs=["test@example.com"], msg=ANY)
+
+
+def test_smtp_send_many(mail_payload: Payload) -> None:
+    from bitcaster.dispatchers import EmailDispatcher
+    from bitcaster.models import Channel, Project
+
+    with patch("django.core.mail.backends.smtp.smtplib.SMTP", autospec=True) as mock:
+        s: Mock = mock.return_value
+        s.sendmail.side_effect = [{}, OSError("error"), {}]
+        results = EmailDispatcher(
+            Channel(
+                project=Project(from_email="sender@example.com"),
+                config={"host": "localhost", "port": 25, "username": "test", "password": "<PASSWORD>"},
+            )
+        ).send_many(Envelope(f"test{i}@example.com", mail_payload) for i in range(3))
+        assert mock.call_count == 1
+        assert s.sendmail.call_count == 3
+        assert [r.success for r in results] == [True, False, True]
+        assert results[0] == DispatchResult("test0@example.com", True)
+
+
+@pytest.mark.parametrize(
+    "sendmail,logins,expected",
+    [
+        ([{}, smtplib.SMTPServerDisconnected(), {}, {}], 2, [True, True, True]),
+        ([{}, smtplib.SMTPServerDisconnected(), smtplib.SMTPServerDisconnected()], 2, [True, False, False]),
+    ],
+)
+def test_smtp_send_many_disconnected(
+    mail_payload: Payload, sendmail: list[Any], logins: int, expected: list[bool]
+) -> None:
+    from bitcaster.dispatchers import EmailDispatcher
+    from bitcaster.models import Channel, Project
+
+    with patch("django.core.mail.backends.smtp.smtplib.SMTP", autospec=True) as mock:
+        s: Mock = mock.return_value
+        s.sendmail.side_effect = sendmail
+        results = EmailDispatcher(
+            Channel(
+                project=Project(from_email="sender@example.com"),
+                config={"host": "localhost", "port": 25, "username": "test", "password": "<PASSWORD>"},
+            )
+        ).send_many(Envelope(f"test{i}@example.com", mail_payload) for i in range(3))
+        assert s.login.call_count == logins
+        assert [r.success for r in results] == expected
@@ -5,10 +5,12 @@ from .address import AddressFactory  # noqa
 from .assignment import AssignmentFactory  # noqa
 from .browser import BrowserFactory  # noqa
 from .channel import ChannelFactory  # noqa
+from .delivery import DeliveryFactory  # noqa
 from .distribution import DistributionListFactory  # noqa
 from .django_auth import GroupFactory, PermissionFactory  # noqa
 from .django_celery_beat import PeriodicTaskFactory  # noqa
 from .event import EventFactory  # noqa
+from .idempotency import IdempotencyKeyFactory  # noqa
 from .internal import LogMessageFactory  # noqa
 from .key import ApiKeyFactory  # noqa
 from .log import LogEntryFactory  # noqa
@@ -18,6 +20,7 @@ from .monitor import MonitorFactory  # noqa
 from .notification import NotificationFactory  # noqa
 from .occurrence import OccurrenceFactory  # noqa
 from .org import ApplicationFactory, OrganizationFactory, ProjectFactory  # noqa
+from .rollup import OccurrenceRollupFactory  # noqa
 from .social import SocialProviderFactory  # noqa
 from .user import SuperUserFactory, UserFactory  # noqa
 from .userrole import UserRoleFactory  # noqa
@@ -30,15 +33,18 @@ __all__ = [
     "BrowserFactory",
     "BrowserFactory",
     "ChannelFactory",
+    "DeliveryFactory",
     "DistributionListFactory",
     "EventFactory",
     "GroupFactory",
     "GroupFactory",
+    "IdempotencyKeyFactory",
     "LogEntryFactory",
     "MediaFileFactory",
     "MessageFactory",
     "NotificationFactory",
     "OccurrenceFactory",
+    "OccurrenceRollupFactory",
     "OrganizationFactory",
     "PeriodicTaskFactory",
     "PermissionFactory",
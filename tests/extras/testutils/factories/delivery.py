@@ -0,0 +1,18 @@
+import factory
+
+from bitcaster.models import Delivery
+
+from .assignment import AssignmentFactory
+from .base import AutoRegisterModelFactory
+from .occurrence import OccurrenceFactory
+
+
+class DeliveryFactory(AutoRegisterModelFactory[Delivery]):
+    class Meta:
+        model = Delivery
+
+    occurrence = factory.SubFactory(OccurrenceFactory)
+    assignment = factory.SubFactory(AssignmentFactory)
+    channel = factory.LazyAttribute(lambda o: o.assignment.channel)
+    status = Delivery.Status.DELIVERED
+    attempts = 1
@@ -0,0 +1,20 @@
+from datetime import timedelta
+
+import factory
+from django.utils import timezone
+
+from bitcaster.models import IdempotencyKey
+
+from .base import AutoRegisterModelFactory
+from .occurrence import OccurrenceFactory
+
+
+class IdempotencyKeyFactory(AutoRegisterModelFactory[IdempotencyKey]):
+    class Meta:
+        model = IdempotencyKey
+        django_get_or_create = ("event", "key")
+
+    occurrence = factory.SubFactory(OccurrenceFactory)
+    event = factory.LazyAttribute(lambda o: o.occurrence.event)
+    key = factory.Sequence(lambda n: f"key-{n}")
+    expires = factory.LazyFunction(lambda: timezone.now() + timedelta(days=1))
@@ -0,0 +1,19 @@
+import factory
+from django.utils import timezone
+
+from bitcaster.models import Occurrence, OccurrenceRollup
+
+from .base import AutoRegisterModelFactory
+from .event import EventFactory
+
+
+class OccurrenceRollupFactory(AutoRegisterModelFactory[OccurrenceRollup]):
+    class Meta:
+        model = OccurrenceRollup
+        django_get_or_create = ("event", "status", "period", "bucket")
+
+    event = factory.SubFactory(EventFactory)
+    status = Occurrence.Status.NEW
+    period = OccurrenceRollup.Period.HOUR
+    bucket = factory.LazyFunction(lambda: timezone.now().replace(minute=0, second=0, microsecond=0))
+    count = 1
@@ -1,7 +1,11 @@
 import uuid
-from typing import TYPE_CHECKING
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any
+from unittest import mock
 
 import pytest
+from django.db import IntegrityError
+from django.utils import timezone
 from testutils.factories import EventFactory
 
 from bitcaster.constants import Bitcaster
@@ -27,6 +31,34 @@ def test_trigger_correlation_id(event: "Event", cid: str) -> None:
     assert o.correlation_id == str(cid)
 
 
+def test_event_trigger_many(event: "Event", monkeypatch: pytest.MonkeyPatch) -> None:
+    from testutils.factories import OccurrenceFactory
+
+    from bitcaster.models import Occurrence
+
+    now = timezone.now()
+    monkeypatch.setattr("django.utils.timezone.now", lambda: now)
+    OccurrenceFactory(event=event, timestamp=now)
+    occurrences = event.trigger_many([{"context": {"a": 1}}, {"cid": "cid"}])
+    assert [o.timestamp - now for o in occurrences] == [timedelta(microseconds=1), timedelta(microseconds=2)]
+
+    bulk_create = Occurrence.objects.bulk_create
+    errors = [IntegrityError]
+
+    def conflict(*args: Any) -> list[Occurrence]:
+        if errors:
+            raise errors.pop()
+        return bulk_create(*args)
+
+    with mock.patch.object(Occurrence.objects, "bulk_create", side_effect=conflict) as m:
+        assert len(event.trigger_many([{}])) == 1
+        assert m.call_count == 2
+
+    with mock.patch.object(Occurrence.objects, "bulk_create", side_effect=IntegrityError):
+        with pytest.raises(IntegrityError):
+            event.trigger_many([{}])
+
+
 def test_get_trigger_url(event: "Event") -> None:
     assert event.get_trigger_url()
 
@@ -1,11 +1,14 @@
-from typing import TYPE_CHECKING
-from unittest.mock import Mock
+import threading
+from typing import TYPE_CHECKING, Any
+from unittest.mock import AsyncMock, Mock
 
 from pytest_django import DjangoAssertNumQueries
-from testutils.factories import NotificationFactory
+from testutils.factories import AssignmentFactory, NotificationFactory
 from testutils.factories.channel import ChannelFactory
 from testutils.factories.message import MessageFactory
 
+from bitcaster.dispatchers.base import DispatchResult
+
 if TYPE_CHECKING:
     from pytest import MonkeyPatch
 
@@ -49,3 +52,40 @@ def test_missing_message(event: "Event", monkeypatch: "MonkeyPatch") -> None:
     ret = n1.notify_to_channel(ch1, Mock(), {})
     assert ret is None
     assert mocked_notify.call_count == 0
+
+
+def test_notify_many_async(notification: "Notification", monkeypatch: "MonkeyPatch", settings: Any) -> None:
+    ch = ChannelFactory()
+    MessageFactory(channel=ch, notification=notification, event=notification.event)
+    assignment = AssignmentFactory(channel=ch)
+    settings.DISPATCHER_ASYNC = True
+    monkeypatch.setattr(type(ch.dispatcher), "local", False)
+    monkeypatch.setattr(type(ch.dispatcher), "async_capable", True)
+    monkeypatch.setattr(type(ch.dispatcher), "async_send", async_send := AsyncMock(return_value=True))
+    monkeypatch.setattr(type(ch.dispatcher), "send", send := Mock())
+
+    assert notification.notify_many(ch, [assignment], {}) == [DispatchResult(assignment.address.value, True)]
+    assert async_send.call_count == 1
+    assert send.call_count == 0
+
+
+def test_notify_many_async_sync_dispatcher(
+    notification: "Notification", monkeypatch: "MonkeyPatch", settings: Any
+) -> None:
+    ch = ChannelFactory()
+    MessageFactory(channel=ch, notification=notification, event=notification.event)
+    assignment = AssignmentFactory(channel=ch)
+    settings.DISPATCHER_ASYNC = True
+    monkeypatch.setattr(type(ch.dispatcher), "local", False)
+    threads = []
+
+    def send(*args: Any, **kwargs: Any) -> bool:
+        threads.append(threading.current_thread().name)
+        return True
+
+    monkeypatch.setattr(type(ch.dispatcher), "send", send)
+    monkeypatch.setattr(type(ch.dispatcher), "send_many", send_many := Mock())
+
+    assert notification.notify_many(ch, [assignment], {}) == [DispatchResult(assignment.address.value, True)]
+    assert send_many.call_count == 0
+    assert threads[0].startswith("bitcaster-aio")
@@ -2,6 +2,7 @@ from typing import TYPE_CHECKING, List, TypedDict
 from unittest.mock import Mock
 
 import pytest
+from constance.test.unittest import override_config
 
 if TYPE_CHECKING:
     from pytest import MonkeyPatch
@@ -19,12 +20,14 @@ def context(occurrence: "Occurrence", user: "User") -> "Context":
     from testutils.factories import (
         AssignmentFactory,
         ChannelFactory,
+        MessageFactory,
         NotificationFactory,
     )
 
     notification: "Notification" = NotificationFactory(event__channels=[ChannelFactory()], payload_filter="foo=='bar'")
     assignment: "Assignment" = AssignmentFactory(channel=notification.event.channels.first())
     notification.distribution.recipients.add(assignment)
+    MessageFactory(channel=assignment.channel, event=notification.event, notification=notification)
 
     return {"assignment": assignment, "notification": notification}
 
@@ -37,7 +40,7 @@ def context(occurrence: "Occurrence", user: "User") -> "Context":
 def test_model_occurrence_filter(
     payload: dict[str, str], notified_count: int, context: "Context", monkeypatch: "MonkeyPatch"
 ) -> None:
-    monkeypatch.setattr("bitcaster.models.notification.Notification.notify_to_channel", mock := Mock())
+    monkeypatch.setattr("testutils.dispatcher.XDispatcher.send", mock := Mock())
 
     occurrence: Occurrence = context["notification"].event.trigger(context=payload)
     occurrence.process()
@@ -45,11 +48,31 @@ def test_model_occurrence_filter(
     assert mock.call_count == notified_count
     occurrence.refresh_from_db()
 
+    assert occurrence.recipients == notified_count
     if notified_count == 1:
-        assert occurrence.data == {
-            "delivered": [context["assignment"].id],
-            "recipients": [[context["assignment"].address.value, context["assignment"].channel.name]],
-        }
+        assert list(occurrence.deliveries.values_list("assignment", "channel")) == [
+            (context["assignment"].id, context["assignment"].channel.id)
+        ]
+
+
+@pytest.mark.parametrize("every, checkpoints", [(1, 2), (2, 2), (100, 1)])
+def test_model_occurrence_checkpoint(
+    every: int, checkpoints: int, context: "Context", monkeypatch: "MonkeyPatch"
+) -> None:
+    from testutils.factories import AssignmentFactory
+
+    from bitcaster.models import Occurrence
+
+    notification = context["notification"]
+    for __ in range(2):
+        notification.distribution.recipients.add(AssignmentFactory(channel=context["assignment"].channel))
+    monkeypatch.setattr("testutils.dispatcher.XDispatcher.send", Mock())
+    monkeypatch.setattr("bitcaster.models.occurrence.Occurrence.checkpoint", checkpoint := Mock())
+
+    occurrence: Occurrence = notification.event.trigger(context={"foo": "bar"})
+    with override_config(OCCURRENCE_BATCH_SIZE=2, OCCURRENCE_CHECKPOINT_EVERY=every):
+        assert occurrence.process() is True
+    assert checkpoint.call_count == checkpoints
 
 
 def test_model_occurrence_no_notifications(occurrence: "Occurrence", monkeypatch: "MonkeyPatch") -> None:
@@ -76,3 +99,40 @@ def test_purgeable(purgeable_occurrences: List["Occurrence"], non_purgeable_occu
     purgeable_occurrence_ids = Occurrence.objects.purgeable().order_by("id").values_list("id", flat=True)
 
     assert list(purgeable_occurrence_ids) == sorted([o.id for o in purgeable_occurrences])
+
+
+def test_get_deliveries_expired(occurrence: "Occurrence", assignment: "Assignment") -> None:
+    from bitcaster.dispatchers.base import DispatchResult
+    from bitcaster.exceptions import SubscriptionExpired
+    from bitcaster.models import Delivery
+
+    assignment.delivery_attempts = 0
+    error = SubscriptionExpired(410)
+    (delivery,) = occurrence.get_deliveries(
+        assignment.channel, [assignment], [DispatchResult(assignment.address.value, False, error)]
+    )
+    assert (delivery.status, delivery.next_attempt) == (Delivery.Status.FAILED, None)
+    assignment.refresh_from_db()
+    assert (assignment.active, assignment.validated, assignment.data) == (False, False, {"status": "expired"})
+
+
+def test_checkpoint_keeps_version(occurrence: "Occurrence", assignment: "Assignment") -> None:
+    from testutils.factories import DeliveryFactory
+
+    from bitcaster.models import Delivery
+
+    existing = DeliveryFactory(occurrence=occurrence, assignment=assignment, status=Delivery.Status.FAILED)
+    occurrence.checkpoint(
+        [
+            Delivery(
+                occurrence=occurrence,
+                assignment=assignment,
+                channel=assignment.channel,
+                status=Delivery.Status.DELIVERED,
+                attempts=2,
+            )
+        ]
+    )
+    delivery = Delivery.objects.get(pk=existing.pk)
+    assert (delivery.status, delivery.attempts) == (Delivery.Status.DELIVERED, 2)
+    assert delivery.version == existing.version
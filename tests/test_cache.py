@@ -1,10 +1,13 @@
 import os
 from typing import Any, Optional
+from unittest.mock import Mock
 
 import pytest
 from django.core.cache import cache
+from django.core.exceptions import ValidationError
 from pytest_django import DjangoAssertNumQueries
 from pytest_django.fixtures import SettingsWrapper
+from strategy_field.utils import fqn
 
 from bitcaster.cache.storage import (
     qs_del_cache,
@@ -80,3 +83,268 @@ def test_qs_delete(data: Any, django_assert_num_queries: DjangoAssertNumQueries,
     qs_to_cache(qs, key=key)
     with django_assert_num_queries(0):
         assert qs_del_cache(qs, key=key)
+
+
+def test_template_cache() -> None:
+    from testutils.factories import MessageFactory
+
+    from bitcaster.cache.templates import TemplateCache
+
+    tc = TemplateCache(maxsize=2)
+    msg = MessageFactory(subject="Hello {{name}}", content="{{name}}", html_content="")
+    assert tc.get(msg, "html_content") is None
+
+    tpl = tc.get(msg, "subject")
+    assert tc.get(msg, "subject") is tpl
+    assert tc.info() == (1, 1, 2, 1)
+
+    tc.get(msg, "content")
+    msg.save()  # new version
+    assert tc.get(msg, "subject") is not tpl
+    assert tc.info() == (1, 3, 2, 2)
+
+    tc.invalidate(msg.pk)
+    assert tc.info().currsize == 0
+
+
+def test_message_render() -> None:
+    from testutils.factories import MessageFactory
+
+    from bitcaster.cache.templates import templates
+
+    msg = MessageFactory(subject="Hello {{name}}")
+    assert msg.render("subject", {"name": "World"}) == "Hello World"
+    hits = templates.info().hits
+    assert msg.render("subject", {"name": "Bitcaster"}) == "Hello Bitcaster"
+    assert templates.info().hits == hits + 1
+
+    msg.subject = "Bye {{name}}"
+    msg.save()
+    assert not [key for key in templates._data if key[0] == msg.pk]
+    assert msg.render("subject", {"name": "World"}) == "Bye World"
+
+
+def test_config_cache(db: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    from testutils.factories import ChannelFactory
+
+    from bitcaster.cache.configs import ConfigCache, configs
+    from bitcaster.dispatchers.slack import SlackConfig, SlackDispatcher
+
+    ch = ChannelFactory(dispatcher=fqn(SlackDispatcher), config={"url": "https://example.com/hook"})
+    monkeypatch.setattr(ConfigCache, "validate", validate := Mock(wraps=ConfigCache.validate))
+    config = ch.dispatcher.config
+    assert config["url"] == "https://example.com/hook"
+    assert ch.dispatcher.config is config
+    assert validate.call_count == 1
+    with pytest.raises(TypeError):
+        config["url"] = "https://example.com/other"  # type: ignore[index]
+
+    ch.config = {"url": "https://example.com/other"}
+    ch.save()  # new version
+    assert ch.dispatcher.config["url"] == "https://example.com/other"
+    assert validate.call_count == 2
+
+    ch.config = {"url": "invalid"}
+    with pytest.raises(ValidationError):
+        configs.get(SlackConfig, ch.config, None, None)
+
+
+def test_versioned_cache() -> None:
+    from bitcaster.cache.versioned import VersionedCache
+
+    c: VersionedCache[str] = VersionedCache("test-versioned")
+    factory = Mock(return_value="value")
+    assert c.get_or_set("key", factory) == "value"
+    assert c.get_or_set("key", factory) == "value"
+    assert factory.call_count == 1
+
+    c.clear()  # entry still in the shared cache
+    assert c.get_or_set("key", factory) == "value"
+    assert factory.call_count == 1
+
+    c.invalidate()
+    assert c.get_or_set("key", factory) == "value"
+    assert factory.call_count == 2
+
+    assert c.get_or_set("missing", lambda: None) is None
+    assert c.get_or_set("missing", lambda: "found") == "found"
+
+    cache.delete(c.version_key)
+    c.invalidate()
+    assert c.get_or_set("key", factory) == "value"
+    assert factory.call_count == 3
+
+
+def test_api_keys(db: Any, django_assert_num_queries: DjangoAssertNumQueries) -> None:
+    from testutils.factories import ApiKeyFactory
+
+    from bitcaster.cache.keys import keys
+
+    key = ApiKeyFactory(environments=["develop"])
+    record = keys.get(key.key)
+    assert record
+    assert (record.pk, record.organization.slug, record.application.slug) == (
+        key.pk,
+        key.organization.slug,
+        key.application.slug,
+    )
+    assert str(record) == key.name
+    assert record.environments == ("develop",)
+    assert (record.user_id, record.user_is_active) == (key.user.pk, True)
+    with django_assert_num_queries(0):
+        assert keys.get(key.key) == record
+        user = record.get_user()
+    with django_assert_num_queries(1):
+        assert user.username == key.user.username
+
+    key.application.project.name = "changed"
+    key.application.project.save()
+    assert keys.get(key.key) is not record
+
+    assert keys.get("missing") is None
+
+
+def test_routes(db: Any, django_assert_num_queries: DjangoAssertNumQueries) -> None:
+    from testutils.factories import ChannelFactory, EventFactory
+
+    from bitcaster.cache.routes import routes
+
+    evt = EventFactory()
+    app = evt.application
+    args = (app.project.organization.slug, app.project.slug, app.slug, evt.slug)
+    route = routes.get(*args)
+    assert route
+    assert (route.pk, route.locked, route.channels) == (evt.pk, None, ())
+    with django_assert_num_queries(0):
+        assert routes.get(*args) == route
+        assert route.as_event().pk == evt.pk
+
+    ch = ChannelFactory(organization=app.project.organization)
+    evt.channels.add(ch)
+    assert routes.get(*args).channels == (ch.pk,)
+
+    app.project.locked = True
+    app.project.save()
+    assert routes.get(*args).locked == "Project"
+    evt.locked = True
+    evt.save()
+    assert routes.get(*args).locked == "Event"
+    assert routes.get(*args).as_event().locked
+
+    assert routes.get(*args[:3], "missing") is None
+
+
+def test_routes_system(system_objects: Any, django_assert_num_queries: DjangoAssertNumQueries) -> None:
+    from bitcaster.cache.routes import routes
+    from bitcaster.constants import SystemEvent
+
+    route = routes.system(SystemEvent.OCCURRENCE_SILENCE.value)
+    assert route
+    assert route.name == SystemEvent.OCCURRENCE_SILENCE.value
+    with django_assert_num_queries(0):
+        assert routes.system(SystemEvent.OCCURRENCE_SILENCE.value) == route
+
+
+def test_delivery_plan(db: Any, django_assert_num_queries: DjangoAssertNumQueries) -> None:
+    from testutils.factories import (
+        ChannelFactory,
+        EventFactory,
+        MessageFactory,
+        NotificationFactory,
+    )
+
+    from bitcaster.cache.delivery import delivery_plans
+
+    evt = EventFactory()
+    ch1, ch2 = ChannelFactory(), ChannelFactory()
+    evt.channels.add(ch1, ch2)
+    n1 = NotificationFactory(event=evt, environments=["develop"], payload_filter="")
+    n2 = NotificationFactory(event=evt, environments=["test"], payload_filter="")
+    generic = MessageFactory(event=evt, channel=ch1, notification=None)
+    specific = MessageFactory(event=evt, channel=ch1, notification=n2)
+
+    plan = delivery_plans.get(evt.pk)
+    assert plan
+    with django_assert_num_queries(0):
+        assert delivery_plans.get(evt.pk) is plan
+        assert plan.match({}) == [n1, n2]
+        assert plan.match({}, ["test"]) == [n2]
+        assert list(plan.get_channels([str(ch2.pk)])) == [ch2.pk]
+        n1, n2 = plan.notifications
+        assert n1.get_message(ch1) == generic
+        assert n2.get_message(ch1) == specific
+        assert n2.get_message(ch2) is None
+
+    specific.delete()
+    plan = delivery_plans.get(evt.pk)
+    assert plan.messages[n2.pk, ch1.pk] == generic
+    assert delivery_plans.get(0) is None
+
+
+def test_rate_limiter(monkeypatch: pytest.MonkeyPatch) -> None:
+    from bitcaster.cache.ratelimit import RateLimiter
+
+    now = 1_000_000_000_000_000_000
+    monkeypatch.setattr("bitcaster.cache.ratelimit.time.time_ns", lambda: now)
+    limiter = RateLimiter(f"test-{os.environ.get('PYTEST_XDIST_WORKER', '')}", rate=10, burst=2)
+    cache.delete(limiter.key)
+
+    assert limiter.acquire(5) == (2, 0.1)
+    assert limiter.acquire() == (0, 0.1)
+    now += 100_000_000  # 0.1 sec
+    assert limiter.acquire(2) == (1, 0.1)
+    now += 1_000_000_000  # full again
+    assert limiter.acquire(2) == (2, 0)
+
+    limiter.pause(5)
+    now += 1_000_000_000
+    assert limiter.acquire() == (0, 4.1)
+
+
+def test_circuit_breaker(monkeypatch: pytest.MonkeyPatch) -> None:
+    from bitcaster.cache.breaker import CircuitBreaker, CircuitState
+
+    now = 1_000_000.0
+    monkeypatch.setattr("bitcaster.cache.breaker.time.time", lambda: now)
+    breaker = CircuitBreaker(
+        f"test-{os.environ.get('PYTEST_XDIST_WORKER', '')}", failure_rate=0.5, min_requests=4, window=60, cooldown=30
+    )
+    breaker.close()
+
+    breaker.record(1, 2)
+    assert breaker.get_state() == CircuitState.CLOSED
+    assert breaker.allowed(10) == 10
+    breaker.record(0, 1)
+    assert breaker.get_state() == CircuitState.OPEN
+    assert breaker.allowed(10) == 0
+    assert breaker.retry_after() == 30
+
+    now += 30
+    assert breaker.get_state() == CircuitState.HALF_OPEN
+    assert breaker.allowed(10) == 1
+    assert breaker.allowed(10) == 0  # trial in progress
+    breaker.record(0, 1)
+    assert breaker.get_state() == CircuitState.OPEN
+
+    now += 30
+    assert breaker.allowed(10) == 1
+    breaker.record(1, 0)
+    assert breaker.get_state() == CircuitState.CLOSED
+    assert breaker.allowed(10) == 10
+
+
+def test_circuit_breaker_no_cooldown(monkeypatch: pytest.MonkeyPatch) -> None:
+    from bitcaster.cache.breaker import TRIAL_TIMEOUT, CircuitBreaker, CircuitState
+
+    breaker = CircuitBreaker(
+        f"test-{os.environ.get('PYTEST_XDIST_WORKER', '')}", failure_rate=0.5, min_requests=1, window=60, cooldown=0
+    )
+    breaker.close()
+    breaker.record(0, 1)
+    assert breaker.get_state() == CircuitState.HALF_OPEN
+
+    monkeypatch.setattr("bitcaster.cache.breaker.cache", mocked := Mock(wraps=cache))
+    assert breaker.allowed(10) == 1
+    assert breaker.allowed(10) == 0  # trial in progress
+    mocked.add.assert_called_with(breaker.trial_key, 1, TRIAL_TIMEOUT)  # never stuck, if the trial is lost
+    breaker.close()
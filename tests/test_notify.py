@@ -98,10 +98,8 @@ def test_trigger(
         (v2.address.value, f"Message for {event.name} on channel {ch.name}"),
     ]
     o.refresh_from_db()
-    assert o.data == {
-        "delivered": [v1.pk, v2.pk],
-        "recipients": [
-            [v1.address.value, v1.channel.name],
-            [v2.address.value, v2.channel.name],
-        ],
-    }
+    assert o.recipients == 2
+    assert list(o.deliveries.order_by("pk").values_list("assignment", "channel", "status")) == [
+        (v1.pk, ch.pk, "DELIVERED"),
+        (v2.pk, ch.pk, "DELIVERED"),
+    ]
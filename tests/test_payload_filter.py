@@ -1,4 +1,5 @@
 from typing import Any, Dict, Optional
+from unittest.mock import Mock
 
 import pytest
 
@@ -89,3 +90,76 @@ def test_match_filter(filters: Optional[Dict[str, Any] | str], result: bool) ->
     from bitcaster.models import Notification
 
     assert Notification().match_filter(rules=filters, payload={"foo": "bar"}) is result
+
+
+def test_compiled_filter_cache() -> None:
+    from testutils.factories import NotificationFactory
+
+    from bitcaster.utils.filters import filters
+
+    n = NotificationFactory(payload_filter="foo=='bar'")
+    assert n.match_filter({"foo": "bar"})
+    hits = filters.info().hits
+    assert not n.match_filter({"foo": "doo"})
+    assert filters.info().hits == hits + 1
+
+    n.payload_filter = "foo=='doo'"
+    n.save()
+    assert (n.pk, n.version) not in filters
+    assert n.match_filter({"foo": "doo"})
+
+
+def test_compile_filter_short_circuit(monkeypatch: pytest.MonkeyPatch) -> None:
+    from bitcaster.utils.filters import compile_filter
+
+    expressions = {"first": Mock(search=Mock(return_value=True)), "second": Mock(search=Mock(return_value=True))}
+    monkeypatch.setattr("bitcaster.utils.filters.compile_expression", expressions.get)
+
+    assert compile_filter({"OR": ["first", "second"]})({}) is True
+    assert expressions["second"].search.call_count == 0
+
+    expressions["first"].search.return_value = False
+    assert compile_filter({"AND": ["first", "second"]})({}) is False
+    assert expressions["second"].search.call_count == 0
+
+
+def test_match_plan_shared_expressions(monkeypatch: pytest.MonkeyPatch) -> None:
+    from bitcaster.utils.filters import MatchPlan
+
+    plan = MatchPlan(
+        [
+            "foo=='bar'",
+            {"AND": ["foo=='bar'", "baz"]},
+            {"NOT": "foo=='bar'"},
+            {"OR": ["baz", "foo=='doo'"]},
+            None,
+        ]
+    )
+    assert len(plan.expressions) == 3
+    for expression in plan.expressions:
+        monkeypatch.setattr(expression, "search", Mock(wraps=expression.search))
+
+    assert plan.match({"foo": "bar", "baz": 1}) == [True, True, False, True, True]
+    assert [e.search.call_count for e in plan.expressions] == [1, 1, 0]
+
+
+def test_queryset_match_plan() -> None:
+    from testutils.factories import EventFactory, NotificationFactory
+
+    from bitcaster.models import Notification
+    from bitcaster.utils.filters import plans
+
+    event = EventFactory()
+    n1 = NotificationFactory(event=event, payload_filter="foo=='bar'")
+    n2 = NotificationFactory(event=event, payload_filter="NOT: foo=='bar'")
+    qs = Notification.objects.filter(event=event).order_by("pk")
+
+    assert list(qs.match({"foo": "bar"})) == [n1]
+    hits = plans.info().hits
+    assert list(qs.match({"foo": "doo"})) == [n2]
+    assert plans.info().hits == hits + 1
+
+    n2.payload_filter = "foo=='doo'"
+    n2.save()
+    assert list(qs.match({"foo": "doo"})) == [n2]
+    assert list(qs.match({"foo": "doo"}, rules="foo=='bar'")) == []
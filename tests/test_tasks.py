@@ -1,18 +1,29 @@
+import threading
 import uuid
+from datetime import timedelta
 from typing import TYPE_CHECKING, Any, Tuple, TypedDict
 from unittest.mock import Mock
 
 import pytest
+from constance.test.unittest import override_config
+from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
+from django.utils import timezone
+from freezegun import freeze_time
 from pytest import MonkeyPatch
+from pytest_django import DjangoCaptureOnCommitCallbacks
 from strategy_field.utils import fqn
 from testutils.dispatcher import XDispatcher
 
-from bitcaster.constants import Bitcaster, SystemEvent
+from bitcaster.constants import Bitcaster, CacheKey, SystemEvent
+from bitcaster.models import Delivery
 from bitcaster.tasks import (
+    finalize_occurrence,
     monitor_run,
     process_occurrence,
     purge_occurrences,
+    retry_delivery,
+    rollup_occurrences,
     schedule_occurrences,
 )
 
@@ -40,6 +51,14 @@ if TYPE_CHECKING:
     )
 
 
+def delivered_to(occurrence: "Occurrence") -> list[int]:
+    return list(
+        occurrence.deliveries.filter(status=Delivery.Status.DELIVERED)
+        .order_by("pk")
+        .values_list("assignment", flat=True)
+    )
+
+
 @pytest.fixture
 def setup(admin_user: "User") -> "Context":
     from testutils.factories import (
@@ -87,28 +106,49 @@ def test_process_event_single(setup: "Context", messagebox: list[Tuple[str, str]
     ]
     occurrence.refresh_from_db()
     assert occurrence.status == Occurrence.Status.PROCESSED
-    assert occurrence.data == {
-        "delivered": [v1.id, v2.id],
-        "recipients": [[v1.address.value, "test"], [v2.address.value, "test"]],
-    }
+    assert occurrence.recipients == 2
+    assert delivered_to(occurrence) == [v1.id, v2.id]
+
+
+@pytest.mark.parametrize("on_event", [True, False])
+def test_process_newsletter(
+    setup: "Context", messagebox: list[Tuple[str, str]], monkeypatch: MonkeyPatch, on_event: bool
+) -> None:
+    from bitcaster.models import Message, Occurrence
+
+    occurrence: Occurrence = setup["occurrence"]
+    if on_event:
+        occurrence.event.newsletter = True
+        occurrence.event.save()
+    else:
+        occurrence.newsletter = True
+        occurrence.save()
+    monkeypatch.setattr(Message, "render", mocked_render := Mock(return_value="newsletter"))
+
+    process_occurrence(occurrence.pk)
+    assert mocked_render.call_count == 3  # subject, content, html_content
+    assert messagebox == [(a.address.value, "newsletter") for a in setup["assignments"]]
+    occurrence.refresh_from_db()
+    assert occurrence.recipients == 2
 
 
 def test_process_incomplete_event(setup: "Context", messagebox: list[Tuple[str, str]]) -> None:
+    from testutils.factories import DeliveryFactory
+
     from bitcaster.models import Occurrence
 
     occurrence = setup["occurrence"]
     v1, v2 = setup["assignments"]
 
-    setup["occurrence"].data["delivered"] = [v1.id, v2.id]
-    setup["occurrence"].data["recipients"] = []
-    setup["occurrence"].save()
+    DeliveryFactory(occurrence=occurrence, assignment=v1)
+    DeliveryFactory(occurrence=occurrence, assignment=v2)
 
     process_occurrence(occurrence.pk)
     assert messagebox == []
 
     occurrence.refresh_from_db()
     assert occurrence.status == Occurrence.Status.PROCESSED
-    assert occurrence.data == {"delivered": [v1.id, v2.id], "recipients": []}
+    assert delivered_to(occurrence) == [v1.id, v2.id]
 
 
 @pytest.mark.django_db(transaction=True)
@@ -118,42 +158,342 @@ def test_process_event_partially(setup: "Context", monkeypatch: MonkeyPatch) ->
     occurrence: Occurrence = setup["occurrence"]
 
     monkeypatch.setattr(
-        "bitcaster.models.notification.Notification.notify_to_channel",
-        mocked_notify := Mock(side_effect=[None, Exception("This is raised after first call")]),
+        "testutils.dispatcher.XDispatcher.send",
+        mocked_notify := Mock(side_effect=[True, Exception("This is raised after first call")]),
     )
 
+    monkeypatch.setattr("bitcaster.tasks.retry_delivery.apply_async", retry := Mock())
+
     process_occurrence(occurrence.pk)
 
     occurrence.refresh_from_db()
-    assert occurrence.status == Occurrence.Status.NEW
+    assert occurrence.status == Occurrence.Status.PROCESSED
     assert mocked_notify.call_count == 2
-    assert occurrence.data == {
-        "delivered": [setup["assignments"][0].id],
-        "recipients": [["test1@example.com", "test"]],
-    }
+    assert occurrence.recipients == 1
+    assert delivered_to(occurrence) == [setup["assignments"][0].id]
+    failed = occurrence.deliveries.get(status=Delivery.Status.FAILED)
+    assert failed.assignment == setup["assignments"][1]
+    assert failed.attempts == 1
+    assert failed.next_attempt > timezone.now()
+    retry.assert_called_once_with((failed.pk,), eta=failed.next_attempt)
+
+
+@override_config(CHANNEL_RATE_LIMIT_MAX_WAIT=0)
+def test_process_event_rate_limited(setup: "Context", monkeypatch: MonkeyPatch) -> None:
+    from bitcaster.models import Occurrence
+
+    occurrence = setup["occurrence"]
+    v1, v2 = setup["assignments"]
+    setup["channel"].rate_limit = 0.5
+    setup["channel"].save()
+    monkeypatch.setattr("testutils.dispatcher.XDispatcher.send", mocked_notify := Mock(return_value=True))
+
+    process_occurrence(occurrence.pk)
+
+    occurrence.refresh_from_db()
+    assert occurrence.status == Occurrence.Status.PROCESSED
+    assert mocked_notify.call_count == 1
+    assert delivered_to(occurrence) == [v1.id]
+    deferred = occurrence.deliveries.get(assignment=v2)
+    assert (deferred.status, deferred.attempts) == (Delivery.Status.PENDING, 0)
+    assert deferred.next_attempt > timezone.now() + timedelta(seconds=1)
+
+    assert retry_delivery(deferred.pk) is False  # still limited
+    deferred.refresh_from_db()
+    assert (deferred.status, deferred.attempts) == (Delivery.Status.PENDING, 0)
+
+
+def test_process_event_provider_rate_limited(setup: "Context", monkeypatch: MonkeyPatch) -> None:
+    from bitcaster.exceptions import DispatcherRateLimited
+
+    occurrence = setup["occurrence"]
+    monkeypatch.setattr("testutils.dispatcher.XDispatcher.send", Mock(side_effect=[True, DispatcherRateLimited(60)]))
+
+    process_occurrence(occurrence.pk)
+
+    deferred = occurrence.deliveries.get(assignment=setup["assignments"][1])
+    assert (deferred.status, deferred.attempts) == (Delivery.Status.PENDING, 0)
+    assert deferred.next_attempt > timezone.now() + timedelta(seconds=50)
+
+
+@override_config(CIRCUIT_BREAKER_MIN_REQUESTS=1, CIRCUIT_BREAKER_FAILURE_RATE=1)
+def test_process_event_circuit_open(setup: "Context", monkeypatch: MonkeyPatch) -> None:
+    occurrence = setup["occurrence"]
+    v1, v2 = setup["assignments"]
+    monkeypatch.setattr("testutils.dispatcher.XDispatcher.send", mocked_notify := Mock(side_effect=Exception("down")))
+    setup["channel"].save()  # rebuild the delivery plan with the current config
+
+    process_occurrence(occurrence.pk)
+
+    assert mocked_notify.call_count == 2  # the whole batch is sent before the circuit opens
+    failed = occurrence.deliveries.get(assignment=v1)
+    assert (failed.status, failed.attempts) == (Delivery.Status.FAILED, 1)
+    assert setup["channel"].breaker.get_state() == "open"
+
+    assert retry_delivery(failed.pk) is False
+    failed.refresh_from_db()
+    assert (failed.status, failed.attempts) == (Delivery.Status.PENDING, 1)  # not an attempt
+    assert failed.next_attempt > timezone.now() + timedelta(seconds=25)
+    assert mocked_notify.call_count == 2
+    setup["channel"].breaker.close()
+
+
+def test_process_event_concurrent_channels(setup: "Context", monkeypatch: MonkeyPatch) -> None:
+    from testutils.factories import AssignmentFactory, ChannelFactory, MessageFactory
+
+    occurrence = setup["occurrence"]
+    v1, v2 = setup["assignments"]
+    ch2: "Channel" = ChannelFactory(name="test2", dispatcher=fqn(XDispatcher))
+    v3: Assignment = AssignmentFactory(channel=ch2, address__value="test3@example.com")
+    occurrence.event.channels.add(ch2)
+    occurrence.event.notifications.get().distribution.recipients.add(v3)
+    MessageFactory(channel=ch2, event=occurrence.event, content="Message")
+
+    # the first recipient of each channel waits for the other one: fails unless channels are concurrent
+    barrier = threading.Barrier(2, timeout=5)
+
+    def send(address: str, *args: Any) -> bool:
+        if address != v2.address.value:
+            barrier.wait()
+        return True
+
+    monkeypatch.setattr(XDispatcher, "local", False)
+    monkeypatch.setattr(XDispatcher, "send", Mock(side_effect=send))
+    process_occurrence(occurrence.pk)
+
+    occurrence.refresh_from_db()
+    assert occurrence.recipients == 3
+    assert delivered_to(occurrence) == [v1.id, v2.id, v3.id]
+
+
+def test_process_event_render_in_calling_thread(setup: "Context", monkeypatch: MonkeyPatch) -> None:
+    from bitcaster.models import Message
+
+    occurrence = setup["occurrence"]
+    rendered, sent = set(), set()
+    render = Message.render
+
+    def render_in(self: Message, *args: Any) -> str:
+        rendered.add(threading.current_thread().name)
+        return render(self, *args)
+
+    def send(*args: Any) -> bool:
+        sent.add(threading.current_thread().name)
+        return True
+
+    monkeypatch.setattr(Message, "render", render_in)
+    monkeypatch.setattr(XDispatcher, "local", False)
+    monkeypatch.setattr(XDispatcher, "send", Mock(side_effect=send))
+    process_occurrence(occurrence.pk)
+
+    assert rendered == {threading.current_thread().name}
+    assert sent and all(name.startswith("bitcaster-lane") for name in sent)
+
+
+@override_config(DELIVERY_MAX_ATTEMPTS=3, DELIVERY_RETRY_DELAY=10, DELIVERY_RETRY_MAX_DELAY=15)
+def test_retry_delivery(setup: "Context", monkeypatch: MonkeyPatch) -> None:
+    from testutils.factories import DeliveryFactory
+
+    v1, v2 = setup["assignments"]
+    occurrence = setup["occurrence"]
+    occurrence.status = occurrence.Status.PROCESSED
+    occurrence.save()
+    DeliveryFactory(occurrence=occurrence, assignment=v1)
+    d = DeliveryFactory(
+        occurrence=occurrence, assignment=v2, status=Delivery.Status.FAILED, attempts=1, next_attempt=timezone.now()
+    )
+    assert 5 <= Delivery.get_retry_delay(1) <= 10
+    assert 7.5 <= Delivery.get_retry_delay(2) <= 15
+    assert Delivery.get_retry_delay(3) == 0
+
+    monkeypatch.setattr("testutils.dispatcher.XDispatcher.send", mocked_notify := Mock(return_value=False))
+    assert retry_delivery(d.pk) is False
+    d.refresh_from_db()
+    assert (d.status, d.attempts) == (Delivery.Status.FAILED, 2)
+    assert d.next_attempt
+
+    mocked_notify.return_value = True
+    assert retry_delivery(d.pk) is True
+    d.refresh_from_db()
+    assert (d.status, d.attempts, d.next_attempt) == (Delivery.Status.DELIVERED, 3, None)
+    assert mocked_notify.call_count == 2
+    occurrence.refresh_from_db()
+    assert occurrence.recipients == 1
+    assert retry_delivery(d.pk) is False
+
+
+@override_config(DELIVERY_MAX_ATTEMPTS=2)
+def test_retry_delivery_give_up(setup: "Context", monkeypatch: MonkeyPatch) -> None:
+    from testutils.factories import DeliveryFactory
+
+    d = DeliveryFactory(
+        occurrence=setup["occurrence"],
+        assignment=setup["assignments"][0],
+        status=Delivery.Status.FAILED,
+        attempts=1,
+        next_attempt=timezone.now(),
+    )
+    monkeypatch.setattr("testutils.dispatcher.XDispatcher.send", Mock(return_value=False))
+    assert retry_delivery(d.pk) is False
+    d.refresh_from_db()
+    assert (d.status, d.attempts, d.next_attempt) == (Delivery.Status.FAILED, 2, None)
 
 
 def test_process_event_resume(setup: "Context", monkeypatch: MonkeyPatch) -> None:
+    from testutils.factories import DeliveryFactory
+
     from bitcaster.models import Occurrence
 
     v1: Assignment = setup["assignments"][0]
     v2: Assignment = setup["assignments"][1]
     occurrence = setup["occurrence"]
 
-    occurrence.data = {"delivered": [v1.id], "recipients": [(v1.address.value, "test")]}
-    occurrence.save()
+    DeliveryFactory(occurrence=occurrence, assignment=v1)
+    DeliveryFactory(occurrence=occurrence, assignment=v2, status=Delivery.Status.FAILED)
 
-    monkeypatch.setattr("bitcaster.models.notification.Notification.notify_to_channel", mocked_notify := Mock())
+    monkeypatch.setattr("testutils.dispatcher.XDispatcher.send", mocked_notify := Mock())
 
     process_occurrence(occurrence.pk)
 
     occurrence.refresh_from_db()
     assert occurrence.status == Occurrence.Status.PROCESSED
     assert mocked_notify.call_count == 1
-    assert occurrence.data == {
-        "delivered": [v1.id, v2.id],
-        "recipients": [["test1@example.com", "test"], ["test2@example.com", v1.channel.name]],
-    }
+    assert delivered_to(occurrence) == [v1.id, v2.id]
+    assert occurrence.deliveries.get(assignment=v2).attempts == 2
+
+
+class WorkerCrash(BaseException):
+    pass
+
+
+@pytest.mark.django_db(transaction=True)
+@override_config(OCCURRENCE_BATCH_SIZE=1, OCCURRENCE_CHECKPOINT_EVERY=1)
+def test_process_event_crash(setup: "Context", monkeypatch: MonkeyPatch) -> None:
+    from bitcaster.models import Occurrence
+
+    v1, v2 = setup["assignments"]
+    occurrence = setup["occurrence"]
+    monkeypatch.setattr("testutils.dispatcher.XDispatcher.send", Mock(side_effect=[True, WorkerCrash]))
+    with pytest.raises(WorkerCrash):
+        process_occurrence(occurrence.pk)
+
+    # the checkpoint of the first batch survives the crash, the lease is held until it expires
+    occurrence.refresh_from_db()
+    assert occurrence.status == Occurrence.Status.PROCESSING
+    assert occurrence.claimed_until > timezone.now()
+    assert delivered_to(occurrence) == [v1.id]
+    assert not Occurrence.objects.claimable().filter(pk=occurrence.pk).exists()
+
+    Occurrence.objects.filter(pk=occurrence.pk).update(claimed_until=timezone.now() - timedelta(seconds=1))
+    monkeypatch.setattr("testutils.dispatcher.XDispatcher.send", mocked_notify := Mock(return_value=True))
+    schedule_occurrences()
+
+    occurrence.refresh_from_db()
+    assert occurrence.status == Occurrence.Status.PROCESSED
+    assert mocked_notify.call_count == 1
+    assert delivered_to(occurrence) == [v1.id, v2.id]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_process_event_sharded(setup: "Context", messagebox: list[Tuple[str, str]]) -> None:
+    from bitcaster.models import Occurrence
+
+    v1, v2 = setup["assignments"]
+    occurrence = setup["occurrence"]
+
+    with override_config(OCCURRENCE_SHARDS=2, OCCURRENCE_SHARD_THRESHOLD=1):
+        process_occurrence(occurrence.pk)
+
+    assert sorted(addr for addr, __ in messagebox) == [v1.address.value, v2.address.value]
+    occurrence.refresh_from_db()
+    assert occurrence.status == Occurrence.Status.PROCESSED
+    assert occurrence.recipients == 2
+    assert sorted(delivered_to(occurrence)) == [v1.id, v2.id]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_process_event_sharded_failure(setup: "Context", monkeypatch: MonkeyPatch) -> None:
+    from bitcaster.models import Occurrence
+
+    occurrence = setup["occurrence"]
+    monkeypatch.setattr(
+        "testutils.dispatcher.XDispatcher.send",
+        mocked_notify := Mock(side_effect=[True, Exception("This is raised after first call")]),
+    )
+    monkeypatch.setattr("bitcaster.tasks.retry_delivery.apply_async", retry := Mock())
+
+    with override_config(OCCURRENCE_SHARDS=2, OCCURRENCE_SHARD_THRESHOLD=1):
+        process_occurrence(occurrence.pk)
+
+    occurrence.refresh_from_db()
+    assert mocked_notify.call_count == 2
+    assert retry.call_count == 1
+    assert occurrence.status == Occurrence.Status.PROCESSED
+    assert occurrence.recipients == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_process_event_sharded_lease_expired(setup: "Context", monkeypatch: MonkeyPatch) -> None:
+    from bitcaster.models import Occurrence
+
+    occurrence = setup["occurrence"]
+    # claimed by the scheduler, the fan-out outlives the lease
+    Occurrence.objects.filter(pk=occurrence.pk).update(claimed_until=timezone.now() - timedelta(seconds=1))
+    monkeypatch.setattr("bitcaster.tasks.process_occurrence.delay", mocked_delay := Mock())
+
+    def send(*args: Any) -> bool:
+        schedule_occurrences()
+        return True
+
+    monkeypatch.setattr("testutils.dispatcher.XDispatcher.send", mocked_notify := Mock(side_effect=send))
+    with override_config(OCCURRENCE_SHARDS=2, OCCURRENCE_SHARD_THRESHOLD=1):
+        process_occurrence(occurrence.pk)
+
+    assert mocked_notify.call_count == 2
+    assert mocked_delay.call_count == 0
+    occurrence.refresh_from_db()
+    assert occurrence.status == Occurrence.Status.PROCESSED
+
+
+def test_process_event_sharded_lost(setup: "Context", monkeypatch: MonkeyPatch, messagebox: list[Any]) -> None:
+    from bitcaster.models import Occurrence
+
+    occurrence = setup["occurrence"]
+    monkeypatch.setattr("bitcaster.tasks.process_occurrence.delay", mocked_delay := Mock())
+    with override_config(OCCURRENCE_SHARDS=2, OCCURRENCE_SHARD_THRESHOLD=1):
+        # the shards (and the finalizer) are lost: the worker died, the broker dropped them...
+        with monkeypatch.context() as m:
+            m.setattr("bitcaster.tasks.chord", Mock())
+            process_occurrence(occurrence.pk)
+        occurrence.refresh_from_db()
+        assert occurrence.status == Occurrence.Status.PROCESSING
+        stale = occurrence.attempts
+
+        schedule_occurrences()
+        assert mocked_delay.call_count == 0  # the lease is not expired yet
+        with freeze_time(occurrence.claimed_until + timedelta(seconds=1)):
+            schedule_occurrences()
+        mocked_delay.assert_called_once_with(occurrence.pk)
+
+        # the finalizer of the lost run does not complete the claimed Occurrence
+        finalize_occurrence([True, True], occurrence.pk, stale)
+        occurrence.refresh_from_db()
+        assert occurrence.status == Occurrence.Status.NEW
+
+        process_occurrence(occurrence.pk)
+    occurrence.refresh_from_db()
+    assert occurrence.status == Occurrence.Status.PROCESSED
+    assert occurrence.recipients == 2
+    assert len(messagebox) == 2
+
+
+def test_process_event_below_shard_threshold(setup: "Context", monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr("bitcaster.tasks.chord", mocked_chord := Mock())
+    monkeypatch.setattr("testutils.dispatcher.XDispatcher.send", Mock())
+
+    with override_config(OCCURRENCE_SHARDS=2, OCCURRENCE_SHARD_THRESHOLD=3):
+        assert process_occurrence(setup["occurrence"].pk) == 2
+    assert mocked_chord.call_count == 0
 
 
 def test_silent_event(setup: "Context", monkeypatch: MonkeyPatch, system_objects: Any) -> None:
@@ -162,7 +502,7 @@ def test_silent_event(setup: "Context", monkeypatch: MonkeyPatch, system_objects
     cid = uuid.uuid4()
     e = setup["silent_event"]
     o = e.trigger(context={"key": "value"}, cid=cid)
-    monkeypatch.setattr("bitcaster.models.notification.Notification.notify_to_channel", Mock())
+    monkeypatch.setattr("testutils.dispatcher.XDispatcher.send", Mock())
 
     assert Occurrence.objects.system(correlation_id=cid).count() == 0
     process_occurrence(o.pk)
@@ -187,23 +527,74 @@ def test_attempts(setup: "Context", monkeypatch: MonkeyPatch) -> None:
     assert o.data == {}
 
 
-def test_retry(setup: "Context", monkeypatch: MonkeyPatch, system_objects: Any) -> None:
+@override_config(DELIVERY_MAX_ATTEMPTS=3)
+def test_retry(
+    setup: "Context",
+    monkeypatch: MonkeyPatch,
+    system_objects: Any,
+    django_capture_on_commit_callbacks: DjangoCaptureOnCommitCallbacks,
+) -> None:
     from bitcaster.models import Occurrence
 
     o = setup["occurrence"]
     v1 = setup["assignments"][0]
 
     monkeypatch.setattr(
-        "bitcaster.models.notification.Notification.notify_to_channel",
-        mocked_notify := Mock(side_effect=[None, Exception("This is raised after first call")]),
+        "testutils.dispatcher.XDispatcher.send",
+        mocked_notify := Mock(side_effect=[True, Exception("This is raised after first call")]),
     )
-    for a in range(10):
-        process_occurrence(o.pk)
+    # the failed recipient is retried by `retry_delivery`, once the checkpoint is committed
+    with django_capture_on_commit_callbacks(execute=True):
+        for a in range(10):
+            process_occurrence(o.pk)
     o.refresh_from_db()
     assert o.attempts == 0
     assert o.status == Occurrence.Status.FAILED
     assert mocked_notify.call_count == 4
-    assert o.data == {"delivered": [v1.id], "recipients": [[v1.address.value, "test"]]}
+    assert delivered_to(o) == [v1.id]
+    assert o.deliveries.get(status=Delivery.Status.FAILED).attempts == 3
+    assert Occurrence.objects.filter(parent=o, event__name=SystemEvent.OCCURRENCE_ERROR.value).exists()
+
+
+@override_config(DELIVERY_MAX_ATTEMPTS=1)
+def test_retry_exhausted(setup: "Context", monkeypatch: MonkeyPatch, system_objects: Any) -> None:
+    from bitcaster.models import Occurrence
+
+    o = setup["occurrence"]
+    monkeypatch.setattr(
+        "testutils.dispatcher.XDispatcher.send",
+        mocked_notify := Mock(side_effect=[True, Exception("This is raised after first call")]),
+    )
+    for a in range(4):
+        process_occurrence(o.pk)
+    o.refresh_from_db()
+    # exhausted deliveries are not resent, and the occurrence fails once out of attempts
+    assert mocked_notify.call_count == 2
+    assert o.status == Occurrence.Status.FAILED
+    assert Occurrence.objects.filter(parent=o, event__name=SystemEvent.OCCURRENCE_ERROR.value).exists()
+
+
+@pytest.mark.django_db(transaction=True)
+@override_config(DELIVERY_MAX_ATTEMPTS=2)
+def test_retry_out_of_transaction(setup: "Context", monkeypatch: MonkeyPatch, system_objects: Any) -> None:
+    from django.db import connection
+
+    o = setup["occurrence"]
+    in_transaction = []
+
+    def send(*args: Any, **kwargs: Any) -> bool:
+        in_transaction.append(connection.in_atomic_block)
+        if len(in_transaction) > 1:
+            raise Exception("This is raised after first call")
+        return True
+
+    monkeypatch.setattr("testutils.dispatcher.XDispatcher.send", send)
+    # on commit, the failed delivery is retried at once (eager)
+    process_occurrence(o.pk)
+    o.refresh_from_db()
+    assert in_transaction == [False, False, False]
+    failed = o.deliveries.get(status=Delivery.Status.FAILED)
+    assert (failed.attempts, failed.next_attempt) == (2, None)
 
 
 def test_error(setup: "Context", system_objects: Any) -> None:
@@ -255,6 +646,27 @@ def test_schedule_occurrences(setup: "Context", monkeypatch: MonkeyPatch) -> Non
     o.refresh_from_db()
     assert mocked_notify.call_count == 1
     assert o.status == Occurrence.Status.PROCESSED
+    assert o.claimed_until is None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_schedule_occurrences_claim(setup: "Context", monkeypatch: MonkeyPatch) -> None:
+    from testutils.factories import OccurrenceFactory
+
+    monkeypatch.setattr("bitcaster.tasks.process_occurrence.delay", mocked_delay := Mock())
+    o: Occurrence = setup["occurrence"]
+    OccurrenceFactory(event=o.event, claimed_until=timezone.now() + timedelta(minutes=5))
+    expired = OccurrenceFactory(event=o.event, claimed_until=timezone.now() - timedelta(minutes=5))
+
+    with override_config(OCCURRENCE_CLAIM_BATCH_SIZE=1):
+        schedule_occurrences()
+        assert [c.args[0] for c in mocked_delay.call_args_list] == [o.pk, expired.pk]
+        # already claimed occurrences are not enqueued again
+        schedule_occurrences()
+        assert mocked_delay.call_count == 2
+
+    o.refresh_from_db()
+    assert o.claimed_until > timezone.now()
 
 
 @pytest.mark.django_db(transaction=True)
@@ -290,6 +702,133 @@ def test_purge_occurrences(
     )
 
 
+def test_purge_occurrences_cascade(purgeable_occurrences: list["Occurrence"], assignment: "Assignment") -> None:
+    from testutils.factories import (
+        DeliveryFactory,
+        IdempotencyKeyFactory,
+        OccurrenceFactory,
+    )
+
+    from bitcaster.models import IdempotencyKey, Occurrence
+
+    child = OccurrenceFactory(parent=purgeable_occurrences[0])
+    grandchild = OccurrenceFactory(parent=child)
+    DeliveryFactory(occurrence=grandchild, assignment=assignment)
+    IdempotencyKeyFactory(occurrence=grandchild)
+    IdempotencyKeyFactory(occurrence=OccurrenceFactory(), expires=timezone.now())
+
+    with override_config(OCCURRENCE_PURGE_BATCH_SIZE=1):
+        assert purge_occurrences() == 4
+
+    assert Occurrence.objects.count() == 1
+    assert not Delivery.objects.exists()
+    assert not IdempotencyKey.objects.exists()
+
+
+def test_purge_occurrences_throttle(purgeable_occurrences: list["Occurrence"], monkeypatch: MonkeyPatch) -> None:
+    from bitcaster.models import Occurrence
+
+    monkeypatch.setattr("bitcaster.tasks.time.sleep", sleep := Mock())
+    with override_config(OCCURRENCE_PURGE_BATCH_SIZE=1, OCCURRENCE_PURGE_RATE=1, OCCURRENCE_PURGE_MAX_RUNTIME=1):
+        assert purge_occurrences() == 1
+
+    sleep.assert_called_once()
+    assert Occurrence.objects.count() == 1
+
+
+def test_purge_occurrence_rollups(db: Any) -> None:
+    from testutils.factories import OccurrenceRollupFactory
+
+    from bitcaster.models import OccurrenceRollup
+
+    now = timezone.now()
+    OccurrenceRollupFactory(period=OccurrenceRollup.Period.MINUTE, bucket=now - timedelta(days=3))
+    OccurrenceRollupFactory(period=OccurrenceRollup.Period.HOUR, bucket=now - timedelta(days=3))
+    kept = OccurrenceRollupFactory(period=OccurrenceRollup.Period.HOUR, bucket=now - timedelta(days=1))
+    with override_config(OCCURRENCE_ROLLUP_RETENTION=2):
+        purge_occurrences()
+
+    assert list(OccurrenceRollup.objects.all()) == [kept]
+
+
+def test_rollup_occurrences(db: Any) -> None:
+    from testutils.factories import EventFactory, OccurrenceFactory
+
+    from bitcaster.models import Occurrence, OccurrenceRollup
+
+    cache.delete(CacheKey.OCCURRENCE_ROLLUP)
+    event = EventFactory()
+    hour = timezone.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=2)
+    o1 = OccurrenceFactory(event=event, timestamp=hour + timedelta(minutes=1, seconds=10))
+    OccurrenceFactory(event=event, timestamp=hour + timedelta(minutes=1, seconds=20))
+    OccurrenceFactory(event=event, timestamp=hour + timedelta(minutes=2), status=Occurrence.Status.FAILED)
+    OccurrenceFactory(event=event, timestamp=hour - timedelta(minutes=1))
+    with freeze_time(hour - timedelta(days=3)):  # existing before the first run, still within the retention
+        OccurrenceFactory(event=event, timestamp=hour - timedelta(days=3))
+
+    assert rollup_occurrences() == 5
+
+    def counts(period: str) -> dict[tuple[Any, str], int]:
+        qs = OccurrenceRollup.objects.filter(period=period, bucket__gte=hour)
+        return {(r.bucket - hour, r.status): r.count for r in qs}
+
+    assert counts(OccurrenceRollup.Period.MINUTE) == {
+        (timedelta(minutes=1), Occurrence.Status.NEW): 2,
+        (timedelta(minutes=2), Occurrence.Status.FAILED): 1,
+    }
+    assert counts(OccurrenceRollup.Period.HOUR) == {
+        (timedelta(0), Occurrence.Status.NEW): 2,
+        (timedelta(0), Occurrence.Status.FAILED): 1,
+    }
+    assert OccurrenceRollup.objects.filter(bucket__lt=hour, period=OccurrenceRollup.Period.HOUR).count() == 2
+
+    # already counted Occurrences within the overlap are not counted twice
+    assert rollup_occurrences() == 0
+    assert sum(counts(OccurrenceRollup.Period.HOUR).values()) == 3
+
+    o1.status = Occurrence.Status.PROCESSED
+    o1.save()
+    assert rollup_occurrences() == 1
+    assert counts(OccurrenceRollup.Period.MINUTE) == {
+        (timedelta(minutes=1), Occurrence.Status.NEW): 1,
+        (timedelta(minutes=1), Occurrence.Status.PROCESSED): 1,
+        (timedelta(minutes=2), Occurrence.Status.FAILED): 1,
+    }
+    assert counts(OccurrenceRollup.Period.HOUR) == {
+        (timedelta(0), Occurrence.Status.NEW): 1,
+        (timedelta(0), Occurrence.Status.PROCESSED): 1,
+        (timedelta(0), Occurrence.Status.FAILED): 1,
+    }
+    summary = OccurrenceRollup.objects.summary(OccurrenceRollup.Period.HOUR, hour).get()
+    assert (summary["new"], summary["processed"], summary["failed"], summary["total"]) == (1, 1, 1, 3)
+
+
+def test_rollup_occurrences_retry_failed(system_objects: Any) -> None:
+    from testutils.factories import DeliveryFactory, OccurrenceFactory
+
+    from bitcaster.models import Occurrence, OccurrenceRollup
+
+    cache.delete(CacheKey.OCCURRENCE_ROLLUP)
+    with freeze_time(timezone.now() - timedelta(minutes=30)):
+        o = OccurrenceFactory(status=Occurrence.Status.PROCESSED, timestamp=timezone.now())
+    d = DeliveryFactory(occurrence=o, status=Delivery.Status.FAILED, next_attempt=timezone.now())
+    OccurrenceFactory(
+        event=o.event, timestamp=o.timestamp + timedelta(microseconds=1)
+    )  # moves the high-water mark past `o`
+    assert rollup_occurrences() == 2
+
+    assert retry_delivery(d.pk) is False
+    assert Occurrence.objects.get(pk=o.pk).status == Occurrence.Status.FAILED
+    assert rollup_occurrences() >= 1
+
+    hourly = OccurrenceRollup.objects.filter(period=OccurrenceRollup.Period.HOUR, event=o.event)
+    assert {r.status: r.count for r in hourly} == {
+        Occurrence.Status.NEW: 1,
+        Occurrence.Status.PROCESSED: 0,
+        Occurrence.Status.FAILED: 1,
+    }
+
+
 def test_monitor_run(system_user: "User") -> None:
     from testutils.factories.monitor import MonitorFactory
 
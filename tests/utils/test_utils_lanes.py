@@ -0,0 +1,63 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from bitcaster.utils.lanes import LaneExecutor, get_pool
+
+
+def test_get_pool(monkeypatch: pytest.MonkeyPatch) -> None:
+    pool = get_pool(2)
+    assert get_pool(2) is pool
+    assert get_pool(3) is not pool
+    pool = get_pool(3)
+    monkeypatch.setattr("os.getpid", lambda: -1)
+    assert get_pool(3) is not pool
+
+
+def test_lanes_order() -> None:
+    executor = LaneExecutor(ThreadPoolExecutor(4))
+    results = []
+
+    def task(lane: str, value: int) -> int:
+        time.sleep(0.01 * (5 - value))  # later tasks are faster
+        results.append((lane, value))
+        return value
+
+    futures = [executor.submit(lane, task, lane, value) for value in range(5) for lane in "ab"]
+    assert [f.result(timeout=5) for f in futures] == [v for v in range(5) for __ in "ab"]
+    assert [v for lane, v in results if lane == "a"] == list(range(5))
+    assert [v for lane, v in results if lane == "b"] == list(range(5))
+
+
+def test_lanes_concurrent() -> None:
+    executor = LaneExecutor(ThreadPoolExecutor(2))
+    barrier = threading.Barrier(2, timeout=5)
+    futures = [executor.submit(lane, barrier.wait) for lane in "ab"]
+    assert sorted(f.result(timeout=5) for f in futures) == [0, 1]
+
+
+def test_lanes_error() -> None:
+    executor = LaneExecutor(ThreadPoolExecutor(1))
+    failed = executor.submit("a", int, "x")
+    following = executor.submit("a", int, "1")
+    with pytest.raises(ValueError):
+        failed.result(timeout=5)
+    assert following.result(timeout=5) == 1
+
+
+def test_lanes_pool_shutdown() -> None:
+    pool = ThreadPoolExecutor(1)
+    executor = LaneExecutor(pool)
+    event = threading.Event()
+    running = executor.submit("a", event.wait, 5)
+    queued = [executor.submit("a", int, "1") for __ in range(2)]
+    pool.shutdown(wait=False)
+    event.set()
+    assert running.result(timeout=5)
+    for future in queued:
+        with pytest.raises(RuntimeError):
+            future.result(timeout=5)
+    with pytest.raises(RuntimeError):
+        executor.submit("b", int, "1").result(timeout=5)
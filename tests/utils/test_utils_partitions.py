@@ -0,0 +1,76 @@
+from datetime import timedelta
+from io import StringIO
+from typing import TYPE_CHECKING
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.utils import timezone
+from freezegun import freeze_time
+from testutils.factories import DeliveryFactory, OccurrenceFactory
+
+from bitcaster.models import Delivery, Occurrence
+from bitcaster.utils import partitions
+
+if TYPE_CHECKING:
+    from bitcaster.models import Assignment
+
+pytestmark = pytest.mark.django_db
+
+
+def test_period() -> None:
+    value = timezone.now().replace(year=2024, month=1, day=31, hour=10)
+    assert partitions.period_start(value, partitions.MONTH).isoformat() == "2024-01-01T00:00:00+00:00"
+    assert partitions.next_period(partitions.period_start(value, partitions.MONTH), partitions.MONTH).month == 2
+    assert partitions.next_period(partitions.period_start(value, partitions.DAY), partitions.DAY).day == 1
+
+
+def test_partitions(
+    purgeable_occurrences: list["Occurrence"], non_purgeable_occurrences: list["Occurrence"], assignment: "Assignment"
+) -> None:
+    child = OccurrenceFactory(parent=purgeable_occurrences[0])
+    DeliveryFactory(occurrence=purgeable_occurrences[0], assignment=assignment)
+    assert not partitions.is_partitioned()
+
+    out = StringIO()
+    call_command("occurrence_partitions", setup=True, interval="day", ahead=1, stdout=out)
+    assert partitions.is_partitioned()
+    legacy, *created = partitions.get_partitions()
+    assert legacy.lower is None
+    assert [(p.lower, p.upper) for p in created] == [(legacy.upper, legacy.upper + timedelta(days=1))]
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT indexname FROM pg_indexes WHERE tablename = %s", [Occurrence._meta.db_table])
+        indexes = {row[0] for row in cursor.fetchall()}
+    assert {i.name for i in [*Occurrence._meta.indexes, *Occurrence._meta.constraints]} <= indexes
+
+    o = OccurrenceFactory()
+    assert o.pk > child.pk
+    assert Occurrence.objects.count() == 5
+
+    with pytest.raises(CommandError):
+        call_command("occurrence_partitions", setup=True, stdout=out)
+
+    with freeze_time(timezone.now() + timedelta(days=3)):
+        # the legacy partition contains non-expired Occurrences
+        assert partitions.drop_expired() == created
+
+    with freeze_time(timezone.now() + timedelta(days=60)):
+        assert partitions.drop_expired() == [legacy]
+    assert not Occurrence.objects.exists()
+    assert not Delivery.objects.exists()
+
+
+def test_partitions_not_partitioned() -> None:
+    with pytest.raises(CommandError):
+        call_command("occurrence_partitions", stdout=StringIO())
+
+
+def test_partitions_purge(
+    purgeable_occurrences: list["Occurrence"], non_purgeable_occurrences: list["Occurrence"]
+) -> None:
+    from bitcaster.tasks import purge_occurrences
+
+    partitions.setup(partitions.MONTH)
+    assert purge_occurrences() == 2
+    assert list(Occurrence.objects.all()) == non_purgeable_occurrences
+    assert len(partitions.get_partitions()) == 4
@@ -1,10 +1,25 @@
-from typing import TYPE_CHECKING
+import json
+import threading
+import time
+from typing import TYPE_CHECKING, Any
+from unittest.mock import Mock
 
 import pytest
+from py_vapid import Vapid02, b64urlencode
 from responses import RequestsMock
 
-from bitcaster.exceptions import DispatcherError
-from bitcaster.webpush.utils import sign, unsign, webpush_send_message
+from bitcaster.exceptions import DispatcherError, SubscriptionExpired
+from bitcaster.webpush import utils
+from bitcaster.webpush.utils import (
+    VAPID_RENEW,
+    VAPID_TTL,
+    VapidCache,
+    encrypt_all,
+    get_subscription_info,
+    sign,
+    unsign,
+    webpush_send_message,
+)
 
 if TYPE_CHECKING:
     from bitcaster.models import Assignment
@@ -21,3 +36,68 @@ def test_webpush_send_message(mocked_responses: RequestsMock, push_assignment: "
 
 def test_sign(push_assignment: "Assignment") -> None:
     assert unsign(sign(push_assignment))
+
+
+@pytest.mark.parametrize("status", [404, 410])
+def test_webpush_send_message_expired(
+    mocked_responses: RequestsMock, push_assignment: "Assignment", fcm_url: str, status: int
+) -> None:
+    mocked_responses.add(mocked_responses.POST, fcm_url, "Gone", status=status)
+    with pytest.raises(SubscriptionExpired):
+        webpush_send_message(push_assignment, "===")
+
+
+def test_webpush_send_message_vapid(
+    mocked_responses: RequestsMock, push_assignment: "Assignment", fcm_url: str
+) -> None:
+    vapid = Vapid02()
+    vapid.generate_keys()
+    push_assignment.channel.config = {
+        "private_key": b64urlencode(vapid.private_key.private_numbers().private_value.to_bytes(32, "big")),
+        "CLAIMS": json.dumps({"sub": "mailto:admin@example.com", "aud": "https://android.googleapis.com"}),
+    }
+    mocked_responses.add(mocked_responses.POST, fcm_url)
+    webpush_send_message(push_assignment, "===")
+    headers = mocked_responses.calls[0].request.headers
+    assert headers["Authorization"].startswith("vapid t=")
+    assert headers["content-encoding"] == "aes128gcm"
+
+
+def test_vapid_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    vapid = Mock(sign=Mock(side_effect=lambda claims: {"Authorization": json.dumps(claims)}))
+    monkeypatch.setattr("bitcaster.webpush.utils.get_vapid", Mock(return_value=vapid))
+    claims = {"sub": "mailto:admin@example.com", "aud": "https://example.com", "extra": "value"}
+    cache = VapidCache()
+    headers = cache.get("key", claims, "https://fcm.googleapis.com")
+    assert cache.get("key", dict(claims), "https://fcm.googleapis.com") is headers
+    assert cache.get("key", {**claims, "extra": "other"}, "https://fcm.googleapis.com") is not headers
+    assert cache.get("key", claims, "https://updates.push.services.mozilla.com") is not headers
+    signed = json.loads(headers["Authorization"])
+    assert signed == {"sub": claims["sub"], "extra": "value", "aud": "https://fcm.googleapis.com", "exp": signed["exp"]}
+
+    monkeypatch.setattr("time.time", Mock(return_value=time.time() + VAPID_TTL - VAPID_RENEW + 1))
+    assert cache.get("key", claims, "https://fcm.googleapis.com") is not headers
+
+
+def test_encrypt_all(push_assignment: "Assignment") -> None:
+    info = get_subscription_info(push_assignment)
+    invalid = {"endpoint": info["endpoint"], "keys": {"auth": "", "p256dh": ""}}
+    results = encrypt_all([(info, "a"), (invalid, "b"), (info, "c")])
+    assert [type(r) for r in results] == [bytes, DispatcherError, bytes]
+
+
+def test_encrypt_all_parallel(push_assignment: "Assignment", settings: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    info = get_subscription_info(push_assignment)
+    invalid = {"endpoint": info["endpoint"], "keys": {"auth": "", "p256dh": ""}}
+    settings.WEBPUSH_PARALLEL_THRESHOLD = 2
+    threads = set()
+    original = utils.encrypt
+
+    def encrypt(*args: Any) -> bytes:
+        threads.add(threading.current_thread().name)
+        return original(*args)
+
+    monkeypatch.setattr(utils, "encrypt", encrypt)
+    results = encrypt_all([(info, "a"), (invalid, "b"), (info, "c")])
+    assert [type(r) for r in results] == [bytes, DispatcherError, bytes]
+    assert threads and all(name.startswith("bitcaster-webpush") for name in threads)
@@ -5,8 +5,8 @@ from django.core.exceptions import ValidationError
 from pytest import FixtureRequest, MonkeyPatch
 from responses import RequestsMock
 
-from bitcaster.dispatchers.base import Payload
-from bitcaster.exceptions import DispatcherError
+from bitcaster.dispatchers.base import Envelope, Payload
+from bitcaster.exceptions import DispatcherError, SubscriptionExpired
 from bitcaster.models import Assignment
 from bitcaster.state import state
 from bitcaster.webpush.dispatcher import WebPushConfig, WebPushDispatcher
@@ -94,3 +94,29 @@ def test_form2() -> None:
             }
         )
         assert frm.is_valid(), frm.errors
+
+
+def test_webpush_send_many(
+    payload: Payload, mocked_responses: RequestsMock, push_assignment: "Assignment", assignment: "Assignment"
+) -> None:
+    from testutils.factories import AssignmentFactory
+
+    expired: Assignment = AssignmentFactory(
+        channel=push_assignment.channel,
+        data={
+            "webpush": {"subscription": {**push_assignment.data["webpush"]["subscription"], "endpoint": "https://x/1"}}
+        },
+    )
+    mocked_responses.add(mocked_responses.POST, push_assignment.data["webpush"]["subscription"]["endpoint"])
+    mocked_responses.add(mocked_responses.POST, "https://x/1", status=410)
+
+    results = WebPushDispatcher(push_assignment.channel).send_many(
+        [
+            Envelope(push_assignment.address.value, payload, push_assignment),
+            Envelope(assignment.address.value, payload, assignment),
+            Envelope(expired.address.value, payload, expired),
+        ]
+    )
+    assert [r.success for r in results] == [True, False, False]
+    assert str(results[1].error) == "Assignment not subscribed"
+    assert isinstance(results[2].error, SubscriptionExpired)